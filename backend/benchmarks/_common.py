@@ -0,0 +1,217 @@
+"""Utilitários compartilhados pelos benchmarks (rodar a partir de backend/)"""
+import asyncio
+import os
+import atexit
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+from _mock_openai import EMPTY_XML
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Valores de exemplo para que o Settings carregue sem o system.env
+BENCH_ENV = {
+    "SECRET_KEY": "bench-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "MYSQL_USERNAME_ADMIN": "bench",
+    "MYSQL_PASSWORD_ADMIN": "bench",
+    "MYSQL_HOST": "localhost",
+    "MYSQL_DATABASE": "bench",
+    "SECRET_API_KEY": "bench-api-key",
+    "VITE_API_URL": "http://localhost:5173",
+    "OPENAI_KEY": "sk-bench",
+}
+for _key, _value in BENCH_ENV.items():
+    os.environ.setdefault(_key, _value)
+
+API_KEY = os.environ["SECRET_API_KEY"]
+
+
+def sqlite_engine(path: str = None):
+    """Engine SQLite (arquivo temporário por padrão) com todas as tabelas criadas"""
+    from sqlalchemy import create_engine
+    from core.db import Base
+    from models import models  # noqa: F401  registra os modelos
+
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="lexsum-bench-", suffix=".db")
+        os.close(fd)
+        atexit.register(lambda: os.path.exists(path) and os.remove(path))
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+_async_engines = []
+
+
+async def dispose_async_engines():
+    """Fecha os engines aiosqlite do override_db (as threads deles seguram o fim do processo)"""
+    while _async_engines:
+        await _async_engines.pop().dispose()
+
+
+def override_db(app, engine):
+    """
+    Aponta as dependências de banco da app para o mesmo arquivo SQLite do engine
+    informado (aiosqlite nas rotas async) e retorna um sessionmaker sync para semear dados
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from core import db as core_db
+    from core.config import settings
+    from core.request_metrics import instrumentar_engine
+
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{engine.url.database}")
+    if settings.METRICS_ENABLED:
+        instrumentar_engine(engine, "sync")
+        instrumentar_engine(async_engine.sync_engine, "async")
+    AsyncSession = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    _async_engines.append(async_engine)
+
+    def _get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def _get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides[core_db.get_db] = _get_db
+    app.dependency_overrides[core_db.get_async_db] = _get_async_db
+    app.dependency_overrides[core_db.get_async_sessionmaker] = lambda: AsyncSession
+    return Session
+
+
+def seed_user(Session, email: str, senha: str, rounds: int = 12, **extra):
+    """Cria um usuário já verificado e retorna o id"""
+    from models.models import Usuarios
+    from utils.security import hash_senha
+
+    db = Session()
+    try:
+        user = Usuarios(
+            nome="Usuário Bench",
+            email=email,
+            hashed_password=hash_senha(senha, rounds),
+            celular=extra.pop("celular", f"11{abs(hash(email)) % 10**9:09d}"),
+            verificado=True,
+            **extra,
+        )
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def fake_cpf(i: int) -> str:
+    """CPF válido (dígitos verificadores certos) derivado de i"""
+    from utils.validators import dv_cpf
+
+    base = f"{i:09d}"
+    return base + dv_cpf(base)
+
+
+def fake_cnpj(i: int) -> str:
+    """CNPJ numérico válido derivado de i"""
+    from utils.validators import dv_cnpj
+
+    base = f"{i:012d}"
+    return base + dv_cnpj(base)
+
+
+def seed_parties(Session, n: int):
+    """Insere n pessoas físicas e n pessoas jurídicas"""
+    from models.models import Partes, PessoaFisica, PessoaJuridica
+
+    db = Session()
+    try:
+        for i in range(1, n + 1):
+            pf = Partes(id=2 * i - 1, email=f"pf{i}@exemplo.com", tipo="fisica")
+            pj = Partes(id=2 * i, email=f"pj{i}@exemplo.com", tipo="juridica")
+            db.add_all([pf, pj])
+            db.add(PessoaFisica(id=pf.id, nome=f"Pessoa {i}", cpf=fake_cpf(i)))
+            db.add(PessoaJuridica(id=pj.id, razao_social=f"Empresa {i} LTDA", cnpj=fake_cnpj(i)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def sample_documents(n_seeded: int, n: int, miss_ratio: float = 0.1, seed: int = 42):
+    """Mistura CPFs/CNPJs existentes, inexistentes e inválidos"""
+    rnd = random.Random(seed)
+    docs = []
+    for _ in range(n):
+        r = rnd.random()
+        i = rnd.randint(1, n_seeded)
+        if r < miss_ratio:
+            docs.append(fake_cpf(n_seeded + i))
+        elif r < miss_ratio + 0.02:
+            docs.append("123")
+        elif r < 0.55:
+            cpf = fake_cpf(i)
+            docs.append(f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}")
+        else:
+            docs.append(fake_cnpj(i))
+    return docs
+
+
+class FakeOpenAI:
+    """
+    Imita AsyncOpenAI.chat.completions.create: conta as chamadas e responde após
+    `latency` segundos com o XML de `answers` (ou um XML vazio)
+    """
+
+    EMPTY_XML = EMPTY_XML
+
+    def __init__(self, answers: dict = None, latency: float = 0.0):
+        self.answers = answers or {}
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, messages, temperature):
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self.latency)
+        text = messages[-1]["content"].split("'''")[1]
+        content = self.answers.get(text, self.EMPTY_XML)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "p50": pick(50),
+        "p95": pick(95),
+        "p99": pick(99),
+        "mean": statistics.fmean(ordered),
+    }
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,116 @@
+"""
+Servidor local compatível com POST /v1/chat/completions, com latência
+configurável (uma para todos os textos ou por texto, em `latencies`); conta
+requisições e o pico de requisições simultâneas.
+"""
+import asyncio
+import socket
+import threading
+import time
+
+# O formato que o SYSTEM_PROMPT pede: só as tags, sem elemento raiz
+EMPTY_XML = (
+    "<name></name>\n<nationality></nationality>\n<maritalStatus></maritalStatus>\n<profession></profession>\n"
+    "<rg></rg>\n<orgaoExpedidor></orgaoExpedidor>\n<dataExpedicao></dataExpedicao>\n<email></email>\n"
+    "<phone></phone>\n<address><street></street><number></number><complement></complement>"
+    "<neighborhood></neighborhood><city></city><state></state><cep></cep></address>"
+)
+
+
+class MockOpenAIServer:
+    def __init__(self, latency: float = 0.5, answers: dict = None, host: str = "127.0.0.1", port: int = 0,
+                 latencies: dict = None):
+        self.latency = latency
+        self.answers = answers or {}
+        self.latencies = latencies or {}
+        self.host = host
+        self.port = port or _porta_livre(host)
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = set()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def _app(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        import json
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        payload = json.loads(body or b"{}")
+        messages = payload.get("messages") or [{"content": ""}]
+        partes = messages[-1]["content"].split("'''")
+        text = partes[1] if len(partes) > 1 else ""
+
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if scope.get("client"):
+            self.connections.add(tuple(scope["client"]))
+        try:
+            await asyncio.sleep(self.latencies.get(text, self.latency))
+        finally:
+            self.in_flight -= 1
+
+        content = self.answers.get(text, EMPTY_XML)
+        data = json.dumps({
+            "id": f"chatcmpl-mock-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode("utf-8")
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": data})
+
+    def start(self) -> "MockOpenAIServer":
+        import uvicorn
+
+        config = uvicorn.Config(self._app, host=self.host, port=self.port, log_level="warning",
+                                lifespan="on", interface="asgi3")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("mock OpenAI não subiu")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _porta_livre(host: str) -> int:
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
@@ -0,0 +1,137 @@
+"""
+Índice de CEPs (services/cep_index.py) com --ceps CEPs sintéticos.
+
+Grava um CSV no formato dos Correios, gera o índice a partir dele (tempo e tamanho,
+como o build_cep_index.py) e, em processos novos, mede:
+- abertura: tempo de CepIndex() e memória residente (VmRSS) logo depois
+- consultas: latência p50/p99 e consultas/s de --lookups CEPs (90% existentes)
+- memória residente depois das consultas (páginas do arquivo que foram tocadas)
+Com --comparar, faz o mesmo com o caminho óbvio: um dict {cep: endereço} carregado
+do CSV na subida do processo.
+
+Uso: python benchmarks/bench_cep_index.py [--ceps 1000000] [--lookups 200000] [--comparar]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import BACKEND_DIR
+
+UFS = ("AC AL AP AM BA CE DF ES GO MA MT MS MG PA PB PR PE PI RJ RN RS RO RR SC SP SE TO").split()
+TIPOS = ("Rua", "Avenida", "Travessa", "Alameda", "Praça", "Estrada")
+NOMES = ("das Flores", "São João", "Sete de Setembro", "Tiradentes", "Dom Pedro II", "Santos Dumont",
+         "XV de Novembro", "Marechal Deodoro", "Getúlio Vargas", "Rui Barbosa", "das Palmeiras", "do Comércio")
+
+FILHO = r"""
+import json, random, sys, time
+sys.path.insert(0, sys.argv[1])
+modo, arquivo, csv_path, total, lookups = sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]), int(sys.argv[6])
+
+def rss():
+    with open("/proc/self/status") as f:
+        return next(int(l.split()[1]) for l in f if l.startswith("VmRSS")) / 1024
+
+from services.cep_index import CepIndex, formatar_cep, ler_csv_correios, normalizar_cep  # imports fora da medida
+sys.path.insert(0, sys.argv[7])
+from bench_cep_index import registros
+
+antes = rss()
+start = time.perf_counter()
+if modo == "mmap":
+    index = CepIndex(arquivo)
+    buscar = index.buscar
+else:
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        enderecos = {normalizar_cep(cep): tuple(c or None for c in campos) for cep, *campos in ler_csv_correios(f)}
+    def buscar(cep):
+        chave = normalizar_cep(cep)
+        campos = enderecos.get(chave) if chave is not None else None
+        return (formatar_cep(chave), *campos) if campos else None
+abertura = time.perf_counter() - start
+depois_abrir = rss()
+
+rnd = random.Random(7)
+existentes = [cep for cep, *_ in registros(total)]
+consultas = [rnd.choice(existentes) if rnd.random() < 0.9 else f"{rnd.randrange(10**8):08d}" for _ in range(lookups)]
+del existentes
+base_consultas = rss()
+tempos = []
+achados = 0
+inicio = time.perf_counter()
+for cep in consultas:
+    t = time.perf_counter_ns()
+    achados += buscar(cep) is not None
+    tempos.append(time.perf_counter_ns() - t)
+total_s = time.perf_counter() - inicio
+tempos.sort()
+print(json.dumps({
+    "abertura_ms": abertura * 1000, "rss_abrir": depois_abrir - antes,
+    "rss_consultas": rss() - base_consultas + depois_abrir - antes,
+    "p50_us": tempos[len(tempos) // 2] / 1000, "p99_us": tempos[int(len(tempos) * 0.99)] / 1000,
+    "por_segundo": lookups / total_s, "achados": achados,
+}))
+"""
+
+
+def registros(n: int, seed: int = 42):
+    """(cep, logradouro, bairro, cidade, uf) sintéticos, sempre os mesmos para o mesmo n"""
+    rnd = random.Random(seed)
+    cidades = [(f"Cidade {k}", UFS[k % len(UFS)]) for k in range(5570)]
+    for cep in sorted(rnd.sample(range(1_000_000, 100_000_000), n)):
+        cidade, uf = cidades[rnd.randrange(len(cidades)) if rnd.random() < 0.5 else rnd.randrange(50)]
+        if rnd.random() < 0.02:  # CEP geral de localidade, sem logradouro
+            yield f"{cep:08d}", "", "", cidade, uf
+            continue
+        logradouro = f"{rnd.choice(TIPOS)} {rnd.choice(NOMES)} {rnd.randrange(3000)}"
+        yield f"{cep:08d}", logradouro, f"Bairro {rnd.randrange(200)}", cidade, uf
+
+
+def medir(modo: str, arquivo: str, csv_path: str, args) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", FILHO, BACKEND_DIR, modo, arquivo, csv_path, str(args.ceps), str(args.lookups),
+         os.path.dirname(os.path.abspath(__file__))],
+        capture_output=True, text=True, env={**os.environ, "LOG_FILE": "", "LOG_LEVEL": "WARNING"},
+    )
+    if proc.returncode != 0:
+        sys.exit(f"processo falhou:\n{proc.stderr[-3000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ceps", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--comparar", action="store_true", help="mede também um dict carregado na subida")
+    args = parser.parse_args()
+
+    from services.cep_index import construir_indice, ler_csv_correios
+
+    with tempfile.TemporaryDirectory(prefix="lexsum-cep-") as tmp:
+        csv_path, arquivo = os.path.join(tmp, "ceps.csv"), os.path.join(tmp, "cep.idx")
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(("cep", "logradouro", "bairro", "localidade", "uf"))
+            writer.writerows(registros(args.ceps))
+        start = time.perf_counter()
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            total = construir_indice(ler_csv_correios(f), arquivo)
+        print(f"índice: {total} CEPs, {os.path.getsize(arquivo) / 2**20:.1f} MB, "
+              f"gerado em {time.perf_counter() - start:.1f}s")
+
+        modos = ("mmap", "dict") if args.comparar else ("mmap",)
+        print(f"{'modo':6} {'abertura':>10} {'RSS abrir':>10} {'RSS depois':>11} {'p50':>8} {'p99':>8} "
+              f"{'consultas/s':>12} {'achados':>8}")
+        for modo in modos:
+            r = medir(modo, arquivo, csv_path, args)
+            print(f"{modo:6} {r['abertura_ms']:8.1f}ms {r['rss_abrir']:8.1f}MB {r['rss_consultas']:9.1f}MB "
+                  f"{r['p50_us']:6.1f}µs {r['p99_us']:6.1f}µs {r['por_segundo']:12,.0f} {r['achados']:8d}")
+
+
+if __name__ == "__main__":
+    main()
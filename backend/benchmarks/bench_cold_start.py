@@ -0,0 +1,107 @@
+"""
+Cold start de um worker: do processo novo até a primeira resposta.
+
+Cada rodada sobe um processo Python novo que mede, em sequência:
+- import: `import main`
+- app: create_app() (Settings, logs, rotas e middlewares)
+- startup: lifespan (engines, fila de email)
+- 1ª req: primeira resposta de /protegido (JWT) e de /api/parties (pool + primeira consulta)
+e o tempo total do processo, contando o boot do interpretador. O banco é um SQLite
+temporário (DATABASE_URL_OVERRIDE), então o número não depende do MySQL.
+
+Com --backend-dir mede outra cópia do backend (ex.: `git worktree add /tmp/antes <commit>`)
+para comparar; versões sem create_app usam o `app` montado no import.
+
+Uso: python benchmarks/bench_cold_start.py [--runs 10] [--backend-dir ../outra-copia/backend]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import BACKEND_DIR, BENCH_ENV, sqlite_engine
+
+FILHO = r"""
+import asyncio, json, os, time
+import httpx  # cliente de teste; fora das fases medidas
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+app = main.create_app() if hasattr(main, "create_app") else main.app
+t2 = time.perf_counter()
+
+async def rodar():
+    async with app.router.lifespan_context(app):
+        t3 = time.perf_counter()
+        headers = {"Authorization": "Bearer " + os.environ["BENCH_TOKEN"]}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as c:
+            (await c.get("/protegido", headers=headers)).raise_for_status()
+            t4 = time.perf_counter()
+            (await c.get("/api/parties", headers=headers)).raise_for_status()
+            t5 = time.perf_counter()
+    from core import db
+    if getattr(db, "async_engine", None) is not None:  # versões que não fecham o engine no lifespan
+        await db.async_engine.dispose()
+    return t3, t4, t5
+
+t3, t4, t5 = asyncio.run(rodar())
+print(json.dumps({"import": t1 - t0, "app": t2 - t1, "startup": t3 - t2,
+                  "1a req /protegido": t4 - t3, "1a req /api/parties": t5 - t4}))
+"""
+
+FASES = ("import", "app", "startup", "1a req /protegido", "1a req /api/parties", "processo")
+
+
+def rodada(backend_dir: str, env: dict, cwd: str) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", FILHO], cwd=cwd, env={**env, "PYTHONPATH": backend_dir},
+                          capture_output=True, text=True)
+    total = time.perf_counter() - start
+    if proc.returncode != 0:
+        sys.exit(f"processo falhou:\n{proc.stderr[-3000:]}")
+    tempos = json.loads(proc.stdout.strip().splitlines()[-1])
+    tempos["processo"] = total
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--backend-dir", default=BACKEND_DIR)
+    args = parser.parse_args()
+
+    from models.models import Usuarios
+    from sqlalchemy.orm import Session
+    from utils.security import create_access_token
+
+    engine = sqlite_engine()
+    with Session(engine) as db:
+        db.add(Usuarios(nome="Bench", email="bench@example.com", celular="11900000000", hashed_password="x"))
+        db.commit()
+    banco = engine.url.database
+
+    env = {
+        **os.environ, **BENCH_ENV,
+        "DATABASE_URL_OVERRIDE": f"sqlite:///{banco}",
+        "ASYNC_DATABASE_URL_OVERRIDE": f"sqlite+aiosqlite:///{banco}",
+        "LOG_FILE": "",
+        "LOG_LEVEL": "WARNING",
+        "BENCH_TOKEN": create_access_token({"sub": "bench@example.com"}),
+    }
+    with tempfile.TemporaryDirectory(prefix="lexsum-cold-") as cwd:
+        rodada(args.backend_dir, env, cwd)  # aquece o cache de disco e os .pyc
+        rodadas = [rodada(args.backend_dir, env, cwd) for _ in range(args.runs)]
+
+    print(f"backend: {os.path.abspath(args.backend_dir)}; {args.runs} processos; tempos em ms")
+    print(f"{'fase':22} {'mediana':>8} {'min':>8} {'max':>8}")
+    for fase in FASES:
+        valores = [r[fase] * 1000 for r in rodadas]
+        print(f"{fase:22} {statistics.median(valores):8.0f} {min(valores):8.0f} {max(valores):8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Validação de CPF/CNPJ (dígitos verificadores): documentos/s do caminho escalar
+(is_cpf/is_cnpj por documento) e do vetorizado (documentos_validos, numpy).
+
+Os documentos já vêm normalizados, como nas rotas: ~35% CPF válidos, ~25% CNPJ
+numéricos, ~10% CNPJ alfanuméricos, o resto inválido (dígito trocado, tamanho errado,
+sequências repetidas). Também mostra a checagem antiga (só o tamanho, refazendo o regex)
+como referência e confere que escalar e vetorizado dão o mesmo resultado.
+
+Uso: python benchmarks/bench_document_validation.py [--docs 1000000] [--repeat 3]
+"""
+import argparse
+import random
+import re
+import time
+
+import _common  # noqa: F401  coloca o backend no sys.path
+
+ALFANUMERICO = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def gerar(n: int, seed: int = 42):
+    from utils.validators import dv_cnpj, dv_cpf
+
+    rnd = random.Random(seed)
+    docs = []
+    for _ in range(n):
+        r = rnd.random()
+        if r < 0.35:
+            base = f"{rnd.randrange(10**9):09d}"
+            docs.append(base + dv_cpf(base))
+        elif r < 0.60:
+            base = f"{rnd.randrange(10**12):012d}"
+            docs.append(base + dv_cnpj(base))
+        elif r < 0.70:
+            base = "".join(rnd.choices(ALFANUMERICO, k=12))
+            docs.append(base + dv_cnpj(base))
+        elif r < 0.85:
+            base = f"{rnd.randrange(10**9):09d}"
+            docs.append(base + str((int(dv_cpf(base)) + 1) % 100).zfill(2))
+        elif r < 0.95:
+            docs.append(f"{rnd.randrange(10**12):0{rnd.choice((3, 10, 12, 13))}d}")
+        else:
+            docs.append(rnd.choice("0123456789") * rnd.choice((11, 14)))
+    return docs
+
+
+def antigo(docs):
+    """A checagem de antes: limpa de novo com regex e olha só o tamanho"""
+    return [len(re.sub(r"\D", "", d)) in (11, 14) for d in docs]
+
+
+def medir(fn, docs, repeat: int):
+    melhor = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resultado = fn(docs)
+        melhor = min(melhor, time.perf_counter() - start)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3, help="rodadas; vale a melhor")
+    args = parser.parse_args()
+
+    from utils.validators import documentos_validos, is_cnpj, is_cpf
+
+    docs = gerar(args.docs)
+
+    start = time.perf_counter()
+    import numpy  # noqa: F401  no serviço, pago uma vez na primeira validação em lote
+    print(f"import numpy: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    caminhos = (
+        ("antigo (só tamanho)", antigo),
+        ("escalar (is_cpf/is_cnpj)", lambda ds: [is_cpf(d) or is_cnpj(d) for d in ds]),
+        ("lote (numpy)", lambda ds: documentos_validos(ds).tolist()),
+    )
+    resultados = {}
+    print(f"{args.docs} documentos, melhor de {args.repeat}")
+    for nome, fn in caminhos:
+        segundos, resultados[nome] = medir(fn, docs, args.repeat)
+        print(f"{nome:26} {args.docs / segundos:12,.0f} docs/s  ({segundos * 1000:.0f}ms)  "
+              f"válidos: {sum(resultados[nome])}")
+
+    if resultados["escalar (is_cpf/is_cnpj)"] != resultados["lote (numpy)"]:
+        raise SystemExit("FALHOU: escalar e numpy discordam")
+    print("escalar e numpy concordam")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Vazão da fila de emails contra um servidor SMTP local (aiosmtpd).
+
+--fail-rate faz o servidor recusar uma fração das mensagens para exercitar os
+reenvios com backoff e a lista de dead letters.
+
+Uso: python benchmarks/bench_email_queue.py [--messages 2000] [--workers 4] [--batch 50] [--fail-rate 0.05]
+Requer: pip install aiosmtpd
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import _common  # noqa: F401  ajusta sys.path e variáveis de ambiente
+
+
+class Handler:
+    def __init__(self, fail_rate: float):
+        self.fail_rate = fail_rate
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if random.random() < self.fail_rate:
+            return "451 Falha temporária simulada"
+        self.received += 1
+        return "250 OK"
+
+
+async def rodar(args, port: int):
+    from services.email_queue import EmailDispatcher, OutgoingEmail, SmtpConnection
+
+    dispatcher = EmailDispatcher(
+        workers=args.workers,
+        batch_size=args.batch,
+        max_retries=args.max_retries,
+        backoff_base=0.05,
+        connection_factory=lambda: SmtpConnection("127.0.0.1", port, None, None, False, 10, "bench@lexsum.com.br"),
+    )
+    await dispatcher.start()
+
+    start = time.perf_counter()
+    for i in range(args.messages):
+        dispatcher.enqueue(OutgoingEmail(to=f"user{i}@exemplo.com", subject="Código", body=f"Seu código é {i:06d}"))
+    enqueue_elapsed = time.perf_counter() - start
+
+    while dispatcher.sent + dispatcher.dead_lettered < args.messages:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    stats = dispatcher.stats()
+    await dispatcher.stop()
+    return enqueue_elapsed, elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    handler = Handler(args.fail_rate)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        enqueue_elapsed, elapsed, stats = asyncio.run(rodar(args, args.port))
+    finally:
+        controller.stop()
+
+    print(f"enfileirar {args.messages} emails: {enqueue_elapsed * 1000:.1f}ms "
+          f"({enqueue_elapsed / args.messages * 1e6:.1f} µs/email no caminho da requisição)")
+    print(f"entregues: {handler.received} em {elapsed:.2f}s ({handler.received / elapsed:,.0f} emails/s)")
+    print("stats:", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Custo da verificação do JWT em rotas protegidas, com e sem o cache de tokens verificados.
+
+Uso: python benchmarks/bench_jwt_cache.py [--n 20000] [--requests 2000]
+"""
+import argparse
+import timeit
+
+import _common  # noqa: F401  ajusta sys.path e variáveis de ambiente
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000, help="chamadas diretas a decode_token")
+    parser.add_argument("--requests", type=int, default=2000, help="requisições a /protegido")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from core.config import settings
+    from main import app
+    from services.token_cache import verified_tokens
+    from utils.security import create_access_token, decode_token
+
+    token = create_access_token({"sub": "bench@exemplo.com"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"{'modo':<12} {'decode_token':>16} {'/protegido':>16}")
+    with TestClient(app) as client:
+        for enabled in (False, True):
+            settings.JWT_CACHE_ENABLED = enabled
+            verified_tokens.backend.clear()
+            decode_token(token)
+
+            per_call = timeit.timeit(lambda: decode_token(token), number=args.n) / args.n
+            per_request = timeit.timeit(lambda: client.get("/protegido", headers=headers), number=args.requests) / args.requests
+
+            modo = "com cache" if enabled else "sem cache"
+            print(f"{modo:<12} {per_call * 1e6:>13.1f} µs {per_request * 1e6:>13.1f} µs")
+
+    print("cache:", verified_tokens.stats())
+
+
+if __name__ == "__main__":
+    main()
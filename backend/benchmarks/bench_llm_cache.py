@@ -0,0 +1,98 @@
+"""
+Cache de respostas e coalescência de /api/parse-party-data com um cliente
+OpenAI falso que conta as chamadas.
+
+Dispara --concurrency requisições simultâneas com o mesmo texto (esperado:
+1 chamada ao modelo), repete a rodada (esperado: 0 chamadas, tudo da memória)
+e, com --sqlite, recria o cache em memória para mostrar acertos no disco (esperado:
+0 chamadas, 1 leitura do disco e o resto coalescido). Sai com código 1 se alguma
+rodada fugir do esperado ou alguma resposta não for 200; --sqlite tem de ser um
+arquivo novo.
+
+Uso: python benchmarks/bench_llm_cache.py [--concurrency 50] [--llm-latency 0.5] [--sqlite /tmp/llm.db]
+"""
+import argparse
+import asyncio
+import collections
+import os
+import sys
+import time
+
+from _common import FakeOpenAI
+
+# Texto fora do padrão de qualificação: sempre cai no caminho do modelo
+TEXTO = "O autor é o Sr. Fulano, que mora em Santos há muitos anos e trabalha como pescador"
+
+
+async def rodada(app, n: int):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        start = time.perf_counter()
+        respostas = await asyncio.gather(*(
+            client.post("/api/parse-party-data", json={"text": TEXTO}) for _ in range(n)
+        ))
+        elapsed = time.perf_counter() - start
+    if any(r.status_code != 200 for r in respostas):
+        sys.exit(f"FALHOU: status {collections.Counter(r.status_code for r in respostas)}")
+    return collections.Counter(r.headers.get("x-cache") for r in respostas), elapsed
+
+
+def conferir(nome: str, chamadas: int, origens: collections.Counter, esperado_chamadas: int, esperado: dict) -> bool:
+    ok = chamadas == esperado_chamadas and origens == esperado
+    if not ok:
+        print(f"FALHOU {nome}: esperado {esperado_chamadas} chamadas e origens {dict(esperado)}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--sqlite", help="arquivo da camada persistente")
+    args = parser.parse_args()
+    if args.sqlite and os.path.exists(args.sqlite):
+        sys.exit(f"{args.sqlite} já existe: a rodada fria sairia do disco; use um arquivo novo")
+
+    import services.party_parse as party_parse
+    from main import app
+    from services.cache import InMemoryLRUCache
+    from services.llm_cache import LLMResponseCache, SqliteResponseStore
+    from services.llm_client import LLMClient
+
+    fake = FakeOpenAI(latency=args.llm_latency)
+    party_parse.llm_client = LLMClient(api_key="bench", max_concurrency=args.concurrency, client=fake)
+
+    def novo_cache():
+        store = SqliteResponseStore(args.sqlite) if args.sqlite else None
+        party_parse.llm_cache = LLMResponseCache(InMemoryLRUCache(maxsize=100), store)
+
+    n = args.concurrency
+    esperados = {
+        "fria (concorrente)": (1, {"upstream": 1, "coalesced": n - 1}),
+        "quente (memória)": (0, {"memory": n}),
+    }
+    ok = True
+    novo_cache()
+    for nome, (chamadas_esperadas, origens_esperadas) in esperados.items():
+        antes = fake.calls
+        origens, elapsed = asyncio.run(rodada(app, n))
+        print(f"{nome}: {n} requisições em {elapsed:.2f}s, "
+              f"chamadas ao modelo: {fake.calls - antes}, origens: {dict(origens)}")
+        ok &= conferir(nome, fake.calls - antes, origens, chamadas_esperadas, +collections.Counter(origens_esperadas))
+
+    if args.sqlite:
+        novo_cache()
+        antes = fake.calls
+        origens, elapsed = asyncio.run(rodada(app, n))
+        print(f"após restart (disco): {elapsed:.2f}s, chamadas ao modelo: {fake.calls - antes}, origens: {dict(origens)}")
+        ok &= conferir("após restart", fake.calls - antes, origens, 0, +collections.Counter(disk=1, coalesced=n - 1))
+
+    print("stats:", party_parse.llm_cache.stats())
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Custo de log por requisição: configuração antiga vs pipeline novo (fila + JSON + amostragem).
+
+Simula --requests requisições do /verificar-codigo com código errado (o caminho mais
+logado), cada uma com uma linha info de alto volume e uma de warning:
+
+- antigo: stdout colorido síncrono em DEBUG + arquivo, mensagens em f-string
+- novo: um sink que só enfileira; uma thread formata JSON com redação de PII e
+  escreve no stdout e no arquivo; request_id por contextvar
+- novo + amostragem: idem, com LOG_SAMPLE_RATE=0.1 nos logs de alto volume
+
+Mede o tempo gasto na thread da requisição (o que soma na latência) e o tempo até a
+fila esvaziar (vazão). Com --lento o stdout é um pipe lido devagar, como um coletor
+de logs atrasado: o sink síncrono passa a travar a requisição.
+
+Uso: python benchmarks/bench_logging.py [--requests 20000] [--lento]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import _common  # noqa: F401  configura sys.path e o ambiente
+
+from loguru import logger
+
+from core.config import settings
+from services import logger as logging_service
+
+EMAIL = "fulano.de.tal@example.com"
+CODIGO = "482913"
+
+
+def stdout_lento(atraso: float):
+    """Pipe cujo leitor consome 4 KiB a cada `atraso` segundos"""
+    leitura, escrita = os.pipe()
+
+    def consumir():
+        with os.fdopen(leitura, "rb") as f:
+            while f.read1(4096):
+                time.sleep(atraso)
+
+    threading.Thread(target=consumir, daemon=True).start()
+    return os.fdopen(escrita, "w", buffering=1)
+
+
+def config_antiga(stdout, arquivo: str) -> None:
+    logging_service.encerrar_logger()
+    logging_service.fila_de_log = None
+    logger.remove()
+    logger.configure(patcher=None)
+    logger.add(stdout, colorize=True, level="DEBUG", format=(
+        "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | "
+        "<cyan>{module}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>"))
+    logger.add(arquivo, level="INFO", enqueue=True)
+
+
+def config_nova(stdout, arquivo: str, taxa: float) -> None:
+    settings.LOG_FILE = arquivo
+    settings.LOG_SAMPLE_RATE = taxa
+    sys.stdout = stdout
+    try:
+        logging_service.configurar_logger()
+    finally:
+        sys.stdout = sys.__stdout__
+
+
+def requisicao_antiga(i: int) -> None:
+    logger.info(f"Verificando código: {EMAIL}")
+    logger.error(f"Falha na verificação de código. Código inválido: {EMAIL}. Esperado {CODIGO}. Enviado {i:06d}.")
+
+
+def requisicao_nova(i: int) -> None:
+    token = logging_service.request_id_var.set(f"{i:032x}")
+    try:
+        logging_service.amostrado().info("Verificando código", email=EMAIL)
+        logger.warning("Verificação de código: código inválido", usuario_id=i)
+    finally:
+        logging_service.request_id_var.reset(token)
+
+
+def esvaziar() -> None:
+    logger.complete()
+    if logging_service.fila_de_log is not None:
+        logging_service.fila_de_log.esvaziar(timeout=600)
+
+
+def medir(nome: str, configurar, requisicao, n: int) -> None:
+    configurar()
+    for i in range(200):  # aquecimento
+        requisicao(i)
+    esvaziar()
+
+    start = time.perf_counter()
+    for i in range(n):
+        requisicao(i)
+    na_requisicao = time.perf_counter() - start
+    esvaziar()
+    total = time.perf_counter() - start
+    logger.remove()
+    print(f"{nome:24} {na_requisicao / n * 1e6:7.1f}µs/req na requisição   "
+          f"{n / total:9,.0f} req/s até esvaziar a fila")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--lento", action="store_true", help="stdout é um pipe lido devagar")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="lexsum-logs-")
+    arquivo = os.path.join(tmp, "app.log")
+
+    def saida():
+        return stdout_lento(0.001) if args.lento else open(os.devnull, "w")
+
+    print(f"{args.requests} requisições, 2 linhas de log cada; stdout={'pipe lento' if args.lento else 'devnull'}")
+    medir("antigo (síncrono)", lambda: config_antiga(saida(), arquivo), requisicao_antiga, args.requests)
+    medir("novo (fila + JSON)", lambda: config_nova(saida(), arquivo, 1.0), requisicao_nova, args.requests)
+    medir("novo + amostragem 10%", lambda: config_nova(saida(), arquivo, 0.1), requisicao_nova, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Custo do MetricsMiddleware + eventos de SQL por requisição.
+
+Sobe a app com METRICS_ENABLED=false e mede rotas típicas (sem banco, com 1-2
+consultas) antes e depois de ligar a instrumentação: middleware por fora da app e
+listeners before/after_cursor_execute nos engines. Também mede o custo extra de
+guardar o SQL para o log de requisições lentas (slow_request_ms) e o custo do
+middleware isolado, sem o ruído das rotas.
+
+Uso: python benchmarks/bench_metrics_overhead.py [--requests 3000]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ["METRICS_ENABLED"] = "false"
+
+from _common import API_KEY, dispose_async_engines, override_db, percentiles, seed_user, sqlite_engine  # noqa: E402
+
+import httpx  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+
+RODADA = 50
+
+
+async def medir(variantes: dict, rotas, n: int, headers: dict) -> dict:
+    """
+    Alterna as variantes em rodadas de RODADA requisições por rota, para que ruído e
+    aquecimento do processo pesem igual em todas; cada variante é (app, ligar, desligar)
+    """
+    tempos = {(nome, rota): [] for nome in variantes for rota in rotas}
+    clientes = {
+        nome: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers)
+        for nome, (app, _, _) in variantes.items()
+    }
+    for nome, cliente in clientes.items():  # aquecimento
+        for rota in rotas:
+            (await cliente.get(rota)).raise_for_status()
+    for _ in range(max(1, n // RODADA)):
+        for nome, (_, ligar, desligar) in variantes.items():
+            ligar()
+            for rota in rotas:
+                for _ in range(RODADA):
+                    start = time.perf_counter()
+                    await clientes[nome].get(rota)
+                    tempos[nome, rota].append((time.perf_counter() - start) * 1e6)
+            desligar()
+    for cliente in clientes.values():
+        await cliente.aclose()
+    return {chave: percentiles(valores) for chave, valores in tempos.items()}
+
+
+async def _app_vazia(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def custo_isolado(n: int) -> float:
+    """µs por requisição do middleware sozinho, chamado direto sobre uma app ASGI vazia"""
+    from core.request_metrics import MetricsMiddleware
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/"}
+    tempos = {}
+    for nome, app in (("sem", _app_vazia), ("com", MetricsMiddleware(_app_vazia))):
+        start = time.perf_counter()
+        for _ in range(n):
+            await app(scope, receive, send)
+        tempos[nome] = (time.perf_counter() - start) / n * 1e6
+    return tempos["com"] - tempos["sem"]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    from main import app
+    from core.request_metrics import MetricsMiddleware, instrumentar_engine
+    from utils.security import create_access_token
+
+    engine = sqlite_engine()
+    Session = override_db(app, engine)
+    seed_user(Session, "bench@example.com", "senha", rounds=4)
+
+    token = create_access_token({"sub": "bench@example.com"})
+    headers = {"x-api-key": API_KEY, "Authorization": f"Bearer {token}"}
+    rotas = ["/protegido", "/api/parties?limit=20", "/api/party/search?q=maria"]
+
+    listeners = []
+
+    def ligar_sql():
+        listeners.append(instrumentar_engine(Engine, "bench"))  # todos os engines, inclusive os do override
+
+    def desligar_sql():
+        listeners.pop()()
+
+    def nada():
+        pass
+
+    variantes = {
+        "sem": (app, nada, nada),
+        "com": (MetricsMiddleware(app), ligar_sql, desligar_sql),
+        "sql": (MetricsMiddleware(app, slow_request_ms=1e9), ligar_sql, desligar_sql),
+    }
+    r = await medir(variantes, rotas, args.requests, headers)
+    await dispose_async_engines()
+
+    print(f"middleware isolado: {await custo_isolado(100_000):.1f}µs por requisição")
+    print(f"{args.requests} requisições por rota; tempos em µs (p50 / média)")
+    for rota in rotas:
+        d, l, s = r["sem", rota], r["com", rota], r["sql", rota]
+        print(f"{rota:28} sem métricas {d['p50']:7.0f} / {d['mean']:7.0f}   "
+              f"com métricas {l['p50']:7.0f} / {l['mean']:7.0f} (+{l['p50'] - d['p50']:4.0f})   "
+              f"guardando SQL {s['p50']:7.0f} / {s['mean']:7.0f} (+{s['p50'] - d['p50']:4.0f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+Compara N chamadas GET /api/party com uma única chamada POST /api/party/batch.
+
+Uso: python benchmarks/bench_party_batch.py [--seed 20000] [--docs 2000]
+"""
+import argparse
+
+from _common import API_KEY, Timer, override_db, sample_documents, seed_parties, sqlite_engine
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=20000, help="quantidade de PF e de PJ cadastradas")
+    parser.add_argument("--docs", type=int, default=2000, help="documentos consultados")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from services.party_cache import party_cache
+
+    engine = sqlite_engine()
+    Session = override_db(app, engine)
+    seed_parties(Session, args.seed)
+    docs = sample_documents(args.seed, args.docs)
+    headers = {"x-api-key": API_KEY}
+
+    with TestClient(app) as client:
+        party_cache.backend.clear()
+        with Timer() as single:
+            for doc in docs:
+                client.get("/api/party", params={"document": doc}, headers=headers)
+
+        # Sem cache aquecido, para comparar só as idas ao banco
+        party_cache.backend.clear()
+        with Timer() as batch:
+            resp = client.post("/api/party/batch", json={"documents": docs}, headers=headers)
+        resp.raise_for_status()
+
+    found = sum(1 for item in resp.json()["results"] if item["status"] == "found")
+    print(f"documentos: {len(docs)} (encontrados: {found})")
+    print(f"N chamadas únicas: {single.elapsed:.3f}s ({len(docs) / single.elapsed:,.0f} docs/s)")
+    print(f"1 chamada batch:   {batch.elapsed:.3f}s ({len(docs) / batch.elapsed:,.0f} docs/s)")
+    print(f"speedup: {single.elapsed / batch.elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Exportação de partes (/api/parties/export) com --rows partes de um usuário.
+
+Sobe `uvicorn main:app` num processo separado sobre um SQLite temporário e baixa o
+export em jsonl, csv e nas versões gzip, contando as linhas recebidas. Para cada
+formato mede MB/s, linhas/s e o pico de memória (VmHWM) do servidor: o pico é zerado
+antes de cada download (/proc/<pid>/clear_refs), então "pico - antes" é o que aquele
+export custou. Para comparar, --comparar mede num processo novo o caminho ingênuo
+(todas as linhas com .all() e um json.dumps da lista, como um JSONResponse faria).
+
+Uso: python benchmarks/bench_party_export.py [--rows 1000000] [--comparar]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import date
+
+from _common import BACKEND_DIR, sqlite_engine
+from _mock_openai import _porta_livre
+
+FORMATOS = (("jsonl", False), ("csv", False), ("jsonl", True), ("csv", True))
+
+INGENUO = r"""
+import json, resource, sys
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from services.party_export import COLUNAS
+from services.queries import exportacao_partes_do_usuario
+antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with Session(create_engine(sys.argv[1])) as db:
+    linhas = db.execute(exportacao_partes_do_usuario(1, COLUNAS)).all()
+    corpo = json.dumps([dict(zip(COLUNAS, l)) for l in linhas], default=str).encode()
+print(json.dumps({"linhas": len(linhas), "mb": len(corpo) / 2**20,
+                  "antes": antes / 1024, "pico": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def semear(engine, n: int, lote: int = 50000) -> None:
+    from sqlalchemy import insert
+    from models.models import Partes, PessoaFisica, PessoaJuridica, Usuarios
+
+    with engine.begin() as conn:
+        conn.execute(insert(Usuarios), [{"id": 1, "nome": "Exportador", "email": "export@example.com",
+                                         "celular": "11900000000", "hashed_password": "x", "verificado": True}])
+        for inicio in range(1, n + 1, lote):
+            partes, fisicas, juridicas = [], [], []
+            for i in range(inicio, min(inicio + lote, n + 1)):
+                tipo = "fisica" if i % 2 else "juridica"
+                partes.append({"id": i, "tipo": tipo, "usuario_id": 1, "email": f"parte{i}@exemplo.com",
+                               "celular": f"11{i:09d}", "cep": "01310100", "logradouro": "Avenida Paulista",
+                               "numero": str(i % 2000), "bairro": "Bela Vista", "cidade": "São Paulo", "uf": "SP"})
+                if tipo == "fisica":
+                    fisicas.append({"id": i, "nome": f"Pessoa Exportada {i}", "cpf": f"{i:011d}",
+                                    "data_nascimento": date(1980, 1 + i % 12, 1 + i % 28), "profissao": "Advogada"})
+                else:
+                    juridicas.append({"id": i, "razao_social": f"Empresa Exportada {i} LTDA", "cnpj": f"{i:014d}",
+                                      "nome_fantasia": f"Exportada {i}"})
+            for tabela, linhas in ((Partes, partes), (PessoaFisica, fisicas), (PessoaJuridica, juridicas)):
+                if linhas:
+                    conn.execute(insert(tabela), linhas)
+
+
+def memoria(pid: int) -> dict:
+    """VmRSS e VmHWM (pico) do processo, em MB"""
+    with open(f"/proc/{pid}/status") as f:
+        campos = dict(linha.split(":", 1) for linha in f)
+    return {k: int(campos[k].split()[0]) / 1024 for k in ("VmRSS", "VmHWM")}
+
+
+def subir_api(banco: str, tmp: str, **extra_env):
+    porta = _porta_livre("127.0.0.1")
+    env = {
+        **os.environ,  # já com os valores do BENCH_ENV; o token é assinado com o mesmo SECRET_KEY
+        "DATABASE_URL_OVERRIDE": f"sqlite:///{banco}",
+        "ASYNC_DATABASE_URL_OVERRIDE": f"sqlite+aiosqlite:///{banco}",
+        "RATE_LIMIT_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+        "LOG_FILE": "",
+        **extra_env,
+    }
+    saida = open(os.path.join(tmp, "uvicorn.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(porta),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env, stdout=saida, stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{porta}"
+
+    import httpx
+
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if proc.poll() is not None:
+            raise SystemExit(f"uvicorn terminou na subida:\n{open(saida.name).read()[-3000:]}")
+        try:
+            httpx.get(f"{base_url}/protegido", timeout=1)
+            return proc, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("uvicorn não respondeu em 60s")
+
+
+def baixar(client, pid: int, formato: str, gzip: bool) -> dict:
+    with open(f"/proc/{pid}/clear_refs", "w") as f:
+        f.write("5")  # zera o VmHWM
+    antes = memoria(pid)["VmRSS"]
+    descompactar = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip else None
+    recebidos = linhas = 0
+    start = time.perf_counter()
+    with client.stream("GET", "/api/parties/export", params={"formato": formato, "gzip": gzip}) as r:
+        r.raise_for_status()
+        for bloco in r.iter_raw():
+            recebidos += len(bloco)
+            linhas += (descompactar.decompress(bloco) if gzip else bloco).count(b"\n")
+    segundos = time.perf_counter() - start
+    if formato == "csv":
+        linhas -= 1  # cabeçalho
+    return {"linhas": linhas, "mb": recebidos / 2**20, "segundos": segundos,
+            "antes": antes, "pico": memoria(pid)["VmHWM"]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--comparar", action="store_true", help="mede também o .all() + json.dumps")
+    args = parser.parse_args()
+
+    import httpx
+    from utils.security import create_access_token
+
+    engine = sqlite_engine()
+    banco = engine.url.database
+    start = time.perf_counter()
+    semear(engine, args.rows)
+    engine.dispose()
+    print(f"{args.rows} partes semeadas em {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory(prefix="lexsum-export-") as tmp:
+        proc, base_url = subir_api(banco, tmp)
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": "export@example.com"})}
+        try:
+            with httpx.Client(base_url=base_url, headers=headers, timeout=600) as client:
+                client.get("/api/parties", params={"limit": 1}).raise_for_status()  # aquece pool e imports
+                print(f"{'formato':12} {'linhas':>9} {'MB':>8} {'s':>7} {'MB/s':>7} {'linhas/s':>9} "
+                      f"{'RSS antes':>10} {'pico':>8} {'+MB':>7}")
+                for formato, gzip in FORMATOS:
+                    r = baixar(client, proc.pid, formato, gzip)
+                    nome = formato + (".gz" if gzip else "")
+                    print(f"{nome:12} {r['linhas']:9d} {r['mb']:8.1f} {r['segundos']:7.1f} "
+                          f"{r['mb'] / r['segundos']:7.1f} {r['linhas'] / r['segundos']:9.0f} "
+                          f"{r['antes']:10.0f} {r['pico']:8.0f} {r['pico'] - r['antes']:7.0f}")
+                    if r["linhas"] != args.rows:
+                        raise SystemExit(f"FALHOU: {nome} trouxe {r['linhas']} linhas, esperado {args.rows}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    if args.comparar:
+        saida = subprocess.run([sys.executable, "-c", INGENUO, f"sqlite:///{banco}"], cwd=BACKEND_DIR,
+                               env={**os.environ, "PYTHONPATH": BACKEND_DIR},
+                               capture_output=True, text=True, check=True)
+        r = json.loads(saida.stdout.strip().splitlines()[-1])
+        print(f"\n.all() + json.dumps: {r['linhas']} linhas, {r['mb']:.1f} MB; "
+              f"RSS antes {r['antes']:.0f} MB, pico {r['pico']:.0f} MB (+{r['pico'] - r['antes']:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Acurácia e latência do parser por regras de /api/parse-party-data sobre o
+corpus rotulado em benchmarks/data/qualificacao_corpus.jsonl.
+
+Textos marcados com "path": "llm" (pessoa jurídica, parte representada, união estável,
+texto corrido) têm de ir ao modelo: se as regras os aceitam, contam como aceitos
+indevidos, e os campos deles entram na acurácia como os dos demais.
+
+O modelo é substituído por um cliente falso que responde com o XML esperado
+após --llm-latency segundos, para comparar o caminho híbrido (regras + fallback)
+com o envio de todo texto ao modelo.
+
+Uso: python benchmarks/bench_party_parser.py [--llm-latency 1.5] [--repeat 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import timeit
+
+from _common import FakeOpenAI
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "qualificacao_corpus.jsonl")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-latency", type=float, default=1.5, help="latência simulada do modelo (s)")
+    parser.add_argument("--repeat", type=int, default=2000, help="repetições para medir o parser por regras")
+    args = parser.parse_args()
+
+    from core.config import settings
+    from services.llm_parser import solicitar_xml
+    from services.party_parser import ADDRESS_TAGS, PARTY_TAGS, parse_party_text, to_xml
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    client = FakeOpenAI({item["text"]: to_xml(item["expected"]) for item in corpus}, args.llm_latency)
+
+    tags = PARTY_TAGS + ADDRESS_TAGS
+    acertos = total = rules_path = 0
+    erros, indevidos = [], []
+    hybrid_seconds = 0.0
+    for item in corpus:
+        start = time.perf_counter()
+        result = parse_party_text(item["text"])
+        if result.confidence >= settings.PARTY_PARSER_MIN_CONFIDENCE:
+            rules_path += 1
+            if item.get("path") == "llm":
+                indevidos.append((result.confidence, item["text"]))
+            for tag in tags:
+                esperado, obtido = item["expected"].get(tag, ""), result.fields.get(tag, "")
+                total += 1
+                if esperado == obtido:
+                    acertos += 1
+                else:
+                    erros.append((tag, esperado, obtido))
+        else:
+            asyncio.run(solicitar_xml(client, item["text"]))
+        hybrid_seconds += time.perf_counter() - start
+
+    textos = [item["text"] for item in corpus]
+    rules_seconds = timeit.timeit(lambda: [parse_party_text(t) for t in textos], number=max(1, args.repeat // len(textos)))
+    rules_calls = max(1, args.repeat // len(textos)) * len(textos)
+
+    print(f"corpus: {len(corpus)} textos; resolvidos por regras: {rules_path}; enviados ao modelo: {client.calls}")
+    print(f"acurácia por campo no caminho de regras: {acertos}/{total} ({acertos / total:.1%})")
+    for tag, esperado, obtido in erros[:10]:
+        print(f"  {tag}: esperado={esperado!r} obtido={obtido!r}")
+    para_o_modelo = sum(item.get("path") == "llm" for item in corpus)
+    print(f"textos que deveriam ir ao modelo aceitos pelas regras: {len(indevidos)}/{para_o_modelo}")
+    for confianca, text in indevidos:
+        print(f"  {confianca:.3f} {text[:80]}")
+    print(f"latência do parser por regras: {rules_seconds / rules_calls * 1e6:.1f} µs/texto")
+    print(f"latência média híbrida:        {hybrid_seconds / len(corpus) * 1000:.1f} ms/texto")
+    print(f"latência média só modelo:      {args.llm_latency * 1000:.1f} ms/texto (simulada)")
+
+
+if __name__ == "__main__":
+    main()
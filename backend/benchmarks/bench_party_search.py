@@ -0,0 +1,174 @@
+"""
+Busca de partes por nome: índice de termos (/api/party/search) vs LIKE '%x%'.
+
+Gera --rows partes (80% PF, 20% PJ) com nomes brasileiros aleatórios direto
+via Core, constrói o índice com reconstruir_indice e mede p50/p95 de consultas
+comuns, raras, com acento/grafia alternativa e de páginas seguintes via cursor.
+Também mede o custo da atualização incremental (update de nome via ORM).
+
+Uso: python benchmarks/bench_party_search.py [--rows 1000000] [--repeat 20] [--db /tmp/busca.db]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from _common import percentiles, sqlite_engine
+
+PRENOMES = ["Maria", "José", "João", "Ana", "Antônio", "Francisco", "Carlos", "Paulo", "Pedro", "Lucas",
+            "Luiz", "Marcos", "Luís", "Gabriel", "Rafael", "Juliana", "Márcia", "Fernanda", "Patrícia",
+            "Aline", "Thiago", "Felipe", "Bruna", "Camila", "Amanda", "Letícia", "Joaquina", "Heloísa",
+            "Vitória", "Sebastião", "Raimundo", "Conceição", "Thaís", "Yasmin", "Wellington", "Philippe"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Sousa", "Rodrigues", "Ferreira", "Alves", "Pereira",
+              "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares",
+              "Fernandes", "Vieira", "Barbosa", "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes",
+              "Marques", "Machado", "Mendes", "Freitas", "Cardoso", "Ramos", "Gonçalves", "Araújo", "Brandão"]
+RAMOS = ["Comércio", "Transportes", "Serviços", "Engenharia", "Alimentos", "Tecnologia", "Advocacia", "Saúde"]
+
+CONSULTAS = [
+    ("sobrenome comum", "silva"),
+    ("prefixo de 2 letras", "ma"),
+    ("nome + sobrenome", "maria silva"),
+    ("prefixos parciais", "joa sant"),
+    ("sem acento", "joao brandao"),
+    ("grafia alternativa", "tiago souza"),
+    ("nome raro", "joaquina"),
+    ("razão social", "transportes ltda"),
+    ("sem resultado", "xpto"),
+]
+
+
+def gerar(engine, n: int, seed: int = 7):
+    from sqlalchemy import insert
+    from models.models import Partes, PessoaFisica, PessoaJuridica
+
+    rnd = random.Random(seed)
+    lote = 20000
+    with engine.begin() as conn:
+        for inicio in range(1, n + 1, lote):
+            partes, pf, pj = [], [], []
+            for i in range(inicio, min(n, inicio + lote - 1) + 1):
+                if rnd.random() < 0.8:
+                    partes.append({"id": i, "email": f"p{i}@exemplo.com", "tipo": "fisica"})
+                    nome = f"{rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+                    pf.append({"id": i, "nome": nome, "cpf": f"{i:011d}"})
+                else:
+                    partes.append({"id": i, "email": f"j{i}@exemplo.com", "tipo": "juridica"})
+                    razao = f"{rnd.choice(SOBRENOMES)} {rnd.choice(RAMOS)} LTDA"
+                    pj.append({"id": i, "razao_social": razao, "cnpj": f"{i:014d}",
+                               "nome_fantasia": f"{rnd.choice(SOBRENOMES)} {rnd.choice(RAMOS)}"})
+            conn.execute(insert(Partes), partes)
+            if pf:
+                conn.execute(insert(PessoaFisica), pf)
+            if pj:
+                conn.execute(insert(PessoaJuridica), pj)
+
+
+async def medir(database: str, consultas, repeat: int, paginas: int = 5):
+    """Para cada consulta: tempos da 1ª página, das páginas seguintes (cursor) e nº de resultados"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from services.party_search import buscar_partes
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+    medidas = {}
+    try:
+        async with async_sessionmaker(bind=engine)() as db:
+            for q in consultas:
+                await buscar_partes(db, q, 20)  # aquece o cache de páginas do SQLite
+                primeira, seguintes = [], []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    results, cursor = await buscar_partes(db, q, 20)
+                    primeira.append(time.perf_counter() - start)
+                    total = len(results)
+                    for _ in range(paginas - 1):
+                        if not cursor:
+                            break
+                        start = time.perf_counter()
+                        results, cursor = await buscar_partes(db, q, 20, cursor)
+                        seguintes.append(time.perf_counter() - start)
+                medidas[q] = (primeira, seguintes, total)
+    finally:
+        await engine.dispose()
+    return medidas
+
+
+def like_scan(engine, q: str, repeat: int):
+    from sqlalchemy import or_, select
+    from models.models import PessoaFisica, PessoaJuridica
+
+    padrao = f"%{q}%"
+    tempos = []
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(select(PessoaFisica.id, PessoaFisica.nome)
+                         .where(or_(PessoaFisica.nome.like(padrao), PessoaFisica.nome_social.like(padrao)))
+                         .order_by(PessoaFisica.nome).limit(20)).all()
+            conn.execute(select(PessoaJuridica.id, PessoaJuridica.razao_social)
+                         .where(or_(PessoaJuridica.razao_social.like(padrao), PessoaJuridica.nome_fantasia.like(padrao)))
+                         .order_by(PessoaJuridica.razao_social).limit(20)).all()
+            tempos.append(time.perf_counter() - start)
+    return tempos
+
+
+def ms(valores):
+    if not valores:
+        return "-"
+    p = percentiles(valores)
+    return f"p50={p['p50'] * 1000:.1f}ms p95={p['p95'] * 1000:.1f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="arquivo SQLite (reaproveitado se já existir)")
+    args = parser.parse_args()
+
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import sessionmaker
+    from models.models import PartySearch, PartySearchTermo, PessoaFisica
+    from services.party_search import reconstruir_indice
+
+    existente = args.db and os.path.exists(args.db)
+    engine = sqlite_engine(args.db)
+    if not existente:
+        start = time.perf_counter()
+        gerar(engine, args.rows)
+        print(f"carga de {args.rows:,} partes: {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            reconstruir_indice(conn, batch_size=5000)
+        elapsed = time.perf_counter() - start
+        print(f"construção do índice: {elapsed:.1f}s ({args.rows / elapsed:,.0f} partes/s)")
+    with engine.connect() as conn:
+        n_termos = conn.execute(select(func.count()).select_from(PartySearchTermo)).scalar()
+        n_partes = conn.execute(select(func.count()).select_from(PartySearch)).scalar()
+    print(f"índice: {n_partes:,} partes, {n_termos:,} termos ({os.path.getsize(engine.url.database) / 1e6:.0f} MB no arquivo)")
+
+    medidas = asyncio.run(medir(engine.url.database, [q for _, q in CONSULTAS], args.repeat))
+    for nome, q in CONSULTAS:
+        primeira, seguintes, total = medidas[q]
+        like = like_scan(engine, q.split()[0], max(1, args.repeat // 5))
+        print(f"{nome:20} '{q}': {total:2} resultados | 1ª página {ms(primeira)} | "
+              f"páginas 2-5 {ms(seguintes)} | LIKE '%{q.split()[0]}%' {ms(like)}")
+
+    # Atualização incremental via ORM: o evento do mapper reindexa a parte
+    Session = sessionmaker(bind=engine)
+    tempos = []
+    with Session() as db:
+        pessoas = db.scalars(select(PessoaFisica).limit(200)).all()
+        for i, pessoa in enumerate(pessoas):
+            start = time.perf_counter()
+            pessoa.nome = f"Nome Alterado {i}"
+            db.commit()
+            tempos.append(time.perf_counter() - start)
+    print(f"update de nome + reindexação (commit): {ms(tempos)}")
+    _, _, total = asyncio.run(medir(engine.url.database, ["nome alterado"], 1, 1))["nome alterado"]
+    print(f"após updates, 'nome alterado' retorna {total} resultados na 1ª página")
+
+
+if __name__ == "__main__":
+    main()
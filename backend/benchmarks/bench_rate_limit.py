@@ -0,0 +1,145 @@
+"""
+Rate limiting: custo por requisição e limite compartilhado entre workers.
+
+1. Overhead: a mesma rota com e sem @limiter.limit (+ limitar_conta), com storage
+   em memória e num Redis (fakeredis por TCP por padrão, ou --redis-url).
+2. Vários workers: N limiters independentes (um por processo de uvicorn) batendo
+   na mesma rota "5/minute". Em memória cada um conta separado (5×N passam);
+   com Redis o limite vale para o conjunto.
+3. Queda do storage: com o Redis fora, o fallback em memória segue limitando.
+
+Obs.: o fakeredis (pip install fakeredis lupa) é um servidor Python; um Redis de
+verdade responde bem mais rápido.
+
+Uso: python benchmarks/bench_rate_limit.py [--requests 2000] [--workers 4] [--redis-url redis://localhost:6379/0]
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+from _common import percentiles
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from slowapi.errors import RateLimitExceeded
+
+from services import rate_limit
+from services.rate_limit import criar_limiter, limitar_conta
+
+
+def fake_redis():
+    """Sobe um fakeredis TCP numa porta livre; retorna (url, server)"""
+    from fakeredis import TcpFakeServer
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0", server
+
+
+def montar_app(limiter, limite: str, por_conta: bool = False) -> FastAPI:
+    app = FastAPI()
+    app.state.limiter = limiter
+
+    @app.exception_handler(RateLimitExceeded)
+    async def _429(request: Request, exc: RateLimitExceeded):
+        return JSONResponse(status_code=429, content={"detail": rate_limit.MENSAGEM_429})
+
+    @app.post("/livre")
+    async def livre(request: Request):
+        return {"ok": True}
+
+    @app.post("/limitada")
+    @limiter.limit(limite)
+    async def limitada(request: Request):
+        if por_conta:
+            limitar_conta("bench", "usuario@example.com", limite)
+        return {"ok": True}
+
+    return app
+
+
+async def medir(app, rota: str, n: int):
+    tempos, status = [], {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(n):
+            start = time.perf_counter()
+            resp = await client.post(rota)
+            tempos.append((time.perf_counter() - start) * 1000)
+            status[resp.status_code] = status.get(resp.status_code, 0) + 1
+    return tempos, status
+
+
+async def overhead(storages, n: int):
+    print(f"== overhead por requisição ({n} req, limite alto para nunca bloquear)")
+    for nome, uri in storages:
+        for por_conta in (False, True):
+            limiter = criar_limiter(uri, enabled=True)
+            limiter.reset()
+            rate_limit.limiter = limiter
+            app = montar_app(limiter, "1000000/minute", por_conta)
+            base, _ = await medir(app, "/livre", n)
+            lim, _ = await medir(app, "/limitada", n)
+            b, l = percentiles(base), percentiles(lim)
+            rotulo = f"{nome}{' +conta' if por_conta else ''}"
+            print(f"{rotulo:16} sem limite p50={b['p50']:.3f}ms  com limite p50={l['p50']:.3f}ms "
+                  f"p99={l['p99']:.3f}ms  overhead p50={l['p50'] - b['p50']:.3f}ms")
+
+
+async def workers(storages, n_workers: int):
+    print(f"== {n_workers} workers, rota '5/minute', 10 tentativas por worker")
+    for nome, uri in storages:
+        apps = []
+        for i in range(n_workers):
+            limiter = criar_limiter(uri, enabled=True)
+            if i == 0:
+                limiter.reset()
+            apps.append(montar_app(limiter, "5/minute"))
+        aceitas = 0
+        for _ in range(10):
+            for app in apps:
+                _, status = await medir(app, "/limitada", 1)
+                aceitas += status.get(200, 0)
+        print(f"{nome:16} aceitas={aceitas} (esperado 5)")
+
+
+async def queda(uri: str, server):
+    print("== storage fora do ar")
+    limiter = criar_limiter(uri, enabled=True)
+    limiter.reset()
+    app = montar_app(limiter, "5/minute")
+    _, antes = await medir(app, "/limitada", 3)
+    server.shutdown()
+    server.server_close()
+    _, depois = await medir(app, "/limitada", 60)
+    print(f"antes da queda: {antes}; com o Redis fora (fallback em memória): {depois}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--redis-url", help="Redis real em vez do fakeredis")
+    args = parser.parse_args()
+
+    server = None
+    if args.redis_url:
+        redis_url = args.redis_url
+    else:
+        redis_url, server = fake_redis()
+    storages = [("memory://", "memory://"), ("redis", redis_url)]
+
+    await overhead(storages, args.requests)
+    await workers(storages, args.workers)
+    if server is not None:
+        await queda(redis_url, server)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
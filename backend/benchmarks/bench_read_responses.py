@@ -0,0 +1,118 @@
+"""
+Rotas de leitura: custo de serialização e bytes trafegados em consultas repetidas.
+
+1. Serialização: µs por resposta do caminho do response_model (validação e dump do
+   pydantic) com JSONResponse (json) e com ORJSONResponse, e do dict direto no
+   ORJSONResponse (rotas com ETag), para o corpo de /api/party, de /api/cep e de uma
+   página de /api/parties com --page itens.
+2. Consultas repetidas: --docs documentos consultados --repeat vezes em /api/party,
+   como o frontend faz. Sem If-None-Match toda resposta traz o corpo; com o ETag
+   guardado da primeira resposta (como o navegador faz com Cache-Control: no-cache) as
+   repetições voltam 304 sem corpo. Mostra requisições/s, bytes (status, cabeçalhos e
+   corpo) e a proporção de 304.
+
+Uso: python benchmarks/bench_read_responses.py [--seed 2000] [--docs 200] [--repeat 10] [--page 200]
+"""
+import argparse
+import time
+
+from _common import API_KEY, fake_cpf, fake_cnpj, override_db, seed_parties, sqlite_engine
+
+
+def corpos(page: int) -> dict:
+    """rota -> (corpo, response_model)"""
+    from schemas.schemas import CepResponse, PartyListPage, PartySearchResponse
+
+    itens = [{"id": i, "tipo": "fisica" if i % 2 else "juridica", "email": f"parte{i}@exemplo.com"}
+             for i in range(1, page + 1)]
+    return {
+        "/api/party": ({"name": "Maria da Conceição Souza"}, PartySearchResponse),
+        "/api/cep": ({"cep": "01310-100", "logradouro": "Avenida Paulista", "bairro": "Bela Vista",
+                      "cidade": "São Paulo", "uf": "SP"}, CepResponse),
+        f"/api/parties ({page})": ({"results": itens, "next_after_id": page}, PartyListPage),
+    }
+
+
+def medir_serializacao(corpo: dict, modelo, direto: bool, n: int) -> dict:
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    def dump():
+        return modelo.model_validate(corpo).model_dump(mode="json")
+
+    caminhos = {
+        "model + json": lambda: JSONResponse(dump()).body,
+        "model + orjson": lambda: ORJSONResponse(dump()).body,
+    }
+    if direto:  # rotas com ETag montam o dict e vão direto para o orjson
+        caminhos["orjson direto"] = lambda: ORJSONResponse(corpo).body
+    resultado = {}
+    for nome, fn in caminhos.items():
+        tamanho = len(fn())
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        resultado[nome] = ((time.perf_counter() - start) / n * 1e6, tamanho)
+    return resultado
+
+
+def bytes_da_resposta(r) -> int:
+    cabecalhos = sum(len(k) + len(v) + 4 for k, v in r.headers.raw)
+    return len(f"HTTP/1.1 {r.status_code} {r.reason_phrase}\r\n") + cabecalhos + 2 + len(r.content)
+
+
+def consultas_repetidas(client, docs, repeat: int, condicional: bool) -> dict:
+    etags = {}
+    total_bytes = nao_modificados = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for doc in docs:
+            headers = {"x-api-key": API_KEY}
+            if condicional and doc in etags:
+                headers["If-None-Match"] = etags[doc]
+            r = client.get("/api/party", params={"document": doc}, headers=headers)
+            if r.status_code == 304:
+                nao_modificados += 1
+            elif r.status_code == 200:
+                etags[doc] = r.headers["etag"]
+            else:
+                raise SystemExit(f"FALHOU: status {r.status_code} para {doc}")
+            total_bytes += bytes_da_resposta(r)
+    segundos = time.perf_counter() - start
+    n = repeat * len(docs)
+    return {"req_s": n / segundos, "bytes": total_bytes, "por_req": total_bytes / n, "304": nao_modificados / n}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=2000, help="PF e PJ cadastradas")
+    parser.add_argument("--docs", type=int, default=200, help="documentos distintos consultados")
+    parser.add_argument("--repeat", type=int, default=10, help="vezes que cada documento é consultado")
+    parser.add_argument("--page", type=int, default=200, help="itens na página de /api/parties")
+    parser.add_argument("--n", type=int, default=20000, help="serializações por medida")
+    args = parser.parse_args()
+
+    print(f"{'corpo':22} {'caminho':14} {'µs/resposta':>12} {'bytes':>7}")
+    for rota, (corpo, modelo) in corpos(args.page).items():
+        paginado = "parties" in rota
+        n = max(args.n // (args.page if paginado else 1), 200)
+        for nome, (us, tamanho) in medir_serializacao(corpo, modelo, not paginado, n).items():
+            print(f"{rota:22} {nome:14} {us:12.1f} {tamanho:7d}")
+
+    from fastapi.testclient import TestClient
+    from main import app
+
+    engine = sqlite_engine()
+    Session = override_db(app, engine)
+    seed_parties(Session, args.seed)
+    docs = [fake_cpf(i) if i % 2 else fake_cnpj(i) for i in range(1, args.docs + 1)]
+
+    print(f"\n/api/party: {args.docs} documentos x {args.repeat} consultas")
+    print(f"{'cliente':18} {'req/s':>8} {'bytes':>10} {'bytes/req':>10} {'304':>6}")
+    with TestClient(app) as client:
+        for nome, condicional in (("sem If-None-Match", False), ("com If-None-Match", True)):
+            r = consultas_repetidas(client, docs, args.repeat, condicional)
+            print(f"{nome:18} {r['req_s']:8.0f} {r['bytes']:10d} {r['por_req']:10.1f} {r['304']:6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cadastros por segundo: caminho antigo do signup vs INSERT único (cadastrar_usuario).
+
+- antigo: SELECT de existência do email + db.add/commit + refresh (outro SELECT)
+- novo: um INSERT; id pelo lastrowid; email/celular repetidos viram 409 pela constraint
+
+Roda --signups cadastros com --concurrency sessões simultâneas num SQLite (aiosqlite),
+contando os comandos SQL por cadastro: no MySQL cada um é uma ida e volta pela rede.
+Depois repete --signups / 10 cadastros com emails já usados (caminho do 409).
+Com --rounds > 0 inclui o hash bcrypt no executor (PasswordHasher), como na rota.
+
+Uso: python benchmarks/bench_signup.py [--signups 2000] [--concurrency 20] [--rounds 0]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from _common import sqlite_engine
+
+from fastapi import HTTPException
+from loguru import logger
+from sqlalchemy import event, select
+
+
+async def cadastro_antigo(db, dados: dict) -> int:
+    """O que o signup fazia: usuario_existe + criar_usuario"""
+    from models.models import Usuarios
+
+    existe = await db.execute(select(Usuarios.id).where(Usuarios.email == dados["email"]).limit(1))
+    if existe.first() is not None:
+        raise HTTPException(409, detail="Email já cadastrado")
+    usuario = Usuarios(**dados)
+    db.add(usuario)
+    await db.commit()
+    await db.refresh(usuario)
+    return usuario.id
+
+
+async def rodar(cadastrar, n: int, concurrency: int, rounds: int) -> dict:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from services.password_hasher import PasswordHasher
+
+    engine = sqlite_engine()
+    # SQLite serializa as escritas: uma conexão só, e as sessões esperam no pool em vez do lock do arquivo
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{engine.url.database}",
+                                       pool_size=1, max_overflow=0, pool_timeout=600)
+    Session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    hasher = PasswordHasher(rounds=rounds) if rounds else None
+    comandos = 0
+
+    def contar(*_):
+        nonlocal comandos
+        comandos += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", contar)
+    sem = asyncio.Semaphore(concurrency)
+    status = {}
+
+    async def um(j: int):
+        async with sem, Session() as db:
+            dados = {
+                "nome": "Usuário Bench", "email": f"u{j}@bench.example.com", "celular": f"11{j:09d}",
+                "hashed_password": await hasher.hash("Senha@123") if hasher else "x",
+                "verificado": False, "codigo_verificacao": "123456",
+                "codigo_expiracao": datetime.now() + timedelta(hours=24),
+            }
+            try:
+                await cadastrar(db, dados)
+                codigo = 200
+            except HTTPException as e:
+                codigo = e.status_code
+            status[codigo] = status.get(codigo, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(um(i) for i in range(n)))
+    novos = time.perf_counter() - start
+    comandos_novos, comandos = comandos, 0
+
+    repetidos = max(1, n // 10)
+    start = time.perf_counter()
+    await asyncio.gather(*(um(i % n) for i in range(repetidos)))
+    duplicados = time.perf_counter() - start
+
+    await async_engine.dispose()
+    engine.dispose()
+    if hasher:
+        hasher.shutdown()
+    return {
+        "por_segundo": n / novos,
+        "comandos": comandos_novos / n,
+        "dup_por_segundo": repetidos / duplicados,
+        "dup_comandos": comandos / repetidos,
+        "status": status,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--signups", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=0, help="custo do bcrypt; 0 mede só o banco")
+    args = parser.parse_args()
+    logger.remove()  # os logs de cadastro no stderr pesariam mais que o banco
+
+    from services.user_service import cadastrar_usuario
+
+    print(f"{args.signups} cadastros, {args.concurrency} simultâneos, bcrypt {args.rounds or 'desligado'}")
+    for nome, cadastrar in (("antigo (SELECT + ORM + refresh)", cadastro_antigo), ("novo (INSERT único)", cadastrar_usuario)):
+        r = await rodar(cadastrar, args.signups, args.concurrency, args.rounds)
+        print(f"{nome:32} {r['por_segundo']:8.0f} cadastros/s  {r['comandos']:.1f} comandos/cadastro   "
+              f"duplicados: {r['dup_por_segundo']:6.0f}/s {r['dup_comandos']:.1f} comandos   status {r['status']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
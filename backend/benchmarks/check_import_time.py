@@ -0,0 +1,98 @@
+"""
+Orçamento de tempo de import da app (python -X importtime -c "import main").
+
+Roda o import em processos novos, a partir de um diretório temporário e sem nenhuma
+variável do Settings no ambiente: importar a app não pode exigir o system.env nem
+depender do diretório atual. Sai com código 1 se o import falhar, se o tempo
+(mediana de --runs) passar de --budget-ms ou se algum módulo que deveria ser
+carregado só no primeiro uso (driver do banco, openai, passlib, jose, bcrypt, slowapi)
+aparecer no import.
+
+Uso: python benchmarks/check_import_time.py [--runs 5] [--budget-ms 1600] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from _common import BACKEND_DIR, BENCH_ENV
+
+# Carregados sob demanda: engines no lifespan, cliente do modelo no start, hash/JWT/limiter
+# no primeiro uso, numpy na primeira validação de documentos em lote
+PREGUICOSOS = (
+    "openai", "passlib", "jose", "bcrypt", "slowapi", "limits", "pymysql", "aiomysql", "aiosqlite", "redis",
+    "numpy",
+)
+
+
+def ambiente_limpo() -> dict:
+    from core.config import Settings
+
+    campos = set(Settings.model_fields) | set(BENCH_ENV)
+    env = {k: v for k, v in os.environ.items() if k.upper() not in campos}
+    env["PYTHONPATH"] = BACKEND_DIR
+    return env
+
+
+def importar(env: dict, cwd: str):
+    """[(módulo, próprio µs, acumulado µs)] de um `import main` num processo novo"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=cwd, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"FALHOU: import main sem o ambiente completo\n{proc.stderr[-2000:]}")
+    modulos = []
+    for linha in proc.stderr.splitlines():
+        if not linha.startswith("import time:") or "[us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        modulos.append((nome.strip(), int(proprio), int(acumulado)))
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1600.0)
+    parser.add_argument("--top", type=int, default=15, help="maiores pacotes a listar")
+    args = parser.parse_args()
+
+    env = ambiente_limpo()
+    with tempfile.TemporaryDirectory(prefix="lexsum-import-") as cwd:
+        rodadas = [importar(env, cwd) for _ in range(args.runs)]
+
+    totais = [next(acc for nome, _, acc in modulos if nome == "main") / 1000 for modulos in rodadas]
+    total = statistics.median(totais)
+
+    # Custo por pacote de primeiro nível (soma do tempo próprio de cada módulo), na rodada mediana
+    modulos = rodadas[totais.index(sorted(totais)[len(totais) // 2])]
+    por_pacote = {}
+    for nome, proprio, _ in modulos:
+        pacote = nome.split(".")[0]
+        por_pacote[pacote] = por_pacote.get(pacote, 0) + proprio
+    print(f"{'pacote':28} {'ms':>8}")
+    for pacote, us in sorted(por_pacote.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{pacote:28} {us / 1000:8.1f}")
+
+    carregados = {nome for nome, *_ in modulos}
+    indevidos = sorted(m for m in PREGUICOSOS if m in carregados)
+
+    print(f"\nimport main: mediana {total:.0f}ms (min {min(totais):.0f}ms, max {max(totais):.0f}ms) "
+          f"em {args.runs} processos; orçamento {args.budget_ms:.0f}ms")
+    erros = []
+    if total > args.budget_ms:
+        erros.append(f"import acima do orçamento: {total:.0f}ms > {args.budget_ms:.0f}ms")
+    if indevidos:
+        erros.append(f"importados no boot (deveriam ser sob demanda): {', '.join(indevidos)}")
+    for erro in erros:
+        print(f"FALHOU: {erro}")
+    if erros:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
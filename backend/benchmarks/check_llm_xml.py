@@ -0,0 +1,139 @@
+"""
+Confere que respostas do modelo no formato real viram campos de PartyData.
+
+O SYSTEM_PROMPT pede só as tags (<name>, ..., <address>...</address>), sem elemento
+raiz, e o modelo costuma cercar com ```xml ou pôr texto em volta. Passa respostas
+nesses formatos por from_xml e pelo /api/parse-party-data/batch?formato=json, com um
+FakeOpenAI no lugar do modelo, e confere que /api/parse-party-data devolve o mesmo
+formato de XML (o de to_xml) pelo modelo e pelas regras. Respostas sem as tags de
+PartyData têm de dar 502 e não 200 com campos vazios, e não podem ficar no cache de
+respostas (memória e SQLite): repetida, a requisição volta ao modelo, e uma resposta
+inválida gravada antes sai do cache. Sai com código 1 se algum campo não for extraído,
+se os formatos divergirem ou se uma resposta inválida passar ou ficar no cache.
+
+Uso: python benchmarks/check_llm_xml.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from _common import FakeOpenAI
+
+TAGS = (
+    "<name>Maria Souza &amp; Filhos</name>\n<nationality>brasileira</nationality>\n"
+    "<maritalStatus>Casado(a)</maritalStatus>\n<profession>médica</profession>\n<rg>12.345.678-9</rg>\n"
+    "<orgaoExpedidor>SSP/SP</orgaoExpedidor>\n<dataExpedicao></dataExpedicao>\n<email></email>\n<phone></phone>\n"
+    "<address>\n  <street>Avenida Paulista</street>\n  <number>1000</number>\n  <complement></complement>\n"
+    "  <neighborhood>Bela Vista</neighborhood>\n  <city>São Paulo</city>\n  <state>SP</state>\n"
+    "  <cep>01310-100</cep>\n</address>"
+)
+ESPERADO = {
+    "name": "Maria Souza & Filhos", "nationality": "brasileira", "maritalStatus": "Casado(a)",
+    "profession": "médica", "rg": "12.345.678-9", "orgaoExpedidor": "SSP/SP", "street": "Avenida Paulista",
+    "number": "1000", "neighborhood": "Bela Vista", "city": "São Paulo", "state": "SP", "cep": "01310-100",
+}
+QUALIFICACAO = ("MARIA SOUZA, brasileira, casada, médica, residente na Avenida Paulista, nº 1000, "
+                "Bela Vista, São Paulo/SP, CEP 01310-100")
+RESPOSTAS = {
+    "tags soltas": TAGS,
+    "cerca ```xml": f"```xml\n{TAGS}\n```",
+    "declaração e texto em volta": f'Segue o XML:\n<?xml version="1.0" encoding="UTF-8"?>\n{TAGS}\nEspero ter ajudado.',
+    "raiz <party>": f"<party>{TAGS}</party>",
+    "& sem escape": TAGS.replace("&amp;", "&"),
+}
+INVALIDAS = {
+    "sem tags de PartyData": "<resposta><nome>Maria Souza</nome><cidade>São Paulo</cidade></resposta>",
+    "sem XML": "Não foi possível identificar os dados da parte.",
+    "truncada no endereço": TAGS[:-40],
+}
+
+
+def main():
+    import httpx
+    import services.party_parse as party_parse
+    from main import app
+    from services.cache import InMemoryLRUCache
+    from services.cache import MISSING
+    from services.llm_cache import LLMResponseCache, SqliteResponseStore, cache_key
+    from services.llm_parser import MODEL, SYSTEM_PROMPT
+    from services.llm_client import LLMClient
+    from services.party_parser import from_xml
+
+    falhas = 0
+    for nome, resposta in RESPOSTAS.items():
+        campos = from_xml(resposta)
+        ok = campos == ESPERADO
+        falhas += not ok
+        print(f"{'ok  ' if ok else 'FALHOU'} from_xml: {nome}" + ("" if ok else f" -> {campos}"))
+
+    for nome, resposta in INVALIDAS.items():
+        try:
+            from_xml(resposta)
+            ok = False
+        except ValueError:
+            ok = True
+        falhas += not ok
+        print(f"{'ok  ' if ok else 'FALHOU'} from_xml recusa: {nome}")
+
+    # Textos fora do formato de qualificação: todos vão para o modelo
+    textos = [f"texto livre {i}, que as regras não resolvem" for i in range(len(RESPOSTAS))]
+    invalidos = [f"texto livre {nome}, que as regras não resolvem" for nome in INVALIDAS]
+    fake = FakeOpenAI(answers={**dict(zip(textos, RESPOSTAS.values())), **dict(zip(invalidos, INVALIDAS.values()))})
+    party_parse.llm_client = LLMClient(api_key="check", client=fake)
+    store = SqliteResponseStore(os.path.join(tempfile.mkdtemp(prefix="lexsum-check-"), "llm.db"))
+    party_parse.llm_cache = LLMResponseCache(InMemoryLRUCache(maxsize=100), store)
+    # Resposta inválida já no cache (gravada por uma versão que não validava)
+    antiga = "texto livre com resposta antiga no cache, que as regras não resolvem"
+    chave_antiga = cache_key(antiga, MODEL, SYSTEM_PROMPT)
+    store.set(chave_antiga, INVALIDAS["sem tags de PartyData"])
+
+    async def chamar():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            r = await client.post("/api/parse-party-data/batch", params={"formato": "json"}, json={"texts": textos})
+            r.raise_for_status()
+            itens = [item for item in map(json.loads, r.text.splitlines()) if "index" in item]
+            unicos = [await client.post("/api/parse-party-data", json={"text": t}) for t in (*textos, QUALIFICACAO)]
+            antes = fake.calls
+            recusados = [await client.post("/api/parse-party-data", json={"text": t}) for t in invalidos * 2]
+            chamadas = fake.calls - antes
+            recusados.append(await client.post("/api/parse-party-data", json={"text": antiga}))
+            return itens, unicos, recusados, chamadas
+
+    itens, unicos, recusados, chamadas = asyncio.run(chamar())
+    for item in sorted(itens, key=lambda item: item["index"]):
+        nome = list(RESPOSTAS)[item["index"]]
+        ok = item["status"] == "ok" and item["path"] == "llm" and item.get("fields") == ESPERADO
+        falhas += not ok
+        print(f"{'ok  ' if ok else 'FALHOU'} lote json: {nome}" + ("" if ok else f" -> {item}"))
+
+    for nome, r in zip((*RESPOSTAS, "regras"), unicos):
+        caminho = r.headers.get("x-parse-path")
+        esperado = "rules" if nome == "regras" else "llm"
+        ok = (r.status_code == 200 and caminho == esperado and r.text.startswith("<party>")
+              and (esperado == "rules" or from_xml(r.text) == ESPERADO))
+        falhas += not ok
+        print(f"{'ok  ' if ok else 'FALHOU'} /parse-party-data ({caminho}): {nome}" + ("" if ok else f" -> {r.text}"))
+
+    for nome, r in zip((*INVALIDAS, *INVALIDAS, "antiga no cache"), recusados):
+        ok = r.status_code == 502
+        falhas += not ok
+        print(f"{'ok  ' if ok else 'FALHOU'} /parse-party-data recusa ({r.status_code}): {nome}")
+
+    ok = chamadas == 2 * len(INVALIDAS)
+    falhas += not ok
+    print(f"{'ok  ' if ok else 'FALHOU'} respostas inválidas fora do cache: {chamadas} chamadas ao modelo "
+          f"para {2 * len(INVALIDAS)} requisições")
+    ok = store.get(chave_antiga) is None and party_parse.llm_cache.memory.get(chave_antiga) is MISSING
+    falhas += not ok
+    print(f"{'ok  ' if ok else 'FALHOU'} resposta inválida antiga descartada do cache")
+
+    if falhas:
+        sys.exit(f"{falhas} verificações falharam")
+    print("respostas do modelo interpretadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Confere que GET /api/parties faz um número constante de comandos SQL por página.
+
+Semeia um usuário com --rows partes (PF e PJ, algumas com soft delete), percorre
+todas as páginas com vários valores de limit contando os comandos enviados ao banco
+(evento before_cursor_execute) e sai com código 1 se o número por página variar
+com o limit ou se a paginação por keyset pular/repetir alguma parte.
+
+Uso: python benchmarks/check_party_list_statements.py [--rows 500]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from _common import override_db, sqlite_engine
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+
+LIMITES = (1, 10, 50, 200)
+
+
+def semear(Session, rows: int) -> set:
+    from models.models import Partes, PessoaFisica, PessoaJuridica, Usuarios
+
+    agora = datetime.utcnow()
+    with Session() as db:
+        db.execute(insert(Usuarios), [
+            {"id": 1, "nome": "Dono", "email": "dono@example.com", "celular": "11900000001", "hashed_password": "x"},
+            {"id": 2, "nome": "Outro", "email": "outro@example.com", "celular": "11900000002", "hashed_password": "x"},
+        ])
+        db.execute(insert(Partes), [
+            {"id": i, "tipo": "fisica" if i % 4 else "juridica", "email": f"parte{i}@example.com",
+             "cidade": "São Paulo", "uf": "SP", "usuario_id": 1 if i % 3 else 2,
+             "deleted_at": agora if i % 11 == 0 else None}
+            for i in range(1, rows + 1)
+        ])
+        db.execute(insert(PessoaFisica), [
+            {"id": i, "cpf": f"{i:011d}", "nome": f"Pessoa {i}"} for i in range(1, rows + 1) if i % 4
+        ])
+        db.execute(insert(PessoaJuridica), [
+            {"id": i, "cnpj": f"{i:014d}", "razao_social": f"Empresa {i}"} for i in range(1, rows + 1) if not i % 4
+        ])
+        db.commit()
+    return {i for i in range(1, rows + 1) if i % 3 and i % 11}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+
+    from main import app
+    from utils.security import create_access_token
+
+    engine = sqlite_engine()
+    Session = override_db(app, engine)
+    esperados = semear(Session, args.rows)
+
+    comandos = []
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _contar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'dono@example.com'})}"}
+    ok = True
+    por_pagina = set()
+    with TestClient(app) as client:
+        for limite in LIMITES:
+            vistos, after_id, paginas, inicio = [], None, [], time.perf_counter()
+            while True:
+                comandos.clear()
+                params = {"limit": limite, **({"after_id": after_id} if after_id is not None else {})}
+                resp = client.get("/api/parties", params=params, headers=headers)
+                resp.raise_for_status()
+                page = resp.json()
+                paginas.append(len(comandos))
+                for item in page["results"]:
+                    vistos.append(item["id"])
+                    ok &= item["nome"] is not None and item["documento"] is not None
+                after_id = page["next_after_id"]
+                if after_id is None:
+                    break
+            ms = (time.perf_counter() - inicio) * 1000 / len(paginas)
+            completo = vistos == sorted(esperados)
+            ok &= completo
+            por_pagina.update(paginas)
+            print(f"limit={limite:4} páginas={len(paginas):4} comandos/página={sorted(set(paginas))} "
+                  f"{ms:.1f}ms/página {'ok' if completo else 'FALHA: partes puladas ou repetidas'}")
+
+    constante = len(por_pagina) == 1
+    print(f"comandos por página {'constantes' if constante else 'VARIAM com o limit'}: {sorted(por_pagina)}")
+    sys.exit(0 if ok and constante else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Confere com EXPLAIN que as consultas de services/queries.py usam os índices esperados.
+
+Cria o schema pelas migrações (alembic upgrade head) num SQLite temporário, semeia
+usuários e partes (uma parte das partes com soft delete), roda ANALYZE e verifica o
+plano de cada consulta: se alguma passar a varrer a tabela, sai com código 1.
+Com --database-url roda contra um MySQL já migrado (EXPLAIN tradicional, coluna key).
+
+Uso: python benchmarks/check_query_plans.py [--rows 5000] [--database-url mysql+pymysql://...]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime
+
+import _common  # noqa: F401  configura sys.path e o ambiente
+
+from alembic import command
+from sqlalchemy import create_engine, insert, text
+from create_tables import alembic_config
+from models.models import Partes, PessoaFisica, PessoaJuridica, Usuarios
+from services import queries
+from services.party_export import COLUNAS
+
+# consulta -> {tabela: índices aceitos}; nomes do SQLite e do MySQL para as constraints unique
+ESPERADO = {
+    "usuario_ativo_por_email": {"usuarios": {"ix_usuarios_email"}},
+    "partes_ativas_do_usuario": {"partes": {"ix_partes_usuario_active"}},
+    "partes_ativas_do_usuario (after_id)": {"partes": {"ix_partes_usuario_active"}},
+    "listagem_partes_do_usuario": {
+        "partes": {"ix_partes_usuario_active"},
+        "pessoa_fisica": {"PRIMARY KEY", "PRIMARY"},
+        "pessoa_juridica": {"PRIMARY KEY", "PRIMARY"},
+    },
+    "exportacao_partes_do_usuario": {
+        "partes": {"ix_partes_usuario_active"},
+        "pessoa_fisica": {"PRIMARY KEY", "PRIMARY"},
+        "pessoa_juridica": {"PRIMARY KEY", "PRIMARY"},
+    },
+    "nomes_ativos_por_cpf": {
+        "pessoa_fisica": {"sqlite_autoindex_pessoa_fisica_1", "cpf"},
+        "partes": {"PRIMARY KEY", "PRIMARY"},
+    },
+    "nomes_ativos_por_cnpj": {
+        "pessoa_juridica": {"sqlite_autoindex_pessoa_juridica_1", "cnpj"},
+        "partes": {"PRIMARY KEY", "PRIMARY"},
+    },
+}
+
+
+def consultas():
+    return {
+        "usuario_ativo_por_email": queries.usuario_ativo_por_email("usuario7@example.com"),
+        "partes_ativas_do_usuario": queries.partes_ativas_do_usuario(3),
+        "partes_ativas_do_usuario (after_id)": queries.partes_ativas_do_usuario(3, after_id=100),
+        "listagem_partes_do_usuario": queries.listagem_partes_do_usuario(3, after_id=100),
+        "exportacao_partes_do_usuario": queries.exportacao_partes_do_usuario(3, COLUNAS),
+        "nomes_ativos_por_cpf": queries.nomes_ativos_por_cpf(["00000000191", "00000000272"]),
+        "nomes_ativos_por_cnpj": queries.nomes_ativos_por_cnpj(["00000000000191"]),
+    }
+
+
+def semear(connection, rows: int) -> None:
+    random.seed(13)
+    agora = datetime.utcnow()
+    connection.execute(insert(Usuarios), [
+        {"id": i, "nome": f"Usuário {i}", "email": f"usuario{i}@example.com", "celular": f"119{i:08d}",
+         "hashed_password": "x", "deleted_at": agora if i % 10 == 0 else None}
+        for i in range(1, 51)
+    ])
+    connection.execute(insert(Partes), [
+        {"id": i, "tipo": "fisica" if i % 5 else "juridica", "email": f"parte{i}@example.com",
+         "usuario_id": random.randint(1, 50), "deleted_at": agora if i % 7 == 0 else None}
+        for i in range(1, rows + 1)
+    ])
+    connection.execute(insert(PessoaFisica), [
+        {"id": i, "cpf": f"{i:011d}", "nome": f"Pessoa {i}"} for i in range(1, rows + 1) if i % 5
+    ])
+    connection.execute(insert(PessoaJuridica), [
+        {"id": i, "cnpj": f"{i:014d}", "razao_social": f"Empresa {i}"} for i in range(1, rows + 1) if not i % 5
+    ])
+    connection.execute(text("ANALYZE"))
+
+
+def plano_sqlite(connection, sql: str) -> dict:
+    """{tabela: [detalhes]} a partir do EXPLAIN QUERY PLAN"""
+    plano = {}
+    for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"):
+        detalhe = row[-1]
+        partes = detalhe.split()
+        if partes[0] in ("SCAN", "SEARCH"):
+            plano.setdefault(partes[1], []).append(detalhe)
+    return plano
+
+
+def plano_mysql(connection, sql: str) -> dict:
+    plano = {}
+    for row in connection.exec_driver_sql(f"EXPLAIN {sql}").mappings():
+        plano.setdefault(row["table"], []).append(f"type={row['type']} key={row['key']}")
+    return plano
+
+
+def usa_indice(detalhes, aceitos) -> bool:
+    for detalhe in detalhes:
+        if detalhe.startswith("SCAN") and "INDEX" not in detalhe:
+            return False
+        if detalhe.startswith("type=ALL"):
+            return False
+    return any(nome in detalhe.replace("key=", " ").split() or f"INDEX {nome}" in detalhe
+               or (nome == "PRIMARY KEY" and "PRIMARY KEY" in detalhe)
+               for detalhe in detalhes for nome in aceitos)
+
+
+def verificar(connection) -> bool:
+    dialect = connection.dialect
+    explicar = plano_sqlite if dialect.name == "sqlite" else plano_mysql
+    ok = True
+    for nome, stmt in consultas().items():
+        sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        plano = explicar(connection, sql)
+        for tabela, aceitos in ESPERADO[nome].items():
+            detalhes = plano.get(tabela, [])
+            passou = usa_indice(detalhes, aceitos)
+            ok &= passou
+            print(f"{'ok  ' if passou else 'FALHA'} {nome:38} {tabela:16} {' | '.join(detalhes) or '(ausente)'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--database-url", help="banco já migrado (não é semeado)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+        with engine.connect() as connection:
+            ok = verificar(connection)
+    else:
+        fd, path = tempfile.mkstemp(prefix="lexsum-plans-", suffix=".db")
+        os.close(fd)
+        try:
+            engine = create_engine(f"sqlite:///{path}")
+            with engine.begin() as connection:
+                command.upgrade(alembic_config(connection), "head")
+                semear(connection, args.rows)
+            with engine.connect() as connection:
+                ok = verificar(connection)
+            engine.dispose()
+        finally:
+            os.remove(path)
+
+    print("planos ok" if ok else "algum plano deixou de usar o índice esperado")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
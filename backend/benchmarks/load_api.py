@@ -0,0 +1,369 @@
+"""
+Carga na API inteira contra dublês locais, com baseline em JSON e verificação de regressão.
+
+- Banco: SQLite temporário criado pelas migrações (padrão) ou --database-url de um
+  MySQL/MariaDB local descartável (ex.: mysqld --initialize-insecure num diretório
+  temporário), também migrado com alembic upgrade head. O banco deve estar vazio.
+- Modelo: o OpenAI falso de _mock_openai.py, com latência --llm-latency.
+- App: `uvicorn main:app` num processo separado (--workers), com rate limit e envio
+  de emails desligados; a carga sai deste processo por HTTP de verdade.
+
+Semeia --users usuários verificados, --pending usuários aguardando o código e
+--parties partes (PF e PJ), e roda --concurrency clientes por --duration segundos
+(após --warmup), sorteando a operação de cada requisição pelos pesos de --mix:
+
+  signup, login, protegido, verificar-codigo, party (GET /api/party),
+  parse (POST /api/parse-party-data: metade qualificações do corpus, resolvidas
+  pelas regras; metade texto livre sorteado entre --parse-textos, via modelo + cache)
+
+Reporta vazão e p50/p95/p99 por operação. --save-baseline grava o resultado em
+--baseline; --check compara com ele e sai com código 1 se o p50 (e o p95, nas operações
+com amostras suficientes) subir ou a vazão cair mais que --tolerance, ou se a taxa de
+erro subir mais de 1 ponto.
+A baseline só vale para a máquina e a configuração em que foi gravada (ambas vão
+no JSON): ao trocar de máquina, grave outra.
+
+Uso: python benchmarks/load_api.py [--duration 20] [--concurrency 20] [--workers 1]
+        [--mix signup=5,login=10,protegido=35,verificar-codigo=5,party=25,parse=20]
+        [--database-url mysql+pymysql://root@127.0.0.1:3307/carga] [--output resultado.json]
+        [--save-baseline | --check] [--baseline benchmarks/baselines/load_api.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from _common import BACKEND_DIR, BENCH_ENV, fake_cnpj, fake_cpf, percentiles
+from _mock_openai import MockOpenAIServer, _porta_livre
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load_api.json")
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "qualificacao_corpus.jsonl")
+MIX_PADRAO = "signup=5,login=10,protegido=35,verificar-codigo=5,party=25,parse=20"
+MIN_AMOSTRAS_P95 = 300  # abaixo disso o p95 de uma operação é ruído demais para comparar
+SENHA = "Senha@123"
+CODIGO = "123456"
+
+
+def ler_mix(texto: str) -> dict:
+    mix = {}
+    for item in texto.split(","):
+        nome, _, peso = item.partition("=")
+        if nome.strip() not in OPERACOES:
+            raise SystemExit(f"operação desconhecida no --mix: {nome} (use {', '.join(OPERACOES)})")
+        mix[nome.strip()] = float(peso)
+    return mix
+
+
+def urls(database_url: str, tmp: str):
+    """(url sync, url async) do banco da carga"""
+    if not database_url:
+        caminho = os.path.join(tmp, "carga.db")
+        return f"sqlite:///{caminho}", f"sqlite+aiosqlite:///{caminho}"
+    driver, _, resto = database_url.partition("://")
+    return database_url, f"mysql+aiomysql://{resto}" if driver.startswith("mysql") else database_url
+
+
+def preparar_banco(url: str, args) -> dict:
+    """Migra e semeia o banco; retorna o que os clientes precisam (emails, documentos)"""
+    from alembic import command
+    from sqlalchemy import create_engine, insert
+    from create_tables import alembic_config
+    from models.models import Partes, PessoaFisica, PessoaJuridica, Usuarios
+    from utils.security import hash_senha
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        command.upgrade(alembic_config(conn), "head")
+
+    hashed = hash_senha(SENHA, args.bcrypt_rounds)  # o mesmo hash para todos: semear sem pagar bcrypt por usuário
+    verificados = [f"usuario{i}@carga.example.com" for i in range(args.users)]
+    pendentes = [f"pendente{i}@carga.example.com" for i in range(args.pending)]
+    expiracao = datetime.now() + timedelta(days=1)
+    usuarios = [
+        {"id": i + 1, "nome": "Usuário Carga", "email": email, "celular": f"11{i:09d}",
+         "hashed_password": hashed, "verificado": i < args.users,
+         "codigo_verificacao": None if i < args.users else CODIGO,
+         "codigo_expiracao": None if i < args.users else expiracao}
+        for i, email in enumerate(verificados + pendentes)
+    ]
+    partes, fisicas, juridicas, documentos = [], [], [], []
+    for i in range(1, args.parties + 1):
+        tipo = "fisica" if i % 2 else "juridica"
+        partes.append({"id": i, "tipo": tipo, "email": f"parte{i}@carga.example.com", "cidade": "São Paulo",
+                       "uf": "SP", "usuario_id": i % max(1, args.users) + 1})
+        if tipo == "fisica":
+            fisicas.append({"id": i, "nome": f"Pessoa Carga {i}", "cpf": fake_cpf(i)})
+            documentos.append(fake_cpf(i))
+        else:
+            juridicas.append({"id": i, "razao_social": f"Empresa Carga {i} LTDA", "cnpj": fake_cnpj(i)})
+            documentos.append(fake_cnpj(i))
+
+    with engine.begin() as conn:
+        for tabela, linhas in ((Usuarios, usuarios), (Partes, partes), (PessoaFisica, fisicas), (PessoaJuridica, juridicas)):
+            if linhas:
+                conn.execute(insert(tabela), linhas)
+    engine.dispose()
+    return {"verificados": verificados, "pendentes": pendentes, "documentos": documentos}
+
+
+def subir_api(url_sync: str, url_async: str, mock: MockOpenAIServer, args, tmp: str):
+    porta = _porta_livre("127.0.0.1")
+    env = {
+        **os.environ, **BENCH_ENV,
+        "DATABASE_URL_OVERRIDE": url_sync,
+        "ASYNC_DATABASE_URL_OVERRIDE": url_async,
+        "OPENAI_BASE_URL": mock.base_url,
+        "OPENAI_MAX_RETRIES": "0",
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "RATE_LIMIT_ENABLED": "false",  # poucos IPs e emails repetidos: o limite mediria só 429
+        "EMAIL_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+        "LOG_FILE": "",
+    }
+    saida = open(os.path.join(tmp, "uvicorn.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(porta),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env, stdout=saida, stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{porta}"
+
+    import httpx
+
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if proc.poll() is not None:
+            saida.flush()
+            raise SystemExit(f"uvicorn terminou na subida:\n{open(saida.name).read()[-3000:]}")
+        try:
+            httpx.get(f"{base_url}/protegido", timeout=1)
+            return proc, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("uvicorn não respondeu em 60s")
+
+
+class Contexto:
+    """Estado compartilhado pelos clientes: contas semeadas, tokens, códigos pendentes"""
+
+    def __init__(self, dados: dict, args):
+        from core.config import settings
+        from utils.security import create_access_token
+
+        self.verificados = dados["verificados"]
+        self.pendentes = deque(dados["pendentes"])
+        self.documentos = dados["documentos"]
+        self.tokens = [create_access_token({"sub": email}) for email in self.verificados[:100]]
+        self.api_key = settings.SECRET_API_KEY
+        self.cadastros = itertools.count()
+        with open(CORPUS, encoding="utf-8") as f:
+            self.corpus = [json.loads(linha)["text"] for linha in f if linha.strip()]
+        self.parse_textos = args.parse_textos
+
+
+# Cada operação faz uma requisição e diz se a resposta foi a esperada
+async def op_signup(client, ctx: Contexto, rnd: random.Random) -> bool:
+    n = next(ctx.cadastros)
+    r = await client.post("/signup", json={
+        "nome": "Cliente Carga", "email": f"novo{n}@carga.example.com", "telefone": f"21{n:09d}", "senha": SENHA,
+    })
+    # confere o corpo também: status e user_id vêm da resposta do cadastro
+    return r.status_code == 200 and (r.json() or {}).get("status") == "pending_verification"
+
+
+async def op_login(client, ctx: Contexto, rnd: random.Random) -> bool:
+    r = await client.post("/login", json={"email": rnd.choice(ctx.verificados), "senha": SENHA})
+    return r.status_code == 200
+
+
+async def op_protegido(client, ctx: Contexto, rnd: random.Random) -> bool:
+    r = await client.get("/protegido", headers={"Authorization": f"Bearer {rnd.choice(ctx.tokens)}"})
+    return r.status_code == 200
+
+
+async def op_verificar(client, ctx: Contexto, rnd: random.Random) -> bool:
+    # Acabados os pendentes, segue com contas já verificadas (caminho "Usuário já verificado")
+    email = ctx.pendentes.popleft() if ctx.pendentes else rnd.choice(ctx.verificados)
+    r = await client.post("/verificar-codigo", json={"email": email, "codigo": CODIGO})
+    return r.status_code == 200
+
+
+async def op_party(client, ctx: Contexto, rnd: random.Random) -> bool:
+    r = await client.get("/api/party", params={"document": rnd.choice(ctx.documentos)},
+                         headers={"x-api-key": ctx.api_key})
+    return r.status_code == 200 and r.json().get("name") is not None
+
+
+async def op_parse(client, ctx: Contexto, rnd: random.Random) -> bool:
+    if rnd.random() < 0.5:
+        texto = rnd.choice(ctx.corpus)
+    else:
+        texto = f"O autor é o Sr. Fulano {rnd.randrange(ctx.parse_textos)}, que mora em Santos há muitos anos"
+    r = await client.post("/api/parse-party-data", json={"text": texto})
+    return r.status_code == 200
+
+
+OPERACOES = {
+    "signup": op_signup,
+    "login": op_login,
+    "protegido": op_protegido,
+    "verificar-codigo": op_verificar,
+    "party": op_party,
+    "parse": op_parse,
+}
+
+
+async def carga(base_url: str, ctx: Contexto, mix: dict, args) -> dict:
+    import httpx
+
+    nomes, pesos = list(mix), list(mix.values())
+    amostras = {nome: [] for nome in nomes}
+    erros = {nome: 0 for nome in nomes}
+    inicio_medicao = time.perf_counter() + args.warmup
+    fim = inicio_medicao + args.duration
+
+    async def cliente(i: int, client):
+        rnd = random.Random(args.seed * 1000 + i)
+        while (agora := time.perf_counter()) < fim:
+            nome = rnd.choices(nomes, pesos)[0]
+            try:
+                ok = await OPERACOES[nome](client, ctx, rnd)
+            except httpx.HTTPError:
+                ok = False
+            if agora >= inicio_medicao:
+                amostras[nome].append((time.perf_counter() - agora) * 1000)
+                erros[nome] += not ok
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(cliente(i, client) for i in range(args.concurrency)))
+
+    resultado = {}
+    for nome in nomes:
+        if amostras[nome]:
+            p = percentiles(amostras[nome])
+            resultado[nome] = {
+                "requests": len(amostras[nome]),
+                "rps": len(amostras[nome]) / args.duration,
+                "error_rate": erros[nome] / len(amostras[nome]),
+                **{k: round(v, 2) for k, v in p.items()},
+            }
+    todas = [ms for lista in amostras.values() for ms in lista]
+    if todas:
+        resultado["total"] = {
+            "requests": len(todas),
+            "rps": len(todas) / args.duration,
+            "error_rate": sum(erros.values()) / len(todas),
+            **{k: round(v, 2) for k, v in percentiles(todas).items()},
+        }
+    return resultado
+
+
+def imprimir(resultado: dict) -> None:
+    print(f"{'operação':18} {'reqs':>7} {'req/s':>8} {'erros':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for nome, r in resultado["ops"].items():
+        print(f"{nome:18} {r['requests']:7d} {r['rps']:8.1f} {r['error_rate']:7.1%} "
+              f"{r['p50']:8.1f} {r['p95']:8.1f} {r['p99']:8.1f}")
+
+
+def comparar(resultado: dict, baseline: dict, tolerancia: float) -> list:
+    """Regressões em relação à baseline, uma string por métrica"""
+    if resultado["config"] != baseline["config"]:
+        print("AVISO: configuração diferente da baseline; a comparação pode não fazer sentido")
+    regressoes = []
+    for nome, base in baseline["ops"].items():
+        atual = resultado["ops"].get(nome)
+        if atual is None:
+            continue
+        metricas = ("p50", "p95") if min(atual["requests"], base["requests"]) >= MIN_AMOSTRAS_P95 else ("p50",)
+        for metrica in metricas:
+            if atual[metrica] > base[metrica] * (1 + tolerancia):
+                regressoes.append(f"{nome}: {metrica} {base[metrica]:.1f}ms -> {atual[metrica]:.1f}ms")
+        if atual["rps"] < base["rps"] * (1 - tolerancia):
+            regressoes.append(f"{nome}: vazão {base['rps']:.1f} -> {atual['rps']:.1f} req/s")
+        if atual["error_rate"] > base["error_rate"] + 0.01:
+            regressoes.append(f"{nome}: erros {base['error_rate']:.1%} -> {atual['error_rate']:.1%}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=20.0, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=3.0, help="segundos descartados no início")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="workers do uvicorn")
+    parser.add_argument("--mix", default=MIX_PADRAO)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--pending", type=int, default=200, help="usuários aguardando verificação")
+    parser.add_argument("--parties", type=int, default=2000)
+    parser.add_argument("--parse-textos", type=int, default=200, help="textos livres distintos no parse")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--bcrypt-rounds", type=int, default=8)
+    parser.add_argument("--database-url", help="MySQL descartável (sync, ex.: mysql+pymysql://...); padrão SQLite")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="grava o resultado em JSON")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="compara com a baseline; sai 1 se regredir")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    args = parser.parse_args()
+    mix = ler_mix(args.mix)
+
+    with tempfile.TemporaryDirectory(prefix="lexsum-carga-") as tmp:
+        url_sync, url_async = urls(args.database_url, tmp)
+        dados = preparar_banco(url_sync, args)
+        ctx = Contexto(dados, args)
+        with MockOpenAIServer(latency=args.llm_latency) as mock:
+            proc, base_url = subir_api(url_sync, url_async, mock, args, tmp)
+            try:
+                ops = asyncio.run(carga(base_url, ctx, mix, args))
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+            chamadas_modelo = mock.requests
+
+    resultado = {
+        "config": {
+            "duration": args.duration, "concurrency": args.concurrency, "workers": args.workers, "mix": mix,
+            "users": args.users, "parties": args.parties, "parse_textos": args.parse_textos,
+            "llm_latency": args.llm_latency, "bcrypt_rounds": args.bcrypt_rounds,
+            "database": "mysql" if args.database_url else "sqlite",
+        },
+        "machine": {"python": platform.python_version(), "cpus": os.cpu_count(), "platform": platform.platform()},
+        "ops": ops,
+        "llm_calls": chamadas_modelo,
+    }
+    imprimir(resultado)
+    print(f"chamadas ao modelo falso: {chamadas_modelo}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"baseline gravada em {args.baseline}")
+    if args.check:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressoes = comparar(resultado, json.load(f), args.tolerance)
+        for regressao in regressoes:
+            print(f"REGRESSÃO: {regressao}")
+        if regressoes:
+            sys.exit(1)
+        print(f"sem regressões (tolerância {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Carga em /login enquanto mede a latência de /protegido no mesmo worker.
+
+Com o bcrypt no event loop (--inline), cada login congela o worker e o p99
+de /protegido cresce com a carga de login; com o PasswordHasher ele fica
+próximo do valor sem carga. Os números só são representativos com mais
+núcleos do que PASSWORD_HASH_WORKERS: com um único núcleo as threads do
+bcrypt disputam a CPU com o event loop.
+
+Uso: python benchmarks/load_login_protegido.py [--logins 200] [--concurrency 20] [--inline]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# Todos os logins são do mesmo email: sem isso o limite por conta responde 429 antes do bcrypt
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+from _common import dispose_async_engines, override_db, percentiles, seed_user, sqlite_engine  # noqa: E402
+
+
+async def medir_protegido(client, headers, stop: asyncio.Event, samples: list, interval: float = 0.01):
+    # Latência medida a partir do horário agendado, para que um event loop
+    # travado apareça nas amostras (evita a omissão coordenada)
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        resp = await client.get("/protegido", headers=headers)
+        resp.raise_for_status()
+        now = time.perf_counter()
+        samples.append((now - scheduled) * 1000)
+        scheduled = max(scheduled + interval, now)
+
+
+async def martelar_login(client, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def um_login():
+        async with sem:
+            await client.post("/login", json={"email": "bench@exemplo.com", "senha": "Senha@123"})
+
+    await asyncio.gather(*(um_login() for _ in range(n)))
+
+
+async def rodar(app, logins: int, concurrency: int, token: str):
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        baseline, sob_carga = [], []
+
+        stop = asyncio.Event()
+        task = asyncio.create_task(medir_protegido(client, headers, stop, baseline))
+        await asyncio.sleep(1.0)
+        stop.set()
+        await task
+
+        stop = asyncio.Event()
+        task = asyncio.create_task(medir_protegido(client, headers, stop, sob_carga))
+        start = time.perf_counter()
+        await martelar_login(client, logins, concurrency)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await task
+    await dispose_async_engines()
+
+    return baseline, sob_carga, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12, help="custo do bcrypt do usuário semeado")
+    parser.add_argument("--inline", action="store_true", help="executa o bcrypt no event loop (comportamento antigo)")
+    args = parser.parse_args()
+
+    import main as app_module
+    from services.password_hasher import PasswordHasher
+    from utils.security import create_access_token
+
+    if args.inline:
+        class InlineHasher(PasswordHasher):
+            async def _run(self, operacao, fn, *fn_args):
+                return fn(*fn_args)
+
+        app_module.password_hasher = InlineHasher()
+
+    engine = sqlite_engine()
+    Session = override_db(app_module.app, engine)
+    seed_user(Session, "bench@exemplo.com", "Senha@123", rounds=args.rounds)
+    token = create_access_token({"sub": "bench@exemplo.com"})
+
+    baseline, sob_carga, elapsed = asyncio.run(rodar(app_module.app, args.logins, args.concurrency, token))
+
+    modo = "inline (event loop)" if args.inline else "PasswordHasher"
+    print(f"modo: {modo}")
+    print(f"logins: {args.logins} em {elapsed:.2f}s ({args.logins / elapsed:.1f}/s)")
+    for nome, samples in (("/protegido sem carga", baseline), ("/protegido com carga", sob_carga)):
+        p = percentiles(samples)
+        print(f"{nome}: n={len(samples)} p50={p['p50']:.2f}ms p95={p['p95']:.2f}ms p99={p['p99']:.2f}ms")
+    print("hasher:", app_module.password_hasher.stats())
+
+
+if __name__ == "__main__":
+    main()
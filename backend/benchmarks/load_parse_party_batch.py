@@ -0,0 +1,113 @@
+"""
+/api/parse-party-data/batch contra um servidor OpenAI falso local, com latência por texto.
+
+Sobe `uvicorn main:app` num processo separado (o ASGITransport do httpx junta o corpo
+inteiro e esconderia o streaming) apontando OPENAI_BASE_URL para o mock. Cada um dos
+--parties textos cai no caminho do modelo e recebe uma latência entre --min-latency e
+--latency. Mede:
+- sequencial: um POST /api/parse-party-data por parte, um depois do outro (como o
+  frontend faz hoje); o total fica perto da soma das latências
+- lote: um POST /batch com todas as partes no mesmo texto, separadas no servidor; o
+  total fica perto da maior latência (com --concurrency >= --parties), e cada linha
+  chega quando a parte dela fica pronta, não no fim
+
+Uso: python benchmarks/load_parse_party_batch.py [--parties 12] [--latency 1.0] [--concurrency 8]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from _common import sqlite_engine
+from _mock_openai import MockOpenAIServer
+from bench_party_export import subir_api
+
+
+def textos(prefixo: str, n: int):
+    return [f"{prefixo} parte {i}: o Sr. Fulano {i}, que mora em Santos há muitos anos" for i in range(n)]
+
+
+def sequencial(client, lista) -> float:
+    start = time.perf_counter()
+    for text in lista:
+        client.post("/api/parse-party-data", json={"text": text}).raise_for_status()
+    return time.perf_counter() - start
+
+
+def lote(client, lista):
+    """(total, [(segundos até a linha chegar, item)], resumo)"""
+    chegadas, resumo = [], None
+    start = time.perf_counter()
+    with client.stream("POST", "/api/parse-party-data/batch", json={"text": "\n\n".join(lista)}) as r:
+        r.raise_for_status()
+        for linha in r.iter_lines():
+            item = json.loads(linha)
+            if "summary" in item:
+                resumo = item["summary"]
+            else:
+                chegadas.append((time.perf_counter() - start, item))
+    return time.perf_counter() - start, chegadas, resumo
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parties", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=1.0, help="maior latência do modelo falso (s)")
+    parser.add_argument("--min-latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8, help="PARTY_PARSE_BATCH_CONCURRENCY")
+    args = parser.parse_args()
+
+    import httpx
+
+    rnd = random.Random(42)
+    seq, batch = textos("Sequencial", args.parties), textos("Lote", args.parties)
+    latencias = {}
+    for grupo in (seq, batch):
+        valores = [rnd.uniform(args.min_latency, args.latency) for _ in grupo[1:]] + [args.latency]
+        rnd.shuffle(valores)
+        latencias.update(zip(grupo, valores))
+
+    engine = sqlite_engine()
+    banco = engine.url.database
+    engine.dispose()
+
+    with MockOpenAIServer(latencies=latencias) as mock, tempfile.TemporaryDirectory(prefix="lexsum-batch-") as tmp:
+        proc, base_url = subir_api(
+            banco, tmp,
+            OPENAI_BASE_URL=mock.base_url, OPENAI_MAX_RETRIES="0",
+            OPENAI_MAX_CONCURRENCY=str(max(args.concurrency, 10)),
+            PARTY_PARSE_BATCH_CONCURRENCY=str(args.concurrency),
+            PARTY_PARSE_BATCH_MAX_ITEMS=str(max(args.parties, 50)),
+        )
+        try:
+            with httpx.Client(base_url=base_url, timeout=300) as client:
+                client.post("/api/parse-party-data", json={"text": "aquecimento"})  # pool e imports
+                mock.max_in_flight = 0
+                t_seq = sequencial(client, seq)
+                pico_seq, mock.max_in_flight = mock.max_in_flight, 0
+                t_lote, chegadas, resumo = lote(client, batch)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"{args.parties} partes, latência do modelo {args.min_latency:.1f}–{args.latency:.1f}s, "
+          f"concorrência por lote {args.concurrency}")
+    print(f"sequencial: {t_seq:6.2f}s  (soma das latências {sum(latencias[t] for t in seq):.2f}s; "
+          f"pico simultâneo no mock: {pico_seq})")
+    print(f"lote:       {t_lote:6.2f}s  (maior latência {args.latency:.2f}s, soma "
+          f"{sum(latencias[t] for t in batch):.2f}s; pico simultâneo no mock: {mock.max_in_flight}); "
+          f"primeira linha em {chegadas[0][0]:.2f}s" if chegadas else "lote: nenhuma linha")
+    print(f"ganho: {t_seq / t_lote:.1f}x; resumo do servidor: {resumo}")
+    print(f"{'index':>5} {'latência':>9} {'chegou em':>10} {'ms (item)':>10} status")
+    for chegou, item in chegadas:
+        print(f"{item['index']:5d} {latencias[batch[item['index']]]:8.2f}s {chegou:9.2f}s "
+              f"{item['ms']:10.0f} {item['status']}")
+
+    erros = [item for _, item in chegadas if item["status"] != "ok"]
+    if len(chegadas) != args.parties or erros or sorted(i["index"] for _, i in chegadas) != list(range(args.parties)):
+        raise SystemExit(f"FALHOU: {len(chegadas)} linhas, {len(erros)} erros")
+
+
+if __name__ == "__main__":
+    main()
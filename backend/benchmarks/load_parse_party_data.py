@@ -0,0 +1,87 @@
+"""
+Carga em /api/parse-party-data contra um servidor OpenAI falso local.
+
+Dispara --requests textos distintos (todos caem no caminho do modelo, sem
+acerto de cache) e compara o tempo total com latência × requisições: com o
+cliente assíncrono as chamadas se sobrepõem até --max-concurrency, e o número
+de conexões TCP abertas no mock mostra o reaproveitamento do keep-alive.
+
+Uso: python benchmarks/load_parse_party_data.py [--requests 100] [--latency 0.5] [--max-concurrency 20]
+"""
+import argparse
+import asyncio
+import time
+
+from _common import percentiles
+from _mock_openai import MockOpenAIServer
+
+
+async def rodada(app, textos):
+    import httpx
+
+    latencias = []
+
+    async def um(client, text):
+        start = time.perf_counter()
+        r = await client.post("/api/parse-party-data", json={"text": text})
+        latencias.append(time.perf_counter() - start)
+        return r
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        start = time.perf_counter()
+        respostas = await asyncio.gather(*(um(client, t) for t in textos))
+        elapsed = time.perf_counter() - start
+    return respostas, latencias, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5, help="latência do modelo falso (s)")
+    parser.add_argument("--max-concurrency", type=int, default=20)
+    parser.add_argument("--max-connections", type=int, default=20)
+    args = parser.parse_args()
+
+    import services.party_parse as party_parse
+    from main import app
+    from services.cache import InMemoryLRUCache
+    from services.llm_cache import LLMResponseCache
+    from services.llm_client import LLMClient
+
+    textos = [f"O autor é o Sr. Fulano {i}, que mora em Santos há muitos anos" for i in range(args.requests)]
+
+    with MockOpenAIServer(latency=args.latency) as mock:
+        client = LLMClient(
+            api_key="bench",
+            base_url=mock.base_url,
+            max_connections=args.max_connections,
+            max_concurrency=args.max_concurrency,
+            max_retries=0,
+        )
+        party_parse.llm_client = client
+        party_parse.llm_cache = LLMResponseCache(InMemoryLRUCache(maxsize=args.requests * 2))
+
+        async def executar():
+            await client.start()
+            try:
+                return await rodada(app, textos)
+            finally:
+                await client.aclose()
+
+        respostas, latencias, elapsed = asyncio.run(executar())
+
+    status = {r.status_code for r in respostas}
+    serial = args.latency * args.requests
+    ideal = args.latency * -(-args.requests // args.max_concurrency)
+    p = percentiles(latencias)
+    print(f"{args.requests} requisições em {elapsed:.2f}s (status {sorted(status)})")
+    print(f"serial seria {serial:.2f}s; ideal com {args.max_concurrency} simultâneas: {ideal:.2f}s")
+    print(f"latência p50={p['p50'] * 1000:.0f}ms p95={p['p95'] * 1000:.0f}ms p99={p['p99'] * 1000:.0f}ms")
+    print(f"mock: {mock.requests} chamadas, pico simultâneo {mock.max_in_flight}, "
+          f"{len(mock.connections)} conexões TCP")
+    print("cliente:", client.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import argparse
+import io
+import os
+import time
+from core.config import settings
+from services.cep_index import construir_indice, ler_csv_correios
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera o índice local de CEPs a partir de um CSV dos Correios")
+    parser.add_argument("arquivo", help="CSV com cabeçalho: cep, logradouro, bairro, cidade (ou localidade), uf")
+    parser.add_argument("--destino", default=settings.CEP_INDEX_FILE, help="padrão: CEP_INDEX_FILE")
+    parser.add_argument("--encoding", default="utf-8-sig", help="ex.: latin-1 para os arquivos dos Correios")
+    args = parser.parse_args()
+
+    print(f"Gerando índice de CEPs a partir de {args.arquivo}...")
+    start = time.perf_counter()
+    with io.open(args.arquivo, encoding=args.encoding, newline="") as stream:
+        total = construir_indice(ler_csv_correios(stream), args.destino)
+    print(f"Índice gravado em {args.destino}: {total} CEPs, {os.path.getsize(args.destino) / 2**20:.1f} MB "
+          f"em {time.perf_counter() - start:.1f}s")
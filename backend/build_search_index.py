@@ -0,0 +1,11 @@
+from core.db import iniciar_engine
+from models import models  # Garante que todos os modelos sejam importados e registrados
+from services.party_search import reconstruir_indice
+
+
+if __name__ == "__main__":
+    print("Reconstruindo índice de busca de partes...")
+    engine = iniciar_engine()
+    with engine.begin() as connection:
+        total = reconstruir_indice(connection)
+    print(f"Índice reconstruído: {total} partes.")
@@ -1,16 +1,27 @@
-from pydantic_settings import BaseSettings
-from pydantic import Field
+import os
+from pathlib import Path
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, field_validator
 from typing import Optional
-from dotenv import load_dotenv
+from core.lazy import LazyProxy
 
-# Garante o carregamento do arquivo correto
-load_dotenv(dotenv_path="../.env/system.env")
+# <raiz do projeto>/.env/system.env, independente do diretório de onde o processo foi iniciado.
+# Variáveis de ambiente têm precedência sobre o arquivo.
+ENV_FILE = Path(__file__).resolve().parents[2] / ".env" / "system.env"
+# backend/: arquivos de dados com caminho relativo partem daqui, não do diretório atual
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=ENV_FILE, env_file_encoding="utf-8", extra="ignore")
+
     # Segurança JWT
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Cache de tokens já verificados (limitado também pelo exp de cada token)
+    JWT_CACHE_ENABLED: bool = True
+    JWT_CACHE_MAXSIZE: int = 10000
+    JWT_CACHE_MAX_TTL: int = 300
 
     # Banco de dados MySQL
     MYSQL_USERNAME_ADMIN: str = Field(..., env="MYSQL_USERNAME_ADMIN")
@@ -26,12 +37,122 @@ class Settings(BaseSettings):
 
     # Chave OpenAI
     OPENAI_KEY: str = Field(..., env="OPENAI_KEY")
+    OPENAI_BASE_URL: Optional[str] = None  # servidor compatível (ex.: mock local nos testes de carga)
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_MAX_CONCURRENCY: int = 10
+    OPENAI_MAX_RETRIES: int = 2
+    # Abaixo desta confiança o parser por regras delega o texto ao modelo
+    PARTY_PARSER_MIN_CONFIDENCE: float = 0.8
+    # /api/parse-party-data/batch: partes por lote e chamadas simultâneas ao modelo por lote
+    PARTY_PARSE_BATCH_MAX_ITEMS: int = 50
+    PARTY_PARSE_BATCH_CONCURRENCY: int = 8
+    # Cache das respostas do modelo (memória + SQLite opcional)
+    LLM_CACHE_MAXSIZE: int = 2000
+    LLM_CACHE_TTL: int = 7 * 24 * 3600
+    LLM_CACHE_SQLITE_PATH: Optional[str] = None
+
+    # Hash de senhas (bcrypt) fora do event loop
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" ou "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # Envio de emails pela fila em background
+    EMAIL_ENABLED: bool = False
+    EMAIL_FROM: str = "nao-responda@lexsum.com.br"
+    EMAIL_WORKERS: int = 2
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_MAX_RETRIES: int = 5
+    EMAIL_QUEUE_MAXSIZE: int = 10000
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_STARTTLS: bool = False
+    SMTP_TIMEOUT: int = 10
+
+    # Rate limiting (slowapi/limits). Com mais de um worker use um storage compartilhado,
+    # ex.: redis://localhost:6379/0; "memory://" conta separado em cada processo
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE_URI: str = "memory://"
+    RATE_LIMIT_STRATEGY: str = "fixed-window"  # ou "moving-window", "sliding-window-counter"
+    RATE_LIMIT_FALLBACK: str = "30/minute"  # por IP, em memória, enquanto o storage estiver fora
+    RATE_LIMIT_LOGIN_IP: str = "20/minute"
+    RATE_LIMIT_LOGIN_CONTA: str = "10/15minutes"
+    RATE_LIMIT_SIGNUP_IP: str = "5/minute"
+    RATE_LIMIT_SIGNUP_CONTA: str = "3/hour"
+    RATE_LIMIT_VERIFICACAO_IP: str = "5/minute"
+    RATE_LIMIT_VERIFICACAO_CONTA: str = "10/hour"
+
+    # Logs (loguru): sempre via fila; "json" em produção, "text" para ler no terminal
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_FILE: Optional[str] = "logs/app.log"
+    LOG_SAMPLE_RATE: float = 1.0  # fração emitida dos logs de alto volume (amostrado()), ex.: 0.1
+
+    # Métricas Prometheus por requisição (/api/metrics) e log de requisições lentas
+    METRICS_ENABLED: bool = True
+    METRICS_SLOW_REQUEST_MS: Optional[float] = None  # ex.: 1000; None desliga o log (e a coleta do SQL)
+    METRICS_SLOW_MAX_SQL: int = 50  # comandos SQL guardados por requisição para o log
+
+    # Cache documento -> nome do /api/party (segundos)
+    PARTY_CACHE_MAXSIZE: int = 10000
+    PARTY_CACHE_TTL: int = 300
+    PARTY_CACHE_NEGATIVE_TTL: int = 60
+
+    # Exportação de partes (/api/parties/export): linhas lidas do cursor e serializadas por bloco
+    PARTY_EXPORT_YIELD_PER: int = 2000
+
+    # Índice local de CEPs (/api/cep e preenchimento de endereço no parse); gerado por build_cep_index.py
+    # (caminho relativo vale a partir de backend/)
+    CEP_INDEX_FILE: Optional[str] = os.path.join(BACKEND_DIR, "data", "cep.idx")
+
+    # Cache-Control das rotas de leitura com ETag (core/http_cache.py). "no-cache" guarda e
+    # revalida a cada uso (304 sem corpo); o CEP só muda quando o índice é regerado
+    READ_CACHE_CONTROL: str = "private, no-cache"
+    CEP_CACHE_CONTROL: str = "private, max-age=86400"
+
+    # Substituem as URLs montadas a partir do MySQL (ex.: sqlite+aiosqlite:///./teste.db)
+    DATABASE_URL_OVERRIDE: Optional[str] = None
+    ASYNC_DATABASE_URL_OVERRIDE: Optional[str] = None
+
+    # Pool de conexões (valem para os engines sync e async)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # abaixo do wait_timeout do MySQL
+    # "optimistic": sem ping no checkout, conta com pool_recycle e invalida o pool ao detectar desconexão
+    # "pessimistic": pool_pre_ping, um round trip extra a cada checkout
+    DB_DISCONNECT_STRATEGY: str = "optimistic"
+    DB_LEAK_THRESHOLD: int = 60  # segundos com a conexão fora do pool
+
+    @field_validator("CEP_INDEX_FILE")
+    @classmethod
+    def _relativo_ao_backend(cls, caminho: Optional[str]) -> Optional[str]:
+        if caminho and not os.path.isabs(caminho):
+            return os.path.join(BACKEND_DIR, caminho)
+        return caminho
+
+    def _mysql_url(self, driver: str) -> str:
+        from urllib.parse import quote_plus
+        escaped_pw = quote_plus(self.MYSQL_PASSWORD_ADMIN)
+        return f"mysql+{driver}://{self.MYSQL_USERNAME_ADMIN}:{escaped_pw}@{self.MYSQL_HOST}/{self.MYSQL_DATABASE}"
 
     # URL de conexão MySQL já montada
     @property
     def DATABASE_URL(self) -> str:
-        from urllib.parse import quote_plus
-        escaped_pw = quote_plus(self.MYSQL_PASSWORD_ADMIN)
-        return f"mysql+pymysql://{self.MYSQL_USERNAME_ADMIN}:{escaped_pw}@{self.MYSQL_HOST}/{self.MYSQL_DATABASE}"
+        return self.DATABASE_URL_OVERRIDE or self._mysql_url("pymysql")
+
+    # URL de conexão para o engine async das rotas
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return self.ASYNC_DATABASE_URL_OVERRIDE or self._mysql_url("aiomysql")
+
+# Lido só no primeiro acesso (ou definido pelo create_app): importar a app não exige o ambiente completo
+settings = LazyProxy(Settings)
+
 
-settings = Settings()
+def get_settings() -> Settings:
+    return settings._carregar()
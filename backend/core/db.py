@@ -1,21 +1,117 @@
 # db.py
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
-from urllib.parse import quote_plus
-from core.config import settings  # Certifique-se de definir essas variáveis no seu arquivo de configuração
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from core.config import Settings, settings  # Certifique-se de definir essas variáveis no seu arquivo de configuração
+from core.pool_monitor import PoolMonitor
+from core.request_metrics import instrumentar_engine
+from typing import AsyncGenerator, Generator, Optional
 
-encoded_password = quote_plus(settings.MYSQL_PASSWORD_ADMIN)
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{settings.MYSQL_USERNAME_ADMIN}:{encoded_password}@{settings.MYSQL_HOST}/{settings.MYSQL_DATABASE}"
+DISCONNECT_STRATEGIES = ("optimistic", "pessimistic")
+
+
+def engine_options(config: Settings) -> dict:
+    """Parâmetros de pool comuns aos engines sync e async"""
+    if config.DB_DISCONNECT_STRATEGY not in DISCONNECT_STRATEGIES:
+        raise ValueError(f"DB_DISCONNECT_STRATEGY inválida: {config.DB_DISCONNECT_STRATEGY}")
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_DISCONNECT_STRATEGY == "pessimistic",
+    }
+
+
+def criar_engine(config: Settings, monitor: PoolMonitor):
+    """Engine sync: scripts como create_tables.py e tarefas fora do event loop"""
+    engine = create_engine(config.DATABASE_URL, poolclass=monitor.instrumented(QueuePool), **engine_options(config))
+    monitor.attach(engine)
+    if config.METRICS_ENABLED:
+        instrumentar_engine(engine, "sync")
+    return engine
+
+
+def criar_async_engine(config: Settings, monitor: PoolMonitor):
+    """Engine async: rotas FastAPI (aiomysql em produção, aiosqlite nos testes)"""
+    engine = create_async_engine(
+        config.ASYNC_DATABASE_URL, poolclass=monitor.instrumented(AsyncAdaptedQueuePool), **engine_options(config)
+    )
+    monitor.attach(engine.sync_engine)
+    if config.METRICS_ENABLED:
+        instrumentar_engine(engine.sync_engine, "async")
+    return engine
+
+
+pool_monitors = {
+    "sync": PoolMonitor("sync"),
+    "async": PoolMonitor("async"),
+}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Criados por iniciar_engine()/iniciar_async_engine() (lifespan da app, scripts):
+# importar o módulo não lê o Settings nem importa o driver do banco
+engine = None
+async_engine = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def iniciar_engine(config: Optional[Settings] = None):
+    """Cria (uma vez por processo) o engine sync e liga o SessionLocal a ele"""
+    global engine
+    if engine is None:
+        config = config or settings
+        pool_monitors["sync"].leak_threshold = config.DB_LEAK_THRESHOLD
+        engine = criar_engine(config, pool_monitors["sync"])
+        SessionLocal.configure(bind=engine)
+    return engine
+
+
+def iniciar_async_engine(config: Optional[Settings] = None):
+    """Cria (uma vez por processo) o engine async e liga o AsyncSessionLocal a ele"""
+    global async_engine
+    if async_engine is None:
+        config = config or settings
+        pool_monitors["async"].leak_threshold = config.DB_LEAK_THRESHOLD
+        async_engine = criar_async_engine(config, pool_monitors["async"])
+        AsyncSessionLocal.configure(bind=async_engine)
+    return async_engine
+
+
+async def fechar_engines() -> None:
+    global engine, async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+    if engine is not None:
+        engine.dispose()
+        engine = None
+
+
+def pool_stats() -> dict:
+    return {name: monitor.stats() for name, monitor in pool_monitors.items()}
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """
+    Fábrica de sessões para respostas em streaming: a sessão do get_async_db fecha antes
+    do corpo ser enviado, então o gerador abre a sua. Como dependência, pode ser trocada
+    em app.dependency_overrides junto com get_async_db
+    """
+    return AsyncSessionLocal
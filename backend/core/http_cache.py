@@ -0,0 +1,37 @@
+"""
+Respostas condicionais das rotas de leitura: ETag fraco, If-None-Match -> 304 e Cache-Control.
+
+O ETag vem da versão dos dados (ex.: Partes.updated_at, a versão do índice de CEP) e não
+do corpo serializado, então a rota decide o 304 antes de montar e serializar a resposta.
+"""
+import hashlib
+from typing import Any
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+
+def etag_fraco(*partes: Any) -> str:
+    chave = "\x1f".join(map(str, partes)).encode("utf-8")
+    return f'W/"{hashlib.blake2b(chave, digest_size=12).hexdigest()}"'
+
+
+def etag_confere(request: Request, etag: str) -> bool:
+    """If-None-Match com comparação fraca (RFC 9110): W/"x" e "x" são o mesmo"""
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == "*":
+        return True
+    alvo = etag.removeprefix("W/")
+    return any(candidato.strip().removeprefix("W/") == alvo for candidato in cabecalho.split(","))
+
+
+def nao_modificado(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def resposta_condicional(request: Request, etag: str, conteudo: Any, cache_control: str) -> Response:
+    """304 se o cliente já tem esta versão; senão o JSON (orjson, sem jsonable_encoder) com o ETag"""
+    if etag_confere(request, etag):
+        return nao_modificado(etag, cache_control)
+    return ORJSONResponse(conteudo, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,48 @@
+import threading
+from typing import Callable
+
+
+class LazyProxy:
+    """
+    Objeto criado só no primeiro uso, pela fábrica informada. Permite manter singletons
+    de módulo (settings, llm_client, password_hasher...) sem que o import do módulo leia o
+    Settings, abra arquivos ou importe dependências pesadas. Atributos são repassados ao objeto.
+    """
+
+    __slots__ = ("_fabrica", "_objeto", "_lock")
+
+    def __init__(self, fabrica: Callable[[], object]):
+        object.__setattr__(self, "_fabrica", fabrica)
+        object.__setattr__(self, "_objeto", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _carregar(self):
+        objeto = self._objeto
+        if objeto is None:
+            with self._lock:
+                if self._objeto is None:
+                    object.__setattr__(self, "_objeto", self._fabrica())
+                objeto = self._objeto
+        return objeto
+
+    def _carregado(self) -> bool:
+        return self._objeto is not None
+
+    def _definir(self, objeto) -> None:
+        """Usa um objeto pronto (ex.: o Settings passado ao create_app)"""
+        object.__setattr__(self, "_objeto", objeto)
+
+    def _descartar(self) -> None:
+        """O próximo uso chama a fábrica de novo"""
+        object.__setattr__(self, "_objeto", None)
+
+    def __getattr__(self, nome: str):
+        return getattr(self._carregar(), nome)
+
+    def __setattr__(self, nome: str, valor) -> None:
+        setattr(self._carregar(), nome, valor)
+
+    def __repr__(self) -> str:
+        if self._objeto is None:
+            return f"<LazyProxy {getattr(self._fabrica, '__name__', self._fabrica)!s} (não criado)>"
+        return repr(self._objeto)
@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import Dict, Type
+from sqlalchemy import event
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+from services.logger import logger
+
+
+class PoolMonitor:
+    """Estatísticas de um pool de conexões: uso, overflow, espera e vazamentos"""
+
+    def __init__(self, name: str, leak_threshold: float = 60.0):
+        self.name = name
+        self.leak_threshold = leak_threshold
+        self.engine = None
+        self._lock = threading.Lock()
+        self._checked_out_at: Dict[int, float] = {}
+        self.connects = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.leaks_detected = 0
+
+    def instrumented(self, pool_cls: Type[Pool]) -> Type[Pool]:
+        """Subclasse do pool que mede o tempo de espera por conexão"""
+        monitor = self
+
+        class InstrumentedPool(pool_cls):
+            def connect(self):
+                start = time.perf_counter()
+                try:
+                    return super().connect()
+                except exc.TimeoutError:
+                    with monitor._lock:
+                        monitor.timeouts += 1
+                    raise
+                finally:
+                    monitor._registrar_espera(time.perf_counter() - start)
+
+        InstrumentedPool.__name__ = f"Instrumented{pool_cls.__name__}"
+        return InstrumentedPool
+
+    def attach(self, engine) -> None:
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _registrar_espera(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self._checked_out_at[id(connection_record)] = time.monotonic()
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            started = self._checked_out_at.pop(id(connection_record), None)
+        if started is not None:
+            held = time.monotonic() - started
+            if held > self.leak_threshold:
+                with self._lock:
+                    self.leaks_detected += 1
+                logger.warning("Conexão devolvida ao pool muito tempo depois (possível vazamento)", pool=self.name, segundos=round(held, 1))
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            held_too_long = sum(1 for t in self._checked_out_at.values() if now - t > self.leak_threshold)
+            checkouts = self.checkouts
+            data = {
+                "connects": self.connects,
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": (self.wait_seconds_total / checkouts * 1000) if checkouts else 0.0,
+                "wait_ms_max": self.wait_seconds_max * 1000,
+                "leaks_detected": self.leaks_detected,
+                "suspected_leaks_open": held_too_long,
+            }
+        pool = self.engine.pool if self.engine is not None else None
+        if pool is not None and hasattr(pool, "checkedout"):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
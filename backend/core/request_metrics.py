@@ -0,0 +1,165 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+from services.logger import logger
+
+# Registry próprio: só as métricas da app, sem os coletores padrão de processo/GC
+REGISTRY = CollectorRegistry()
+
+LATENCIA_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUESTS = Counter(
+    "lexsum_http_requests_total", "Requisições HTTP por rota e status",
+    ["method", "route", "status"], registry=REGISTRY,
+)
+HTTP_LATENCIA = Histogram(
+    "lexsum_http_request_duration_seconds", "Latência das requisições HTTP por rota",
+    ["method", "route"], buckets=LATENCIA_BUCKETS, registry=REGISTRY,
+)
+HTTP_EM_ANDAMENTO = Gauge(
+    "lexsum_http_requests_in_flight", "Requisições HTTP em andamento", registry=REGISTRY,
+)
+DB_CONSULTAS_POR_REQUISICAO = Histogram(
+    "lexsum_db_queries_per_request", "Comandos SQL por requisição",
+    ["route"], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100), registry=REGISTRY,
+)
+DB_TEMPO_POR_REQUISICAO = Histogram(
+    "lexsum_db_time_per_request_seconds", "Tempo somado em comandos SQL por requisição",
+    ["route"], buckets=LATENCIA_BUCKETS, registry=REGISTRY,
+)
+DB_CONSULTA = Histogram(
+    "lexsum_db_query_duration_seconds", "Duração de cada comando SQL",
+    ["engine"], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0), registry=REGISTRY,
+)
+DEPENDENCIA = Histogram(
+    "lexsum_dependency_duration_seconds", "Duração de operações caras fora do banco (bcrypt, modelo)",
+    ["dependency", "operation"], buckets=LATENCIA_BUCKETS, registry=REGISTRY,
+)
+
+ROTA_DESCONHECIDA = "<sem rota>"
+
+
+@dataclass
+class RequestStats:
+    """Custos acumulados durante uma requisição (ligada ao contextvar)"""
+    guardar_sql: bool = False
+    max_sql: int = 50
+    consultas: int = 0
+    db_seconds: float = 0.0
+    dependencias: dict = field(default_factory=dict)
+    sql: List[Tuple[float, str]] = field(default_factory=list)
+
+
+_requisicao: ContextVar[Optional[RequestStats]] = ContextVar("lexsum_request_stats", default=None)
+
+
+@contextmanager
+def medir_dependencia(dependencia: str, operacao: str):
+    """Mede um trecho (bcrypt, chamada ao modelo) no histograma e na requisição atual"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        DEPENDENCIA.labels(dependencia, operacao).observe(elapsed)
+        stats = _requisicao.get()
+        if stats is not None:
+            stats.dependencias[dependencia] = stats.dependencias.get(dependencia, 0.0) + elapsed
+
+
+def instrumentar_engine(engine, nome: str) -> Callable[[], None]:
+    """
+    Conta e cronometra os comandos SQL do engine (sync; no async use engine.sync_engine).
+    Retorna a função que remove os listeners.
+    """
+    histograma = DB_CONSULTA.labels(nome)
+
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        context._lexsum_inicio = time.perf_counter()
+
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._lexsum_inicio
+        histograma.observe(elapsed)
+        stats = _requisicao.get()
+        if stats is not None:
+            stats.consultas += 1
+            stats.db_seconds += elapsed
+            if stats.guardar_sql and len(stats.sql) < stats.max_sql:
+                # Só o texto do comando: os parâmetros podem ter dados pessoais
+                stats.sql.append((elapsed, statement))
+
+    event.listen(engine, "before_cursor_execute", _antes)
+    event.listen(engine, "after_cursor_execute", _depois)
+
+    def remover():
+        event.remove(engine, "before_cursor_execute", _antes)
+        event.remove(engine, "after_cursor_execute", _depois)
+
+    return remover
+
+
+def _rota(scope) -> str:
+    # Template da rota ("/api/party/{id}"), nunca o path cru: mantém a cardinalidade baixa
+    route = scope.get("route")
+    return getattr(route, "path", None) or ROTA_DESCONHECIDA
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sem BaseHTTPMiddleware, que cria uma task por requisição):
+    latência, status e em andamento por rota, mais o custo de banco da requisição.
+    Com slow_request_ms, loga as requisições lentas com os comandos SQL emitidos.
+    """
+
+    def __init__(self, app, slow_request_ms: Optional[float] = None, max_sql: int = 50):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.max_sql = max_sql
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(guardar_sql=self.slow_request_ms is not None, max_sql=self.max_sql)
+        token = _requisicao.set(stats)
+        status = 500
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_EM_ANDAMENTO.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_EM_ANDAMENTO.dec()
+            _requisicao.reset(token)
+            self._registrar(scope, status, elapsed, stats)
+
+    def _registrar(self, scope, status: int, elapsed: float, stats: RequestStats) -> None:
+        method, rota = scope["method"], _rota(scope)
+        HTTP_REQUESTS.labels(method, rota, str(status)).inc()
+        HTTP_LATENCIA.labels(method, rota).observe(elapsed)
+        DB_CONSULTAS_POR_REQUISICAO.labels(rota).observe(stats.consultas)
+        DB_TEMPO_POR_REQUISICAO.labels(rota).observe(stats.db_seconds)
+
+        if self.slow_request_ms is not None and elapsed * 1000 >= self.slow_request_ms:
+            logger.warning(
+                "Requisição lenta", method=method, route=rota, status=status, ms=round(elapsed * 1000),
+                db_comandos=stats.consultas, db_ms=round(stats.db_seconds * 1000),
+                **{f"{k}_ms": round(v * 1000) for k, v in stats.dependencias.items()},
+                sql=[f"{ms * 1000:.1f}ms {' '.join(statement.split())}" for ms, statement in stats.sql],
+            )
+
+
+def exportar() -> bytes:
+    """Métricas no formato texto do Prometheus"""
+    return generate_latest(REGISTRY)
@@ -1,8 +1,33 @@
-from core.db import engine, Base
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from core.db import iniciar_engine
 from models import models  # Garante que todos os modelos sejam importados e registrados
+from services.party_search import reconstruir_indice
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+def alembic_config(connection=None) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    config.attributes["connection"] = connection
+    return config
 
 
 if __name__ == "__main__":
-    print("Criando tabelas...")
-    Base.metadata.create_all(bind=engine)
-    print("Tabelas criadas com sucesso.")
\ No newline at end of file
+    print("Criando/atualizando tabelas...")
+    engine = iniciar_engine()
+    with engine.begin() as connection:
+        config = alembic_config(connection)
+        tabelas = set(inspect(connection).get_table_names())
+        # Banco criado antes das migrações (create_all): marca o schema inicial como aplicado.
+        # A 0001 só tem as tabelas que todo banco dessa época tem; o resto vem nas seguintes
+        if "usuarios" in tabelas and "alembic_version" not in tabelas:
+            command.stamp(config, "0001")
+        command.upgrade(config, "head")
+        # Índice de busca criado agora (0005) num banco que já tinha partes
+        if "partes" in tabelas and "party_search" not in tabelas:
+            print(f"Índice de busca preenchido: {reconstruir_indice(connection)} partes.")
+    print("Tabelas criadas com sucesso.")
@@ -0,0 +1,39 @@
+import argparse
+import io
+import os
+import sys
+from core.db import SessionLocal, iniciar_engine
+from models import models  # Garante que todos os modelos sejam importados e registrados
+from services.party_importer import LEITORES, importar_arquivo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa partes de um arquivo CSV ou JSONL")
+    parser.add_argument("arquivo")
+    parser.add_argument("--formato", choices=sorted(LEITORES), help="padrão: pela extensão do arquivo")
+    parser.add_argument("--lote", type=int, default=1000, help="registros por lote/commit")
+    parser.add_argument("--usuario-id", type=int, help="usuário dono das partes importadas")
+    parser.add_argument("--rejeitados", help="arquivo JSONL de rejeitados (padrão: <arquivo>.rejeitados.jsonl)")
+    args = parser.parse_args()
+
+    formato = args.formato or os.path.splitext(args.arquivo)[1].lstrip(".").lower()
+    if formato not in LEITORES:
+        sys.exit(f"Formato não reconhecido: {formato} (use --formato)")
+    caminho_rejeitados = args.rejeitados or f"{args.arquivo}.rejeitados.jsonl"
+
+    print(f"Importando {args.arquivo}...")
+    iniciar_engine()
+    db = SessionLocal()
+    try:
+        with io.open(args.arquivo, encoding="utf-8-sig", newline="") as stream, \
+                io.open(caminho_rejeitados, "w", encoding="utf-8") as rejeitados:
+            report = importar_arquivo(db, stream, formato, batch_size=args.lote,
+                                      usuario_id=args.usuario_id, rejeitados=rejeitados)
+    finally:
+        db.close()
+
+    print(f"Lidos: {report.lidos} | inseridos: {report.inseridos} | atualizados: {report.atualizados} "
+          f"| rejeitados: {report.rejeitados}")
+    print(f"{report.segundos:.2f}s ({report.linhas_por_segundo:.0f} linhas/s)")
+    if report.rejeitados:
+        print(f"Rejeitados em {caminho_rejeitados}")
@@ -1,40 +1,49 @@
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI, HTTPException, Depends, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, ORJSONResponse
 from schemas.schemas import UserCreate, VerificacaoInput, LoginData
-from core.db import SessionLocal
-from sqlalchemy.orm import Session
-from models.models import Usuarios
+from core.config import Settings, settings
+from core.http_cache import etag_fraco, resposta_condicional
+from core.db import fechar_engines, get_async_db, iniciar_async_engine, iniciar_engine
+from core.request_metrics import MetricsMiddleware
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from fastapi import Request
 
-from services.auth_utils import verify_password
+from services.cep_index import cep_index
+from services.email_queue import email_dispatcher
+from services.llm_client import llm_client
+from services.password_hasher import password_hasher
+from services.rate_limit import MENSAGEM_429, limiter, limitar_conta, limitar_ip
 from utils.validators import validar_email
-from services.user_service import usuario_existe, enviar_email_verificacao, criar_usuario
-from utils.security import create_access_token, get_current_user, gerar_codigo_verificacao, hash_senha
-from services.logger import logger
-from routers import party
+from services.user_service import buscar_usuario_por_email, cadastrar_usuario, enviar_email_verificacao
+from utils.security import create_access_token, get_current_user, gerar_codigo_verificacao, revogar_token
+from services.logger import RequestIdMiddleware, amostrado, configurar_logger, logger
+from routers import cep, metrics, party
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Engines só na subida do worker: o import da app não abre pool nem importa o driver
+    iniciar_engine()
+    iniciar_async_engine()
+    # Índice de CEP aberto na subida: sem ele /api/cep responde 503 e o parse não completa endereços
+    if settings.CEP_INDEX_FILE and not cep_index.disponivel:
+        logger.warning("Índice de CEP não encontrado; rode build_cep_index.py", arquivo=settings.CEP_INDEX_FILE)
+    if settings.EMAIL_ENABLED:
+        await email_dispatcher.start()
+    # O cliente do modelo (openai + httpx, ~1s de import) é criado na primeira chamada, não no boot
+    yield
+    await llm_client.aclose()
+    await email_dispatcher.stop()
+    password_hasher.shutdown()
+    await fechar_engines()
 
 
-limiter = Limiter(key_func=get_remote_address)
-app = FastAPI()
 router = APIRouter()
 
-app.include_router(party.router, prefix="/api")
-
-@app.exception_handler(RateLimitExceeded)
-async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(
-        status_code=429,
-        content={"detail": "Muitas tentativas. Aguarde um momento antes de tentar novamente."}
-    )
-
-app.state.limiter = limiter
-
 # Configuração do CORS (permite chamadas vindas do frontend React)
 origins = [
     "http://localhost:5173",
@@ -42,115 +51,159 @@ origins = [
 ]
 
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["*"]
-)
-
-
-# Função para obter a sessão do banco
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
+def create_app(config: Optional[Settings] = None) -> FastAPI:
+    """
+    Monta a app. Sem `config`, usa o Settings do ambiente/system.env; com ele, o
+    Settings informado passa a valer para o processo todo (services, engines, logs).
+    """
+    if config is not None:
+        settings._definir(config)
+    configurar_logger()
+
+    from slowapi.errors import RateLimitExceeded
+
+    # orjson em todas as respostas JSON; rotas com ETag devolvem o ORJSONResponse direto
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+    app.include_router(party.router, prefix="/api")
+    app.include_router(metrics.router, prefix="/api")
+    app.include_router(cep.router, prefix="/api")
+    app.include_router(router)
+
+    @app.exception_handler(RateLimitExceeded)
+    async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
+        return JSONResponse(
+            status_code=429,
+            content={"detail": MENSAGEM_429}
+        )
+
+    app.state.limiter = limiter
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["*"]
+    )
 
-@app.post("/login")
-async def login(usuario: LoginData, db: Session = Depends(get_db)):
-    user = db.query(Usuarios).filter(Usuarios.email == usuario.email).first()
-    if not user or not verify_password(usuario.senha, user.hashed_password):
+    # Por fora do CORS para medir a requisição inteira
+    if settings.METRICS_ENABLED:
+        app.add_middleware(
+            MetricsMiddleware, slow_request_ms=settings.METRICS_SLOW_REQUEST_MS, max_sql=settings.METRICS_SLOW_MAX_SQL
+        )
+    # Por fora das métricas, para o log de requisição lenta já sair com o request_id
+    app.add_middleware(RequestIdMiddleware)
+    return app
+
+
+def __getattr__(nome: str):
+    # `uvicorn main:app` e `from main import app`: a app padrão só é montada no primeiro acesso
+    if nome == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+@router.post("/login")
+@limitar_ip("RATE_LIMIT_LOGIN_IP")
+async def login(usuario: LoginData, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Antes do bcrypt: tentativas barradas não gastam CPU
+    limitar_conta("login", usuario.email, settings.RATE_LIMIT_LOGIN_CONTA)
+    user = await buscar_usuario_por_email(db, usuario.email)
+    if not user or not await password_hasher.verify(usuario.senha, user.hashed_password):
         raise HTTPException(status_code=401, detail="Email ou senha incorretos.")
     
     access_token = create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-@app.get("/protegido")
-async def rota_protegida(current_user: dict = Depends(get_current_user)):
-    return {"mensagem": "Você acessou uma rota protegida!", "user": current_user}
+@router.post("/logout")
+async def logout(_: None = Depends(revogar_token)):
+    return {"message": "Sessão encerrada"}
+
+
+@router.get("/protegido")
+async def rota_protegida(request: Request, current_user: dict = Depends(get_current_user)):
+    return resposta_condicional(
+        request, etag_fraco("protegido", current_user["email"]),
+        {"mensagem": "Você acessou uma rota protegida!", "user": current_user}, settings.READ_CACHE_CONTROL,
+    )
 
 
-@app.post("/signup")
-async def signup(user: UserCreate):
+@router.post("/signup")
+@limitar_ip("RATE_LIMIT_SIGNUP_IP")
+async def signup(user: UserCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
+    limitar_conta("signup", user.email, settings.RATE_LIMIT_SIGNUP_CONTA)
+    amostrado().info("Signup recebido")
+
+    if not validar_email(user.email):
+        logger.info("Cadastro recusado: email inválido", email=user.email)
+        raise HTTPException(400, detail="Email inválido")
+
+    codigo = gerar_codigo_verificacao()
+    usuario_data = {
+        "nome": user.nome,
+        "email": user.email,
+        "hashed_password": await password_hasher.hash(user.senha),
+        "celular": user.telefone,  # mapeando corretamente
+        "verificado": False,
+        "codigo_verificacao": codigo,
+        "codigo_expiracao": datetime.now() + timedelta(hours=24)
+    }
     try:
-        logger.info("🔥 Entrou na rota /signup")
-
-        if not validar_email(user.email):
-            logger.error(f"Cadastro recusado. Email inválido: {user.email}")
-            raise HTTPException(400, detail="Email inválido")
-        
-        if usuario_existe(user.email):
-            logger.error(f"Cadastro recusado. Usuário já existe: {user.email}")
-            raise HTTPException(409, detail="Email já cadastrado")
-        
-        codigo = gerar_codigo_verificacao()
-        usuario_data = {
-            "nome": user.nome,
-            "email": user.email,
-            "hashed_password": hash_senha(user.senha),
-            "celular": user.telefone,  # mapeando corretamente
-            "verificado": False,
-            "codigo_verificacao": codigo,
-            "codigo_expiracao": datetime.now() + timedelta(hours=24)
-        }    
-        
-        db = SessionLocal()
-        try:
-            novo_usuario = criar_usuario(db=db, user_data=usuario_data)
-            logger.info(f"Novo usuário cadastrado com sucesso: {user.email}")
-        finally:
-            db.close()
-        
-        # await enviar_email_verificacao(user.email, codigo)
-        
-        return {
-            "status": "pending_verification",
-            "message": f"Código enviado para {user.email}",
-            "user_id": str(novo_usuario.id if hasattr(novo_usuario, 'id') else 1)
-        }
-    except Exception as e:
-        logger.error(f"Falha em signup: {str(e)}")    
+        # Email/celular duplicados saem daqui como 409 (constraints unique)
+        usuario_id = await cadastrar_usuario(db, usuario_data)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Falha em signup")
+        raise HTTPException(500, detail="Não foi possível concluir o cadastro")
+    logger.info("Novo usuário cadastrado", usuario_id=usuario_id, email=user.email)
+
+    if not enviar_email_verificacao(user.email, codigo) and settings.EMAIL_ENABLED:
+        logger.warning("Email de verificação não enfileirado", email=user.email)
+
+    return {
+        "status": "pending_verification",
+        "message": f"Código enviado para {user.email}",
+        "user_id": str(usuario_id)
+    }
 
 
 @router.post("/verificar-codigo")
-@limiter.limit("5/minute")  # 5 tentativas por minuto por IP
-def verificar_codigo(data: VerificacaoInput, request: Request, db: Session = Depends(get_db)):
-    logger.info(f"Verificando código: {data.email}")
-    user = db.query(Usuarios).filter(Usuarios.email == data.email).first()
+@limitar_ip("RATE_LIMIT_VERIFICACAO_IP")
+async def verificar_codigo(data: VerificacaoInput, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Por conta também: o código tem só 6 dígitos, trocar de IP não pode dar mais chutes
+    limitar_conta("verificar-codigo", data.email, settings.RATE_LIMIT_VERIFICACAO_CONTA)
+    amostrado().info("Verificando código", email=data.email)
+    user = await buscar_usuario_por_email(db, data.email)
 
     if not user:
-        logger.error(f"Falha na verificação de código. Usuário não encontrado: {data.email}")
+        logger.info("Verificação de código: usuário não encontrado", email=data.email)
         raise HTTPException(404, detail="Usuário não encontrado")
     
     if user.verificado:
-        logger.error(f"Falha na verificação de código. Usuário já verificado: {data.email}")
+        logger.info("Verificação de código: usuário já verificado", usuario_id=user.id)
         return {"message": "Usuário já verificado"}
 
     if not user.codigo_verificacao or user.codigo_verificacao != data.codigo:
-        logger.error(f"Falha na verificação de código. Código inválido: {data.email}. Esperado {user.codigo_verificacao}. Enviado {data.codigo}.")
+        logger.warning("Verificação de código: código inválido", usuario_id=user.id)
         raise HTTPException(400, detail="Código inválido")
 
     if user.codigo_expiracao and user.codigo_expiracao < datetime.now():
-        logger.error(f"Falha na verificação de código. Código expirado: {data.email}")
+        logger.info("Verificação de código: código expirado", usuario_id=user.id)
         raise HTTPException(400, detail="Código expirado")
 
     user.verificado = True
     user.codigo_verificacao = None
     user.codigo_expiracao = None
-    db.commit()
+    await db.commit()
 
     return {"message": "Verificação concluída com sucesso"}
 
 
-app.include_router(router)
-
-
 # @app.post("/signup")
 # async def signup(user: UserCreate):
 #     print("Chegou na rota signup")
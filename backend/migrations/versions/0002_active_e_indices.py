@@ -0,0 +1,36 @@
+"""coluna gerada active e índices compostos para partes ativas
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:12.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "CASE WHEN deleted_at IS NULL THEN 1 ELSE 0 END"
+
+
+def upgrade() -> None:
+    # Colunas geradas virtuais: o SQLite só aceita VIRTUAL em ALTER TABLE ADD COLUMN
+    # e o InnoDB indexa colunas virtuais normalmente
+    op.add_column('usuarios', sa.Column('active', sa.Boolean(), sa.Computed(ACTIVE), nullable=True))
+    op.add_column('partes', sa.Column('active', sa.Boolean(), sa.Computed(ACTIVE), nullable=True))
+    # Também cobre a FK partes.usuario_id, que não tinha índice próprio
+    op.create_index('ix_partes_usuario_active', 'partes', ['usuario_id', 'active', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_partes_usuario_active', table_name='partes')
+    with op.batch_alter_table('partes', schema=None) as batch_op:
+        batch_op.drop_column('active')
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_column('active')
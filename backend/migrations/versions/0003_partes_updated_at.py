@@ -0,0 +1,28 @@
+"""partes.updated_at, versão da parte para o ETag de /api/party
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:32:40.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # O SQLite não aceita default não constante em ADD COLUMN: preenche as linhas existentes à parte
+    op.add_column('partes', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE partes SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade() -> None:
+    # Sem batch: recriar a tabela no SQLite tentaria copiar a coluna gerada active
+    op.drop_column('partes', 'updated_at')
@@ -0,0 +1,28 @@
+"""partes.chave_importacao, ids das partes inseridas em massa pelo importador
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:12:05.671204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('partes', sa.Column('chave_importacao', sa.String(length=50), nullable=True))
+    op.create_index(op.f('ix_partes_chave_importacao'), 'partes', ['chave_importacao'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_partes_chave_importacao'), table_name='partes')
+    # Sem batch: recriar a tabela no SQLite tentaria copiar a coluna gerada active
+    op.drop_column('partes', 'chave_importacao')
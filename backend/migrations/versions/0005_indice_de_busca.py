@@ -0,0 +1,56 @@
+"""índice de busca por nome (party_search e party_search_termos)
+
+Bancos criados pela versão anterior da 0001 já têm as tabelas: só as que faltam são
+criadas. Tabelas criadas aqui começam vazias; o create_tables.py as preenche, e com
+alembic upgrade direto rode build_search_index.py
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:48:21.309554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tabelas = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'party_search' not in tabelas:
+        op.create_table('party_search',
+        sa.Column('parte_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('documento', sa.String(length=14), nullable=False),
+        sa.Column('nome', sa.String(length=255), nullable=False),
+        sa.Column('nome_ordem', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['parte_id'], ['partes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('parte_id')
+        )
+        op.create_index('ix_party_search_nome_ordem', 'party_search', ['nome_ordem', 'parte_id'], unique=False)
+
+    if 'party_search_termos' not in tabelas:
+        op.create_table('party_search_termos',
+        sa.Column('termo', sa.String(length=60), nullable=False),
+        sa.Column('parte_id', sa.Integer(), nullable=False),
+        sa.Column('nome_ordem', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['parte_id'], ['partes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('termo', 'parte_id')
+        )
+        op.create_index('ix_party_search_termos_ordem', 'party_search_termos',
+                        ['termo', 'nome_ordem', 'parte_id'], unique=False)
+        op.create_index(op.f('ix_party_search_termos_parte_id'), 'party_search_termos', ['parte_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_party_search_termos_parte_id'), table_name='party_search_termos')
+    op.drop_index('ix_party_search_termos_ordem', table_name='party_search_termos')
+    op.drop_table('party_search_termos')
+    op.drop_index('ix_party_search_nome_ordem', table_name='party_search')
+    op.drop_table('party_search')
@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, DateTime, Index, Computed
 from core.db import Base
 from datetime import datetime
 from sqlalchemy.orm import relationship
@@ -28,6 +28,8 @@ class Usuarios(Base):
     inscricao = Column(String(18), default=None)
     created_at = Column(DateTime, default=datetime.now)
     deleted_at = Column(DateTime, default=None)
+    # Coluna gerada pelo banco; filtre sempre por active (services/queries.py) em vez de deleted_at
+    active = Column(Boolean, Computed("CASE WHEN deleted_at IS NULL THEN 1 ELSE 0 END"))
     verificado = Column(Boolean, default=False, nullable=False)
     codigo_verificacao = Column(String(10), nullable=True)
     codigo_expiracao = Column(DateTime, nullable=True)
@@ -51,7 +53,17 @@ class Partes(Base):
     cidade = Column(String(120))
     uf = Column(String(2))
     cpf_responsavel = Column(String(11))  # sem pontuação
+    # Versão da parte (ETag de /api/party); mudanças em PessoaFisica/PessoaJuridica também
+    # atualizam (services/party_cache.py), e escritas em massa precisam preencher
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     deleted_at = Column(DateTime)
+    active = Column(Boolean, Computed("CASE WHEN deleted_at IS NULL THEN 1 ELSE 0 END"))
+    # "<lote>:<documento>" das partes criadas pelo importador: o insert em massa não devolve
+    # os ids no MySQL (sem RETURNING), e eles são lidos de volta por esta chave
+    chave_importacao = Column(String(50), index=True)
+
+    # "Partes ativas do usuário X", paginadas por id
+    __table_args__ = (Index("ix_partes_usuario_active", "usuario_id", "active", "id"),)
 
     pessoa_fisica = relationship("PessoaFisica", back_populates="parte", uselist=False)
     pessoa_juridica = relationship("PessoaJuridica", back_populates="parte", uselist=False)
@@ -90,3 +102,27 @@ class PessoaJuridica(Base):
     inscricao_municipal = Column(String(120))
 
     parte = relationship("Partes", back_populates="pessoa_juridica")
+
+
+class PartySearch(Base):
+    """Índice de busca por nome: uma linha por parte, com o nome normalizado para ordenação"""
+    __tablename__ = "party_search"
+
+    parte_id = Column(Integer, ForeignKey("partes.id", ondelete="CASCADE"), primary_key=True)
+    tipo = Column(String(20), nullable=False)
+    documento = Column(String(14), nullable=False)
+    nome = Column(String(255), nullable=False)
+    nome_ordem = Column(String(255), nullable=False)  # normalizado (sem acento, minúsculo)
+
+    __table_args__ = (Index("ix_party_search_nome_ordem", "nome_ordem", "parte_id"),)
+
+
+class PartySearchTermo(Base):
+    """Lista invertida termo normalizado -> parte, com o nome_ordem para paginar na ordem do índice"""
+    __tablename__ = "party_search_termos"
+
+    termo = Column(String(60), primary_key=True)
+    parte_id = Column(Integer, ForeignKey("partes.id", ondelete="CASCADE"), primary_key=True, index=True)
+    nome_ordem = Column(String(255), nullable=False)
+
+    __table_args__ = (Index("ix_party_search_termos_ordem", "termo", "nome_ordem", "parte_id"),)
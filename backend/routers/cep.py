@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from core.config import settings
+from core.http_cache import etag_confere, etag_fraco, nao_modificado
+from schemas.schemas import CepResponse
+from services.cep_index import cep_index, normalizar_cep
+
+router = APIRouter()
+
+
+@router.get("/cep/{cep}", response_model=CepResponse, summary="Endereço de um CEP pelo índice local")
+async def get_cep(cep: str, request: Request, x_api_key: str = Header(...)):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    chave = normalizar_cep(cep)
+    if chave is None:
+        raise HTTPException(status_code=400, detail="CEP inválido")
+    if not cep_index.disponivel:
+        raise HTTPException(status_code=503, detail="Índice de CEP indisponível")
+
+    # O endereço só muda com um índice novo: o 304 sai sem consultar o arquivo
+    etag = etag_fraco("cep", chave, cep_index.versao)
+    if etag_confere(request, etag):
+        return nao_modificado(etag, settings.CEP_CACHE_CONTROL)
+
+    endereco = cep_index.buscar(cep)
+    if endereco is None:
+        raise HTTPException(status_code=404, detail="CEP não encontrado")
+    return ORJSONResponse(endereco._asdict(), headers={"ETag": etag, "Cache-Control": settings.CEP_CACHE_CONTROL})
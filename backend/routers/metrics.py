@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Header, HTTPException, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from core.config import settings
+from core.db import pool_stats
+from core.request_metrics import exportar
+from services.email_queue import email_dispatcher
+from services.llm_cache import llm_cache
+from services.llm_client import llm_client
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="Métricas por requisição no formato do Prometheus")
+def get_prometheus_metrics(x_api_key: str = Header(...)):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    return Response(exportar(), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get("/metrics/pool", summary="Estatísticas dos pools de conexão do banco")
+def get_pool_stats(x_api_key: str = Header(...)):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    return pool_stats()
+
+
+@router.get("/metrics/email", summary="Estatísticas da fila de envio de emails")
+def get_email_stats(x_api_key: str = Header(...)):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    return email_dispatcher.stats()
+
+
+@router.get("/metrics/llm-cache", summary="Estatísticas do cache de respostas do modelo")
+def get_llm_cache_stats(x_api_key: str = Header(...)):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    return {**llm_cache.stats(), "client": llm_client.stats()}
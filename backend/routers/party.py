@@ -1,69 +1,176 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, Header, Body, Response
+import io
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, Header, Body, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
-from core.db import get_db
-from models.models import PessoaFisica, PessoaJuridica
-from schemas.schemas import PartySearchResponse
-from utils.validators import clean_document, is_cpf, is_cnpj
+from core.db import get_async_db, get_async_sessionmaker, get_db
+from schemas.schemas import (
+    PartySearchResponse, PartyBatchRequest, PartyBatchResponse, PartyImportResponse, PartySearchPage,
+    PartyListPage, PartyParseBatchRequest
+)
+from services.party_export import MEDIA_TYPES, exportar_partes
+from services.party_importer import LEITORES, importar_arquivo
+from services.party_search import buscar_partes
+from services.party_service import buscar_parte, id_do_usuario, listar_partes_do_usuario, resolver_documentos
+from services.party_cache import party_cache
+from services.party_parse import parsear_em_lote, parsear_texto
+from services.party_parser import segmentar_partes
+from services.llm_client import cancelar_se_desconectar
+from utils.security import get_current_user
+from utils.validators import is_cpf, is_cnpj, normalizar_documento
 from core.config import settings
-from openai import OpenAI
+from core.http_cache import etag_fraco, resposta_condicional
 import os
 
 router = APIRouter()
 
 @router.get("/party", response_model=PartySearchResponse)
-def get_party(
+async def get_party(
+    request: Request,
     document: str = Query(..., description="CPF ou CNPJ"),
     x_api_key: str = Header(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if x_api_key != settings.SECRET_API_KEY:
         raise HTTPException(status_code=403, detail="Acesso negado")
 
-    normalized = clean_document(document)
-
-    if is_cpf(normalized):
-        pessoa = db.query(PessoaFisica).filter(PessoaFisica.cpf == normalized).first()
-        return {"name": pessoa.nome if pessoa else None}
+    normalized = normalizar_documento(document)
 
-    elif is_cnpj(normalized):
-        empresa = db.query(PessoaJuridica).filter(PessoaJuridica.cnpj == normalized).first()
-        return {"name": empresa.razao_social if empresa else None}
+    if is_cpf(normalized) or is_cnpj(normalized):
+        # Nome e versão vêm do cache ou de uma consulta só de colunas; o 304 nem monta o corpo
+        parte = await buscar_parte(db, normalized)
+        return resposta_condicional(
+            request, etag_fraco(normalized, *(parte or ())), {"name": parte.nome if parte else None},
+            settings.READ_CACHE_CONTROL,
+        )
 
     else:
         raise HTTPException(status_code=400, detail="Documento inválido")
 
 
+@router.get("/party/search", response_model=PartySearchPage,
+            summary="Busca partes por nome (prefixos, sem acento), paginada por cursor")
+async def search_parties(
+    q: str = Query(..., min_length=2, max_length=200, description="Parte do nome, ex.: 'joao silv'"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    x_api_key: str = Header(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    results, next_cursor = await buscar_partes(db, q, limit, cursor)
+    return {"results": results, "next_cursor": next_cursor}
+
+
+@router.get("/parties", response_model=PartyListPage,
+            summary="Partes do usuário autenticado, paginadas por id")
+async def list_parties(
+    limit: int = Query(50, ge=1, le=200),
+    after_id: Optional[int] = Query(None, description="next_after_id da página anterior"),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    results, next_after_id = await listar_partes_do_usuario(db, current_user["email"], after_id, limit)
+    return {"results": results, "next_after_id": next_after_id}
+
+
+@router.get("/parties/export",
+            summary="Exporta todas as partes do usuário autenticado (jsonl ou csv), em streaming")
+async def export_parties(
+    formato: Literal["jsonl", "csv"] = Query("jsonl"),
+    gzip: bool = Query(False, description="Comprime o arquivo (.gz)"),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    sessoes: async_sessionmaker = Depends(get_async_sessionmaker)
+):
+    usuario_id = await id_do_usuario(db, current_user["email"])
+    arquivo = f"partes.{formato}.gz" if gzip else f"partes.{formato}"
+    return StreamingResponse(
+        exportar_partes(sessoes, usuario_id, formato, comprimir=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{arquivo}"'},
+    )
+
+
+@router.post("/party/batch", response_model=PartyBatchResponse)
+async def get_party_batch(
+    payload: PartyBatchRequest,
+    x_api_key: str = Header(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    return {"results": await resolver_documentos(db, payload.documents)}
+
+
+@router.post("/party/import", response_model=PartyImportResponse,
+             summary="Importa partes de um arquivo CSV ou JSONL (upsert por CPF/CNPJ)")
+def import_parties(
+    arquivo: UploadFile = File(...),
+    formato: Optional[str] = Query(None, description="csv ou jsonl; padrão: pela extensão do arquivo"),
+    usuario_id: Optional[int] = Query(None),
+    x_api_key: str = Header(...),
+    db: Session = Depends(get_db)
+):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    formato = (formato or os.path.splitext(arquivo.filename or "")[1].lstrip(".")).lower()
+    if formato not in LEITORES:
+        raise HTTPException(status_code=400, detail="Formato não suportado. Use csv ou jsonl.")
+
+    stream = io.TextIOWrapper(arquivo.file, encoding="utf-8-sig", newline="")
+    try:
+        report = importar_arquivo(db, stream, formato, usuario_id=usuario_id)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Arquivo deve estar em UTF-8")
+    finally:
+        stream.detach()
+    return report.as_dict()
+
+
+@router.get("/party/cache/stats")
+def get_party_cache_stats(x_api_key: str = Header(...)):
+    if x_api_key != settings.SECRET_API_KEY:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    return party_cache.stats()
+
+
 @router.post("/parse-party-data", summary="Recebe texto livre e retorna XML com campos de PartyData")
-async def parse_party_data(payload: dict = Body(...)):
+async def parse_party_data(request: Request, payload: dict = Body(...)):
     text = payload.get("text", "").strip()
     if not text:
         return {"error": "Nenhum texto fornecido."}
-    
-    client = OpenAI(api_key=settings.OPENAI_KEY)
-    
-    system = (
-        "Você é um assistente que recebe um texto com dados de pessoa e "
-        "deve retornar **apenas** um XML válido contendo estas tags:\n"
-        "<name>,<nationality>,<maritalStatus>,<profession>,"
-        "<rg>,<orgaoExpedidor>,<dataExpedicao>,<email>,<phone>,"
-        "<address><street>,<number>,<complement>,<neighborhood>,"
-        "<city>,<state>,<cep></address>\n"
-        "**Importante:** Para o campo `<maritalStatus>` use **somente** um destes valores (exatamente como abaixo):\n"
-        "- Solteiro(a)\n"  
-        "- Casado(a)\n"  
-        "- Divorciado(a)\n"  
-        "- Viúvo(a)\n"  
-        "- Separado(a) Judicialmente\n"        
-        "Nada além do XML."
-    )
-    user = f"Dado o texto:\n'''{text}'''\nGere o XML."
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user",   "content": user}
-        ],
-        temperature=0
-    )
-    xml = resp.choices[0].message.content
-    return Response(content=xml, media_type="application/xml")
\ No newline at end of file
+
+    # Mesmo caminho do lote: regras primeiro, modelo só para o resto, XML no mesmo formato
+    try:
+        parsed = await cancelar_se_desconectar(request, parsear_texto(text))
+    except ValueError:
+        raise HTTPException(status_code=502, detail="Resposta do modelo em formato inesperado")
+
+    headers = {"X-Parse-Path": parsed.path, "X-Parse-Confidence": f"{parsed.confidence:.2f}"}
+    if parsed.cache:
+        headers["X-Cache"] = parsed.cache
+    return Response(content=parsed.xml, media_type="application/xml", headers=headers)
+
+
+@router.post("/parse-party-data/batch",
+             summary="Interpreta várias partes de uma vez; cada resultado sai em NDJSON assim que fica pronto")
+async def parse_party_data_batch(
+    payload: PartyParseBatchRequest,
+    formato: Literal["xml", "json"] = Query("xml", description="xml (como /parse-party-data) ou json (campos)"),
+):
+    textos = [t.strip() for t in payload.texts] if payload.texts is not None else segmentar_partes(payload.text or "")
+    textos = [t for t in textos if t]
+    if not textos:
+        raise HTTPException(status_code=400, detail="Nenhum texto fornecido.")
+    if len(textos) > settings.PARTY_PARSE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400,
+                            detail=f"No máximo {settings.PARTY_PARSE_BATCH_MAX_ITEMS} partes por lote")
+
+    return StreamingResponse(parsear_em_lote(textos, formato), media_type="application/x-ndjson")
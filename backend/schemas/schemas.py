@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import List, Literal, Optional
 import re
 # from datetime import datetime
 
@@ -54,4 +54,74 @@ class LoginData(BaseModel):
 
 
 class PartySearchResponse(BaseModel):
-    name: Optional[str]
\ No newline at end of file
+    name: Optional[str]
+
+class PartyBatchRequest(BaseModel):
+    documents: List[str] = Field(..., max_length=10000)
+
+
+class PartyBatchItem(BaseModel):
+    document: str
+    status: Literal["found", "not_found", "invalid"]
+    name: Optional[str] = None
+
+
+class PartyBatchResponse(BaseModel):
+    results: List[PartyBatchItem]
+
+
+class PartySearchHit(BaseModel):
+    id: int
+    tipo: Literal["fisica", "juridica"]
+    documento: str
+    nome: str
+
+
+class PartySearchPage(BaseModel):
+    results: List[PartySearchHit]
+    next_cursor: Optional[str] = None
+
+
+class PartyListItem(BaseModel):
+    id: int
+    tipo: Optional[Literal["fisica", "juridica"]] = None
+    documento: Optional[str] = None
+    nome: Optional[str] = None
+    email: str
+    cidade: Optional[str] = None
+    uf: Optional[str] = None
+
+
+class PartyListPage(BaseModel):
+    results: List[PartyListItem]
+    next_after_id: Optional[int] = None
+
+
+class PartyImportReject(BaseModel):
+    linha: int
+    motivo: str
+    registro: dict
+
+
+class PartyImportResponse(BaseModel):
+    lidos: int
+    inseridos: int
+    atualizados: int
+    rejeitados: int
+    lotes: int
+    segundos: float
+    linhas_por_segundo: float
+    amostra_rejeitados: List[PartyImportReject]
+
+
+class CepResponse(BaseModel):
+    cep: str
+    logradouro: Optional[str] = None
+    bairro: Optional[str] = None
+    cidade: Optional[str] = None
+    uf: Optional[str] = None
+
+
+class PartyParseBatchRequest(BaseModel):
+    text: Optional[str] = None  # várias qualificações juntas; separadas em partes no servidor
+    texts: Optional[List[str]] = None  # ou já separadas pelo cliente
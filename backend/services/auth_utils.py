@@ -1,7 +1,13 @@
 # auth_utils.py
-from passlib.context import CryptContext
+from core.lazy import LazyProxy
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _criar_pwd_context():
+    # passlib só é importado no primeiro hash/verificação, não no import da app
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+pwd_context = LazyProxy(_criar_pwd_context)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
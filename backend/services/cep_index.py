@@ -0,0 +1,203 @@
+"""
+Índice local de CEPs: arquivo binário ordenado, aberto com mmap.
+
+Gerado offline por build_cep_index.py a partir de um CSV no formato dos Correios
+(cep;logradouro;bairro;cidade;uf). Layout, todo em uint32 little-endian:
+
+    cabeçalho   MAGIC, quantidade de CEPs, quantidade de textos, tamanho do blob
+    ceps        n CEPs (como inteiro), em ordem crescente
+    registros   n x (logradouro, bairro, cidade, uf), ids na tabela de textos
+    offsets     início de cada texto no blob (+ o fim do último)
+    blob        textos em UTF-8, sem repetição (cidades, bairros e UFs se repetem muito)
+
+Abrir o índice só mapeia o arquivo: nada é lido até a primeira consulta, que faz
+uma busca binária direto nas páginas mapeadas (O(log n)). A memória residente é a
+das páginas tocadas, compartilhada entre os workers pelo cache de páginas do SO.
+"""
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import IO, Iterable, Iterator, NamedTuple, Optional, Tuple
+from core.config import settings
+from core.lazy import LazyProxy
+from services.logger import logger
+from utils.validators import clean_document
+
+MAGIC = b"CEPIDX01"
+TEXTOS_EM_CACHE = 16384  # cidades, UFs e bairros se repetem em quase toda consulta
+_CABECALHO = struct.Struct("<8sIII")
+_TAMANHO_CABECALHO = 32  # alinhado, para as seções em uint32 começarem em múltiplo de 4
+
+# Nomes de coluna aceitos no CSV de origem
+COLUNAS_CSV = {
+    "cep": ("cep",),
+    "logradouro": ("logradouro", "endereco", "rua"),
+    "bairro": ("bairro",),
+    "cidade": ("cidade", "localidade", "municipio"),
+    "uf": ("uf", "estado"),
+}
+
+
+class Endereco(NamedTuple):
+    cep: str  # 00000-000
+    logradouro: Optional[str]
+    bairro: Optional[str]
+    cidade: Optional[str]
+    uf: Optional[str]
+
+
+def normalizar_cep(cep: str) -> Optional[int]:
+    """CEP como inteiro (para a busca), ou None se não tiver 8 dígitos"""
+    if len(cep) != 8 or not (cep.isascii() and cep.isdigit()):
+        cep = clean_document(cep)
+        if len(cep) != 8:
+            return None
+    return int(cep)
+
+
+def formatar_cep(cep: int) -> str:
+    texto = f"{cep:08d}"
+    return f"{texto[:5]}-{texto[5:]}"
+
+
+def ler_csv_correios(stream: IO[str]) -> Iterator[Tuple[str, str, str, str, str]]:
+    """Gera (cep, logradouro, bairro, cidade, uf) de um CSV com cabeçalho; aceita ',' ou ';'"""
+    inicio = stream.readline()
+    delimitador = ";" if inicio.count(";") > inicio.count(",") else ","
+    cabecalho = [c.strip().lower() for c in next(csv.reader([inicio], delimiter=delimitador))]
+    posicoes = {}
+    for campo, nomes in COLUNAS_CSV.items():
+        posicao = next((cabecalho.index(nome) for nome in nomes if nome in cabecalho), None)
+        if posicao is None and campo in ("cep", "cidade", "uf"):
+            raise ValueError(f"coluna obrigatória ausente no CSV: {campo}")
+        posicoes[campo] = posicao
+    for row in csv.reader(stream, delimiter=delimitador):
+        yield tuple(
+            row[posicoes[campo]].strip() if posicoes[campo] is not None and posicoes[campo] < len(row) else ""
+            for campo in COLUNAS_CSV
+        )
+
+
+def construir_indice(registros: Iterable[Tuple[str, str, str, str, str]], destino: str) -> int:
+    """
+    Grava o índice a partir de (cep, logradouro, bairro, cidade, uf); CEP repetido fica com
+    a última ocorrência e CEP malformado é ignorado. Escreve num arquivo temporário e troca
+    no fim, então workers com o índice antigo mapeado continuam lendo o arquivo anterior.
+    Retorna a quantidade de CEPs gravados.
+    """
+    textos = {"": 0}
+    por_cep = {}
+    for cep, *campos in registros:
+        chave = normalizar_cep(cep)
+        if chave is None:
+            continue
+        ids = []
+        for texto in campos:
+            texto = " ".join(texto.split())
+            ids.append(textos.setdefault(texto, len(textos)))
+        por_cep[chave] = ids
+
+    ceps = array("I", sorted(por_cep))
+    campos = array("I")
+    for cep in ceps:
+        campos.extend(por_cep[cep])
+    blob = bytearray()
+    offsets = array("I", [0])
+    for texto in textos:  # dict preserva a ordem de inserção = ordem dos ids
+        blob += texto.encode("utf-8")
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        for secao in (ceps, campos, offsets):
+            secao.byteswap()
+
+    temporario = f"{destino}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    with open(temporario, "wb") as f:
+        f.write(_CABECALHO.pack(MAGIC, len(ceps), len(textos), len(blob)).ljust(_TAMANHO_CABECALHO, b"\0"))
+        for secao in (ceps, campos, offsets):
+            secao.tofile(f)
+        f.write(blob)
+    os.replace(temporario, destino)
+    return len(ceps)
+
+
+class CepIndex:
+    """Consulta de CEPs sobre o arquivo mapeado; sem arquivo, `disponivel` é False e nada é encontrado"""
+
+    def __init__(self, caminho: Optional[str]):
+        self.caminho = caminho
+        self.total = 0
+        self.versao = None  # muda quando o arquivo é regerado (ETag de /api/cep)
+        self._mmap = None
+        if not caminho or not os.path.exists(caminho):
+            return
+        if sys.byteorder != "little":
+            raise RuntimeError("índice de CEP gravado em little-endian; arquitetura não suportada")
+
+        with open(caminho, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            info = os.fstat(f.fileno())
+        magic, n, n_textos, tamanho_blob = _CABECALHO.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            self._mmap = None
+            raise ValueError(f"{caminho} não é um índice de CEP")
+
+        visao = memoryview(self._mmap)
+        inicio = _TAMANHO_CABECALHO
+        self._ceps = visao[inicio:inicio + 4 * n].cast("I")
+        inicio += 4 * n
+        self._registros = visao[inicio:inicio + 16 * n].cast("I")
+        inicio += 16 * n
+        self._offsets = visao[inicio:inicio + 4 * (n_textos + 1)].cast("I")
+        inicio += 4 * (n_textos + 1)
+        self._blob = visao[inicio:inicio + tamanho_blob]
+        self._texto = lru_cache(maxsize=TEXTOS_EM_CACHE)(self._ler_texto)
+        self.total = n
+        self.versao = f"{info.st_mtime_ns:x}-{info.st_size:x}"
+
+    @property
+    def disponivel(self) -> bool:
+        return self._mmap is not None
+
+    def _ler_texto(self, id_texto: int) -> Optional[str]:
+        if not id_texto:
+            return None
+        return str(self._blob[self._offsets[id_texto]:self._offsets[id_texto + 1]], "utf-8")
+
+    def buscar(self, cep: str) -> Optional[Endereco]:
+        """Endereço do CEP (com ou sem máscara), ou None se não está no índice"""
+        chave = normalizar_cep(cep)
+        if chave is None or not self.total:
+            return None
+        i = bisect_left(self._ceps, chave)
+        if i == self.total or self._ceps[i] != chave:
+            return None
+        logradouro, bairro, cidade, uf = map(self._texto, self._registros[4 * i:4 * i + 4].tolist())
+        return Endereco(formatar_cep(chave), logradouro, bairro, cidade, uf)
+
+    def fechar(self) -> None:
+        if self._mmap is None:
+            return
+        for visao in (self._ceps, self._registros, self._offsets, self._blob):
+            visao.release()
+        self._mmap.close()
+        self._mmap = None
+        self._texto = None
+        self.total = 0
+        self.versao = None
+
+
+def criar_cep_index() -> CepIndex:
+    index = CepIndex(settings.CEP_INDEX_FILE)
+    if index.disponivel:
+        logger.info("Índice de CEP aberto", arquivo=settings.CEP_INDEX_FILE, ceps=index.total)
+    return index
+
+
+cep_index = LazyProxy(criar_cep_index)
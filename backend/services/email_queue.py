@@ -0,0 +1,273 @@
+import asyncio
+import random
+import smtplib
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+from core.config import settings
+from core.lazy import LazyProxy
+from services.logger import logger
+
+
+@dataclass
+class OutgoingEmail:
+    to: str
+    subject: str
+    body: str
+    attempts: int = 0
+    last_error: Optional[str] = None
+
+
+class SmtpConnection:
+    """Conexão SMTP persistente, reaproveitada entre lotes e reaberta quando cai"""
+
+    def __init__(self, host: str, port: int, username: Optional[str], password: Optional[str],
+                 starttls: bool, timeout: float, sender: str):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.sender = sender
+        self._smtp: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        return smtp
+
+    def _ensure(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self.close()
+        self._smtp = self._connect()
+        return self._smtp
+
+    def _build(self, email: OutgoingEmail) -> EmailMessage:
+        msg = EmailMessage()
+        msg["From"] = self.sender
+        msg["To"] = email.to
+        msg["Subject"] = email.subject
+        msg.set_content(email.body)
+        return msg
+
+    def send_batch(self, batch: List[OutgoingEmail]) -> List[Tuple[OutgoingEmail, Optional[str]]]:
+        """Envia o lote numa única sessão SMTP; retorna (email, erro ou None)"""
+        results = []
+        try:
+            smtp = self._ensure()
+        except (OSError, smtplib.SMTPException) as e:
+            return [(email, f"conexão: {e}") for email in batch]
+
+        for email in batch:
+            try:
+                smtp.send_message(self._build(email))
+                results.append((email, None))
+            except smtplib.SMTPServerDisconnected as e:
+                self.close()
+                results.append((email, str(e)))
+                try:
+                    smtp = self._ensure()
+                except (OSError, smtplib.SMTPException):
+                    results.extend((rest, str(e)) for rest in batch[len(results):])
+                    break
+            except (OSError, smtplib.SMTPException) as e:
+                results.append((email, str(e)))
+        return results
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                pass
+            self._smtp = None
+
+
+class EmailDispatcher:
+    """
+    Fila de envio de emails em background.
+
+    A rota só enfileira; cada worker mantém sua própria conexão SMTP, envia em
+    lotes e reenfileira as falhas com backoff exponencial até EMAIL_MAX_RETRIES,
+    depois disso o email vai para a lista de dead letters.
+    """
+
+    def __init__(self, workers: int = 2, batch_size: int = 20, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 300.0, queue_maxsize: int = 10000,
+                 connection_factory=None):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_maxsize = queue_maxsize
+        self.connection_factory = connection_factory or _smtp_from_settings
+        self.dead_letters: deque = deque(maxlen=1000)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retry_tasks: set = set()
+        self._started_at = None
+        self.enqueued = 0
+        self.sent = 0
+        self.failed_attempts = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.batches = 0
+        self.send_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_maxsize)
+        self._started_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info("Fila de emails iniciada", workers=self.workers)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Espera a fila esvaziar (até timeout) e encerra os workers"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Fila de emails encerrada com mensagens pendentes", pendentes=self._queue.qsize())
+        if self._retry_tasks:
+            logger.warning("Fila de emails encerrada com reenvios agendados", reenvios=len(self._retry_tasks))
+        for task in (*self._tasks, *self._retry_tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retry_tasks, return_exceptions=True)
+        self._tasks = []
+        self._retry_tasks = set()
+
+    def enqueue(self, email: OutgoingEmail) -> bool:
+        """Enfileira sem bloquear; False se a fila não está rodando ou está cheia"""
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(email)
+        except asyncio.QueueFull:
+            logger.error("Fila de emails cheia; mensagem descartada")
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _next_batch(self) -> List[OutgoingEmail]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _worker(self, index: int) -> None:
+        connection = self.connection_factory()
+        try:
+            while True:
+                batch = await self._next_batch()
+                try:
+                    await self._enviar(index, connection, batch)
+                finally:
+                    # Sempre: um task_done a menos e o stop() esperaria o timeout
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            await asyncio.to_thread(connection.close)
+
+    async def _enviar(self, index: int, connection: SmtpConnection, batch: List[OutgoingEmail]) -> None:
+        pendentes = list(batch)
+        start = time.perf_counter()
+        try:
+            results = await asyncio.to_thread(connection.send_batch, batch)
+            for email, error in results:
+                pendentes.remove(email)
+                if error is None:
+                    self.sent += 1
+                else:
+                    self._falha(email, error)
+        except Exception as e:
+            # Erro fora dos previstos no send_batch: o que não teve resultado segue pelo
+            # caminho de falha (reenvio ou dead letter) e o worker continua na fila
+            logger.exception("Erro inesperado no envio de emails", worker=index, emails=len(pendentes))
+            for email in pendentes:
+                self._falha(email, f"erro inesperado: {e!r}")
+            await asyncio.to_thread(connection.close)
+        finally:
+            self.send_seconds += time.perf_counter() - start
+            self.batches += 1
+
+    def _falha(self, email: OutgoingEmail, error: str) -> None:
+        self.failed_attempts += 1
+        email.attempts += 1
+        email.last_error = error
+        if email.attempts > self.max_retries:
+            self.dead_lettered += 1
+            self.dead_letters.append(email)
+            logger.error("Email descartado após esgotar as tentativas", to=email.to, tentativas=email.attempts, erro=error)
+            return
+
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (email.attempts - 1))
+        delay *= random.uniform(0.8, 1.2)
+        self.retried += 1
+        task = asyncio.create_task(self._reenfileirar(email, delay))
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    async def _reenfileirar(self, email: OutgoingEmail, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put(email)
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "retry_pending": len(self._retry_tasks),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "batches": self.batches,
+            "avg_batch_ms": (self.send_seconds / self.batches * 1000) if self.batches else 0.0,
+            "sent_per_second": (self.sent / elapsed) if elapsed else 0.0,
+        }
+
+
+def _smtp_from_settings() -> SmtpConnection:
+    return SmtpConnection(
+        host=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        username=settings.SMTP_USERNAME,
+        password=settings.SMTP_PASSWORD,
+        starttls=settings.SMTP_STARTTLS,
+        timeout=settings.SMTP_TIMEOUT,
+        sender=settings.EMAIL_FROM,
+    )
+
+
+def criar_email_dispatcher() -> EmailDispatcher:
+    return EmailDispatcher(
+        workers=settings.EMAIL_WORKERS,
+        batch_size=settings.EMAIL_BATCH_SIZE,
+        max_retries=settings.EMAIL_MAX_RETRIES,
+        queue_maxsize=settings.EMAIL_QUEUE_MAXSIZE,
+    )
+
+
+email_dispatcher = LazyProxy(criar_email_dispatcher)
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from core.config import settings
+from core.lazy import LazyProxy
+from services.cache import MISSING, InMemoryLRUCache
+
+
+def cache_key(text: str, model: str, system_prompt: str) -> str:
+    """Hash do texto normalizado + modelo + prompt: muda qualquer um, muda a chave"""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    h = hashlib.sha256()
+    for part in (model, system_prompt, normalized):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SqliteResponseStore:
+    """Camada persistente opcional (sobrevive a restarts e é compartilhada entre workers da mesma máquina)"""
+
+    def __init__(self, path: str, ttl: Optional[float] = None):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl is not None and created_at + self.ttl <= time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _Chamada:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Chamadas concorrentes com a mesma chave compartilham uma única execução.
+
+    A execução roda numa task própria: se quem a iniciou for cancelado, os
+    demais continuam esperando; ela só é cancelada quando não resta ninguém.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Chamada] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]) -> Tuple[object, bool]:
+        """Retorna (resultado, compartilhado)"""
+        chamada = self._inflight.get(key)
+        shared = chamada is not None
+        if chamada is None:
+            chamada = _Chamada(asyncio.ensure_future(fn()))
+            self._inflight[key] = chamada
+            chamada.task.add_done_callback(lambda _: self._descartar(key, chamada))
+
+        chamada.waiters += 1
+        try:
+            return await asyncio.shield(chamada.task), shared
+        except asyncio.CancelledError:
+            if chamada.waiters == 1 and not chamada.task.done():
+                chamada.task.cancel()
+            raise
+        finally:
+            chamada.waiters -= 1
+
+    def _descartar(self, key: str, chamada: _Chamada) -> None:
+        if self._inflight.get(key) is chamada:
+            del self._inflight[key]
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+class LLMResponseCache:
+    """Cache de respostas do modelo: LRU em memória + SQLite opcional + single-flight"""
+
+    def __init__(self, memory: InMemoryLRUCache, store: Optional[SqliteResponseStore] = None):
+        self.memory = memory
+        self.store = store
+        self.singleflight = SingleFlight()
+        self.disk_hits = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> Tuple[str, str]:
+        """
+        Retorna (resposta, origem) com origem em memory|disk|coalesced|upstream. Se `compute`
+        levanta exceção, nada é gravado: validar a resposta dentro dele a mantém fora do cache
+        """
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value, "memory"
+
+        async def carregar():
+            if self.store is not None:
+                cached = await asyncio.to_thread(self.store.get, key)
+                if cached is not None:
+                    self.disk_hits += 1
+                    self.memory.set(key, cached)
+                    return cached, "disk"
+
+            self.upstream_calls += 1
+            fresh = await compute()
+            self.memory.set(key, fresh)
+            if self.store is not None:
+                await asyncio.to_thread(self.store.set, key, fresh)
+            return fresh, "upstream"
+
+        (value, origem), shared = await self.singleflight.do(key, carregar)
+        if shared:
+            self.coalesced += 1
+            return value, "coalesced"
+        return value, origem
+
+    async def descartar(self, key: str) -> None:
+        """Tira a resposta da memória e do disco (ex.: resposta que não passou na validação)"""
+        self.memory.delete(key)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.delete, key)
+
+    def stats(self) -> dict:
+        return {
+            **self.memory.stats(),
+            "disk_hits": self.disk_hits,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.upstream_calls,
+        }
+
+
+def criar_llm_cache() -> LLMResponseCache:
+    return LLMResponseCache(
+        InMemoryLRUCache(maxsize=settings.LLM_CACHE_MAXSIZE, default_ttl=settings.LLM_CACHE_TTL),
+        SqliteResponseStore(settings.LLM_CACHE_SQLITE_PATH, ttl=settings.LLM_CACHE_TTL) if settings.LLM_CACHE_SQLITE_PATH else None,
+    )
+
+
+llm_cache = LazyProxy(criar_llm_cache)
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from typing import Awaitable, Optional
+from fastapi import HTTPException, Request
+from core.config import settings
+from core.lazy import LazyProxy
+from core.request_metrics import medir_dependencia
+from services.llm_parser import solicitar_xml
+
+
+class LLMClient:
+    """
+    Cliente OpenAI assíncrono de vida longa: um pool HTTP com keep-alive para
+    todo o processo e um semáforo que limita as chamadas simultâneas ao modelo.
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, timeout: float = 60.0,
+                 connect_timeout: float = 5.0, max_connections: int = 20, max_concurrency: int = 10,
+                 max_retries: int = 2, client=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.client = client  # cliente pronto (ex.: falso nos benchmarks); senão criado no start()
+        self._http = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._iniciado = False  # volta a False no aclose(): a próxima chamada reabre o pool
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.total_seconds = 0.0
+
+    async def start(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._iniciado = True
+        if self.client is not None:
+            return
+        import httpx
+        from openai import AsyncOpenAI
+
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+        )
+        self.client = AsyncOpenAI(
+            api_key=self.api_key, base_url=self.base_url, http_client=self._http, max_retries=self.max_retries
+        )
+
+    async def aclose(self) -> None:
+        if self._http is not None:  # cliente injetado não é nosso: fica para o próximo start()
+            await self.client.close()
+            self.client = None
+            self._http = None
+        self._semaphore = None
+        self._iniciado = False
+
+    async def solicitar_xml(self, text: str) -> str:
+        if not self._iniciado:
+            await self.start()
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            with medir_dependencia("llm", "chat_completion"):
+                xml = await solicitar_xml(self.client, text)
+            self.calls += 1
+            return xml
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.total_seconds += time.perf_counter() - start
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "avg_ms": (self.total_seconds / self.calls * 1000) if self.calls else 0.0,
+        }
+
+
+async def cancelar_se_desconectar(request: Request, awaitable: Awaitable, intervalo: float = 0.25):
+    """
+    Aguarda o resultado verificando se o cliente HTTP desconectou; se sim,
+    cancela o trabalho pendente e responde 499 (ninguém vai ler a resposta).
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=intervalo)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Cliente desconectou")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def criar_llm_client() -> LLMClient:
+    return LLMClient(
+        api_key=settings.OPENAI_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        timeout=settings.OPENAI_TIMEOUT,
+        connect_timeout=settings.OPENAI_CONNECT_TIMEOUT,
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+    )
+
+
+llm_client = LazyProxy(criar_llm_client)
@@ -0,0 +1,36 @@
+# Chamada ao modelo usada como fallback do parser por regras em /api/parse-party-data
+MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = (
+    "Você é um assistente que recebe um texto com dados de pessoa e "
+    "deve retornar **apenas** um XML válido contendo estas tags:\n"
+    "<name>,<nationality>,<maritalStatus>,<profession>,"
+    "<rg>,<orgaoExpedidor>,<dataExpedicao>,<email>,<phone>,"
+    "<address><street>,<number>,<complement>,<neighborhood>,"
+    "<city>,<state>,<cep></address>\n"
+    "**Importante:** Para o campo `<maritalStatus>` use **somente** um destes valores (exatamente como abaixo):\n"
+    "- Solteiro(a)\n"
+    "- Casado(a)\n"
+    "- Divorciado(a)\n"
+    "- Viúvo(a)\n"
+    "- Separado(a) Judicialmente\n"
+    "Nada além do XML."
+)
+
+
+def build_messages(text: str) -> list:
+    user = f"Dado o texto:\n'''{text}'''\nGere o XML."
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user",   "content": user}
+    ]
+
+
+async def solicitar_xml(client, text: str) -> str:
+    """Pede ao modelo (cliente AsyncOpenAI) o XML de PartyData para o texto"""
+    resp = await client.chat.completions.create(
+        model=MODEL,
+        messages=build_messages(text),
+        temperature=0
+    )
+    return resp.choices[0].message.content
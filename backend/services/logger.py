@@ -1,12 +1,285 @@
 # logger.py
-from loguru import logger
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
 import sys
+import threading
+import uuid
+import zipfile
+from logging.handlers import TimedRotatingFileHandler
+from traceback import format_exception
+from contextvars import ContextVar
+from typing import Optional
+from loguru import logger
+from core.config import settings
+
+# Id da requisição atual, preenchido pelo RequestIdMiddleware e anexado a todo log
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Campos de extra que nunca vão em claro para o log
+CAMPOS_PII = {
+    "email", "to", "cpf", "cnpj", "documento", "celular", "telefone", "senha", "password",
+    "hashed_password", "codigo", "codigo_verificacao", "token",
+}
+RE_EMAIL = re.compile(r"\b[\w.+-]+@([\w-]+(?:\.[\w-]+)+)\b")
+RE_DOCUMENTO = re.compile(r"(?<![\w.])\d{2,3}\.?\d{3}\.?\d{3}(?:/?\d{4})?-?\d{2}(?![\w.])")
+RE_JWT = re.compile(r"\beyJ[\w-]+\.[\w-]+\.[\w-]+")
+
+
+def redigir(texto: str) -> str:
+    """Mascara emails, CPF/CNPJ e JWTs dentro de um texto livre"""
+    if "@" in texto:
+        texto = RE_EMAIL.sub(r"***@\1", texto)
+    texto = RE_DOCUMENTO.sub(lambda m: "*" * (len(m.group()) - 2) + m.group()[-2:], texto)
+    return RE_JWT.sub("[jwt]", texto)
+
+
+def _mascarar(campo: str, valor):
+    if valor is None:
+        return None
+    valor = str(valor)
+    if campo in ("email", "to") and "@" in valor:
+        return "***@" + valor.rsplit("@", 1)[1]
+    if campo in ("cpf", "cnpj", "documento", "celular", "telefone") and len(valor) > 4:
+        return "*" * (len(valor) - 2) + valor[-2:]
+    return "***"
+
+
+def _extra(record) -> dict:
+    extra = {}
+    for campo, valor in record["extra"].items():
+        if campo.startswith("_"):
+            continue
+        if campo in CAMPOS_PII:
+            valor = _mascarar(campo, valor)
+        elif isinstance(valor, str):
+            valor = redigir(valor)
+        elif isinstance(valor, (list, tuple)):
+            valor = [redigir(str(v)) for v in valor]
+        elif not isinstance(valor, (int, float, bool, type(None))):
+            valor = redigir(str(valor))
+        extra[campo] = valor
+    return extra
+
+
+def _traceback(record) -> str:
+    exc = record["exception"]
+    return redigir("".join(format_exception(exc.type, exc.value, exc.traceback)))
+
+
+def _linha_json(record) -> str:
+    linha = {
+        "ts": record["time"].isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "func": record["function"],
+        "line": record["line"],
+        "msg": redigir(record["message"]),
+        **_extra(record),
+    }
+    if record["exception"] is not None:
+        linha["exc"] = _traceback(record)
+    return json.dumps(linha, ensure_ascii=False, default=str)
+
+
+def _linha_texto(record) -> str:
+    extra = _extra(record)
+    rid = extra.pop("request_id", None) or "-"
+    campos = " ".join(f"{k}={v}" for k, v in extra.items())
+    linha = (f"{record['time']:%Y-%m-%d %H:%M:%S} | {record['level'].name:<8} | {rid} | "
+             f"{record['module']}:{record['function']} - {redigir(record['message'])}")
+    linha = f"{linha} {campos}" if campos else linha
+    if record["exception"] is not None:
+        linha = f"{linha}\n{_traceback(record).rstrip()}"
+    return linha
+
+
+def _patcher(record) -> None:
+    request_id = request_id_var.get()
+    if request_id is not None:
+        record["extra"].setdefault("request_id", request_id)
+
+
+class _Descartado:
+    """Logger nulo devolvido por amostrado() quando o log fica de fora da amostra"""
+
+    def _nada(self, *args, **kwargs):
+        pass
+
+    trace = debug = info = success = _nada
+
+
+_descartado = _Descartado()
+
+
+def amostrado(taxa: Optional[float] = None):
+    """
+    Logger para logs de alto volume (uma linha por requisição): só uma fração `taxa`
+    (LOG_SAMPLE_RATE por padrão) é emitida, com o campo amostra=taxa para quem agrega.
+    Decide antes de montar o log, então o descarte custa só um random().
+    """
+    taxa = settings.LOG_SAMPLE_RATE if taxa is None else taxa
+    if taxa >= 1.0:
+        return logger
+    if random.random() < taxa:
+        return logger.bind(amostra=taxa)
+    return _descartado
+
+
+class RequestIdMiddleware:
+    """Middleware ASGI: usa o X-Request-ID recebido (ou gera um) e o devolve na resposta"""
+
+    def __init__(self, app, header: str = "x-request-id"):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for nome, valor in scope["headers"]:
+            if nome == self.header:
+                request_id = valor.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (self.header, request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            request_id_var.reset(token)
+
+
+class FilaDeLog:
+    """
+    Sink do loguru que só enfileira o record (fila em memória, sem pickle nem pipe como
+    no enqueue=True do loguru). Uma thread formata (JSON/texto, redação de PII) e
+    escreve em lote em todas as saídas, então stdout ou disco lentos não seguram a requisição.
+    """
+
+    LOTE = 500
+
+    def __init__(self, saidas, render):
+        self.saidas = saidas
+        self.render = render
+        self._fila: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._escrever, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message) -> None:
+        self._fila.put(message.record)
+
+    def _escrever(self) -> None:
+        while True:
+            itens = [self._fila.get()]
+            while len(itens) < self.LOTE:
+                try:
+                    itens.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            linhas, avisos, fim = [], [], False
+            for item in itens:
+                if item is None:
+                    fim = True
+                elif isinstance(item, threading.Event):
+                    avisos.append(item)
+                else:
+                    try:
+                        linhas.append(self.render(item))
+                    except Exception as e:  # um record ruim não derruba a thread de log
+                        linhas.append(f"<falha ao formatar log: {e!r}>")
+            if linhas:
+                texto = "\n".join(linhas) + "\n"
+                for saida in self.saidas:
+                    try:
+                        saida(texto)
+                    except Exception as e:
+                        sys.__stderr__.write(f"Falha ao escrever log: {e!r}\n")
+            for aviso in avisos:
+                aviso.set()
+            if fim:
+                return
+
+    def esvaziar(self, timeout: float = 5.0) -> None:
+        """Espera tudo o que já foi enfileirado ser escrito"""
+        if self._thread.is_alive():
+            aviso = threading.Event()
+            self._fila.put(aviso)
+            aviso.wait(timeout)
+
+    def fechar(self, timeout: float = 5.0) -> None:
+        if self._thread.is_alive():
+            self._fila.put(None)
+            self._thread.join(timeout)
+        for saida in self.saidas:
+            handler = getattr(saida, "handler", None)
+            if handler is not None:
+                handler.close()
+
+
+def _saida_stream(stream):
+    def escrever(texto: str) -> None:
+        stream.write(texto)
+        stream.flush()
+    return escrever
+
+
+def _compactar(origem: str, destino: str) -> None:
+    with zipfile.ZipFile(destino, "w", zipfile.ZIP_DEFLATED) as z:
+        z.write(origem, os.path.basename(origem))
+    os.remove(origem)
+
+
+def _saida_arquivo(caminho: str):
+    """Arquivo com rotação semanal, 4 semanas de histórico e rotações compactadas em zip"""
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    handler = TimedRotatingFileHandler(caminho, when="W0", backupCount=4, encoding="utf-8")
+    handler.namer = lambda nome: nome + ".zip"
+    handler.rotator = _compactar
+    handler.terminator = ""
+
+    def escrever(texto: str) -> None:
+        handler.emit(logging.makeLogRecord({"msg": texto}))
+
+    escrever.handler = handler
+    return escrever
+
+
+fila_de_log: Optional[FilaDeLog] = None
+
+
+def configurar_logger() -> None:
+    """
+    Reconfigura o loguru: um único sink que enfileira, com a escrita na thread de log.
+    Chamado pelo create_app; antes disso (ou em scripts) vale o sink padrão do loguru no stderr.
+    """
+    global fila_de_log
+    if fila_de_log is not None:
+        fila_de_log.fechar()
+    saidas = [_saida_stream(sys.stdout)]
+    if settings.LOG_FILE:
+        saidas.append(_saida_arquivo(settings.LOG_FILE))
+    fila_de_log = FilaDeLog(saidas, _linha_json if settings.LOG_FORMAT == "json" else _linha_texto)
+
+    logger.remove()
+    logger.configure(patcher=_patcher)
+    logger.add(fila_de_log, format="{message}", level=settings.LOG_LEVEL, catch=True)
+
 
-# Remove handlers padrão do loguru
-logger.remove()
+def encerrar_logger() -> None:
+    if fila_de_log is not None:
+        fila_de_log.fechar()
 
-# Adiciona handler para terminal (com cores)
-logger.add(sys.stdout, colorize=True, format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>", level="DEBUG")
 
-# Adiciona handler para arquivo
-logger.add("logs/app.log", rotation="1 week", retention="4 weeks", compression="zip", level="INFO", enqueue=True)
+atexit.register(encerrar_logger)
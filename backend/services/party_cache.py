@@ -0,0 +1,118 @@
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.lazy import LazyProxy
+from models.models import Partes, PessoaFisica, PessoaJuridica
+from services.cache import MISSING, CacheBackend, InMemoryLRUCache
+
+_PENDING_KEY = "party_cache_invalidate"
+
+
+class Parte(NamedTuple):
+    nome: str
+    versao: Optional[datetime]  # Partes.updated_at, para o ETag
+
+
+class PartyNameCache:
+    """Cache documento normalizado -> Parte (nome e versão), com cache negativo para não encontrados"""
+
+    def __init__(self, backend: CacheBackend, ttl: float, negative_ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    def get(self, document: str):
+        """Retorna a Parte, None (não encontrado cacheado) ou MISSING"""
+        return self.backend.get(document)
+
+    def get_many(self, documents: Iterable[str]) -> Dict[str, Optional[Parte]]:
+        return self.backend.get_many(documents)
+
+    def set(self, document: str, parte: Optional[Parte]) -> None:
+        self.backend.set(document, parte, self.ttl if parte is not None else self.negative_ttl)
+
+    def invalidate(self, *documents: str) -> None:
+        self.backend.delete_many(doc for doc in documents if doc)
+
+    def stats(self) -> Dict[str, int]:
+        return self.backend.stats()
+
+
+def criar_party_cache() -> PartyNameCache:
+    return PartyNameCache(
+        InMemoryLRUCache(maxsize=settings.PARTY_CACHE_MAXSIZE),
+        ttl=settings.PARTY_CACHE_TTL,
+        negative_ttl=settings.PARTY_CACHE_NEGATIVE_TTL,
+    )
+
+
+party_cache = LazyProxy(criar_party_cache)
+
+
+# Invalidação write-through: qualquer insert/update/delete via ORM em
+# PessoaFisica/PessoaJuridica remove o documento (valor antigo e novo) do cache.
+# Escritas em massa via Core não disparam estes eventos e devem chamar
+# party_cache.invalidate explicitamente.
+def _documentos_alterados(target, attr: str):
+    history = inspect(target).attrs[attr].history
+    return [doc for doc in (*history.deleted, getattr(target, attr)) if doc]
+
+
+def _invalidar(target, attr: str):
+    docs = _documentos_alterados(target, attr)
+    party_cache.invalidate(*docs)
+    # Invalida de novo no commit: uma leitura concorrente entre o flush e o
+    # commit ainda enxerga o nome antigo e poderia recolocá-lo no cache
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).update(docs)
+
+
+@event.listens_for(PessoaFisica, "after_insert")
+@event.listens_for(PessoaFisica, "after_update")
+@event.listens_for(PessoaFisica, "after_delete")
+def _invalidar_pessoa_fisica(mapper, connection, target):
+    _invalidar(target, "cpf")
+
+
+@event.listens_for(PessoaJuridica, "after_insert")
+@event.listens_for(PessoaJuridica, "after_update")
+@event.listens_for(PessoaJuridica, "after_delete")
+def _invalidar_pessoa_juridica(mapper, connection, target):
+    _invalidar(target, "cnpj")
+
+
+@event.listens_for(PessoaFisica, "after_update")
+@event.listens_for(PessoaJuridica, "after_update")
+def _nova_versao_da_parte(mapper, connection, target):
+    # Nome e documento ficam na tabela da pessoa; a versão (ETag de /api/party) fica em Partes
+    connection.execute(update(Partes).where(Partes.id == target.id).values(updated_at=datetime.now()))
+
+
+@event.listens_for(Partes, "after_update")
+def _invalidar_soft_delete(mapper, connection, target):
+    # Excluir/restaurar a parte muda o resultado da busca por documento
+    if not inspect(target).attrs.deleted_at.history.has_changes():
+        return
+    docs = [
+        *connection.execute(select(PessoaFisica.cpf).where(PessoaFisica.id == target.id)).scalars(),
+        *connection.execute(select(PessoaJuridica.cnpj).where(PessoaJuridica.id == target.id)).scalars(),
+    ]
+    party_cache.invalidate(*docs)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).update(docs)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_no_commit(session):
+    docs = session.info.pop(_PENDING_KEY, None)
+    if docs:
+        party_cache.invalidate(*docs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendentes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from typing import AsyncIterator, Sequence
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from core.config import settings
+from services.party_importer import PARTE_CAMPOS, PF_CAMPOS, PJ_CAMPOS
+from services.queries import exportacao_partes_do_usuario
+
+# Mesmas colunas que o importador lê: um arquivo exportado pode ser reimportado em /party/import
+COLUNAS = ("id", "tipo", "documento", *PARTE_CAMPOS, *PF_CAMPOS, *PJ_CAMPOS)
+
+MEDIA_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _json_default(valor):
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} não serializável")
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, default=_json_default)
+
+
+def _jsonl(linhas: Sequence[tuple]) -> str:
+    # Campos nulos ficam de fora (o importador lê chave ausente como nula): PF e PJ têm colunas disjuntas
+    return "".join(
+        _encoder.encode({k: v for k, v in zip(COLUNAS, linha) if v is not None}) + "\n" for linha in linhas
+    )
+
+
+class _Csv:
+    """Serializa blocos de linhas reaproveitando o mesmo buffer"""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+
+    def __call__(self, linhas: Sequence[tuple]) -> str:
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.writer.writerows(linhas)
+        return self.buffer.getvalue()
+
+
+async def exportar_partes(sessoes: async_sessionmaker, usuario_id: int, formato: str,
+                          comprimir: bool = False) -> AsyncIterator[bytes]:
+    """
+    Gera o arquivo de partes do usuário (jsonl ou csv, opcionalmente gzip) em blocos.
+
+    A consulta roda num cursor do lado do servidor (yield_per): cada bloco de
+    PARTY_EXPORT_YIELD_PER linhas é serializado e entregue antes do próximo ser lido,
+    então a memória não cresce com o número de partes. Abre a própria sessão em `sessoes`
+    (get_async_sessionmaker), porque a do Depends é fechada antes do corpo da
+    StreamingResponse ser enviado; a conexão fica presa ao export até o fim (ou até o
+    cliente desconectar), e a sessão fecha junto com o gerador.
+    """
+    serializar = _jsonl if formato == "jsonl" else _Csv()
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if comprimir else None
+
+    def bloco(texto: str) -> bytes:
+        dados = texto.encode("utf-8")
+        return gzip.compress(dados) if gzip else dados
+
+    if formato == "csv" and (cabecalho := bloco(",".join(COLUNAS) + "\n")):
+        yield cabecalho
+
+    stmt = exportacao_partes_do_usuario(usuario_id, COLUNAS).execution_options(
+        yield_per=settings.PARTY_EXPORT_YIELD_PER
+    )
+    async with sessoes() as db:
+        result = await db.stream(stmt)
+        async for linhas in result.partitions():
+            dados = bloco(serializar(linhas))
+            if dados:
+                yield dados
+
+    if gzip:
+        yield gzip.flush()
@@ -0,0 +1,358 @@
+import csv
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.models import Partes, PessoaFisica, PessoaJuridica
+from services.logger import logger
+from services.party_cache import party_cache
+from services.party_search import reindexar
+from utils.validators import clean_document, is_cnpj, is_cpf, normalizar_documento, validar_documentos
+
+PARTE_CAMPOS = (
+    "email", "telefone", "celular", "cep", "logradouro", "numero", "complemento",
+    "bairro", "cidade", "uf", "cpf_responsavel",
+)
+PF_CAMPOS = (
+    "nome", "data_nascimento", "identidade", "orgao_expedidor", "data_expedicao", "nit",
+    "nome_social", "genero", "estado_civil", "profissao", "nacionalidade", "genitor_1", "genitor_2",
+)
+PJ_CAMPOS = ("razao_social", "nome_fantasia", "inscricao_estadual", "inscricao_municipal")
+CAMPOS_DATA = ("data_nascimento", "data_expedicao")
+
+
+class RegistroInvalido(ValueError):
+    pass
+
+
+@dataclass
+class Registro:
+    linha: int
+    tipo: str  # 'fisica' ou 'juridica'
+    documento: str
+    parte: Dict[str, object]
+    pessoa: Dict[str, object]
+
+
+@dataclass
+class ImportReport:
+    lidos: int = 0
+    inseridos: int = 0
+    atualizados: int = 0
+    rejeitados: int = 0
+    lotes: int = 0
+    segundos: float = 0.0
+    amostra_rejeitados: List[dict] = field(default_factory=list)
+
+    @property
+    def linhas_por_segundo(self) -> float:
+        return self.lidos / self.segundos if self.segundos else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "lidos": self.lidos,
+            "inseridos": self.inseridos,
+            "atualizados": self.atualizados,
+            "rejeitados": self.rejeitados,
+            "lotes": self.lotes,
+            "segundos": round(self.segundos, 3),
+            "linhas_por_segundo": round(self.linhas_por_segundo, 1),
+            "amostra_rejeitados": self.amostra_rejeitados,
+        }
+
+
+def ler_csv(stream: IO[str]) -> Iterator[Tuple[int, dict]]:
+    """Gera (linha, registro) de um CSV com cabeçalho; aceita ',' ou ';'"""
+    inicio = stream.readline()
+    delimitador = ";" if inicio.count(";") > inicio.count(",") else ","
+    cabecalho = next(csv.reader([inicio], delimiter=delimitador))
+    leitor = csv.DictReader(stream, fieldnames=[c.strip().lower() for c in cabecalho], delimiter=delimitador)
+    for numero, row in enumerate(leitor, start=2):
+        yield numero, row
+
+
+def ler_jsonl(stream: IO[str]) -> Iterator[Tuple[int, dict]]:
+    """Gera (linha, registro) de um arquivo com um objeto JSON por linha"""
+    for numero, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield numero, {"__erro__": f"JSON inválido: {e.msg}", "bruto": line}
+            continue
+        yield numero, row if isinstance(row, dict) else {"__erro__": "registro não é um objeto JSON", "bruto": line}
+
+
+LEITORES = {"csv": ler_csv, "jsonl": ler_jsonl}
+
+
+def _data(valor) -> Optional[date]:
+    if valor in (None, ""):
+        return None
+    if isinstance(valor, date):
+        return valor
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(str(valor).strip(), fmt).date()
+        except ValueError:
+            pass
+    raise RegistroInvalido(f"data inválida: {valor}")
+
+
+def _texto(valor) -> Optional[str]:
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _preenchidos(campos: dict) -> dict:
+    return {k: v for k, v in campos.items() if v is not None}
+
+
+def _agrupados(linhas: List[dict]) -> List[dict]:
+    """
+    O insert/update em massa do ORM faz um executemany por sequência de linhas com as
+    mesmas chaves; PF e PJ alternadas ou campos vazios omitidos virariam um comando por linha
+    """
+    return sorted(linhas, key=lambda linha: tuple(sorted(linha)))
+
+
+def _documento(row: dict) -> str:
+    return normalizar_documento(str(row.get("documento") or row.get("cpf") or row.get("cnpj") or ""))
+
+
+def normalizar(linha: int, row: dict, documento_valido: Optional[bool] = None) -> Registro:
+    """
+    Valida e normaliza um registro bruto; levanta RegistroInvalido. `documento_valido`
+    vem da validação do lote inteiro (validar_documentos); sem ele o documento é conferido aqui
+    """
+    if "__erro__" in row:
+        raise RegistroInvalido(row["__erro__"])
+
+    documento = _documento(row)
+    if documento_valido is None:
+        documento_valido = is_cpf(documento) or is_cnpj(documento)
+    if not documento_valido:
+        raise RegistroInvalido("documento inválido")
+    tipo, campos = ("fisica", PF_CAMPOS) if len(documento) == 11 else ("juridica", PJ_CAMPOS)
+
+    tipo_informado = _texto(row.get("tipo"))
+    if tipo_informado and tipo_informado.lower() != tipo:
+        raise RegistroInvalido(f"tipo '{tipo_informado}' não confere com o documento")
+
+    parte = {c: _texto(row.get(c)) for c in PARTE_CAMPOS}
+    if not parte["email"]:
+        raise RegistroInvalido("email obrigatório")
+    if parte["cpf_responsavel"]:
+        parte["cpf_responsavel"] = clean_document(parte["cpf_responsavel"])
+    if parte["cep"]:
+        parte["cep"] = clean_document(parte["cep"])
+
+    pessoa = {c: _texto(row.get(c)) for c in campos}
+    if tipo == "fisica" and not pessoa["nome"]:
+        pessoa["nome"] = _texto(row.get("razao_social"))
+    if tipo == "juridica" and not pessoa["razao_social"]:
+        pessoa["razao_social"] = _texto(row.get("nome"))
+    obrigatorio = "nome" if tipo == "fisica" else "razao_social"
+    if not pessoa[obrigatorio]:
+        raise RegistroInvalido(f"{obrigatorio} obrigatório")
+    for c in CAMPOS_DATA:
+        if c in pessoa:
+            pessoa[c] = _data(pessoa[c])
+
+    return Registro(linha, tipo, documento, parte, pessoa)
+
+
+class PartyImporter:
+    """
+    Importação em massa de partes (Partes + PessoaFisica/PessoaJuridica).
+
+    Lê o arquivo como gerador e grava em lotes de `batch_size`, com upsert pelo
+    cpf/cnpj: documentos já existentes têm Partes e pessoa atualizados, os novos
+    são inseridos. Com `usuario_id`, documentos de outro usuário são rejeitados em vez
+    de mudar de dono. A memória fica limitada a um lote; a sessão é esvaziada a cada commit.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 1000, usuario_id: Optional[int] = None,
+                 rejeitados: Optional[IO[str]] = None, amostra_rejeitados: int = 100):
+        self.db = db
+        self.batch_size = batch_size
+        self.usuario_id = usuario_id
+        self.rejeitados = rejeitados
+        self.max_amostra = amostra_rejeitados
+        self.report = ImportReport()
+
+    def importar(self, registros: Iterable[Tuple[int, dict]]) -> ImportReport:
+        start = time.perf_counter()
+        iterator = iter(registros)
+        while True:
+            brutos = list(islice(iterator, self.batch_size))
+            if not brutos:
+                break
+            self.report.lidos += len(brutos)
+            self._lote(brutos)
+            self.report.segundos = time.perf_counter() - start
+        self.report.segundos = time.perf_counter() - start
+        return self.report
+
+    def _rejeitar(self, linha: int, motivo: str, row: dict) -> None:
+        self.report.rejeitados += 1
+        item = {"linha": linha, "motivo": motivo, "registro": {k: v for k, v in row.items() if k != "__erro__"}}
+        if self.rejeitados is not None:
+            self.rejeitados.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+        if len(self.report.amostra_rejeitados) < self.max_amostra:
+            self.report.amostra_rejeitados.append(item)
+
+    def _lote(self, brutos: List[Tuple[int, dict]]) -> None:
+        # Normaliza e deduplica dentro do lote: a última ocorrência do documento vence
+        validos: Dict[str, Registro] = {}
+        originais: Dict[int, dict] = {}
+        documentos_ok = validar_documentos([_documento(row) for _, row in brutos])
+        for (linha, row), documento_ok in zip(brutos, documentos_ok):
+            try:
+                registro = normalizar(linha, row, documento_ok)
+            except RegistroInvalido as e:
+                self._rejeitar(linha, str(e), row)
+                continue
+            anterior = validos.pop(registro.documento, None)
+            if anterior is not None:
+                self._rejeitar(anterior.linha, "documento repetido no arquivo; mantida a última ocorrência",
+                               originais[anterior.linha])
+            validos[registro.documento] = registro
+            originais[linha] = row
+
+        if not validos:
+            return
+        registros = list(validos.values())
+        existentes = self._existentes(registros)
+        registros = self._sem_documentos_de_outros(registros, existentes, originais)
+        try:
+            inseridos, atualizados = self._gravar(registros, existentes)
+            self.db.commit()
+        except IntegrityError:
+            # Outro processo gravou o mesmo documento entre a consulta e o insert:
+            # refaz o lote registro a registro para isolar os conflitos
+            self.db.rollback()
+            inseridos = atualizados = 0
+            for registro in registros:
+                try:
+                    with self.db.begin_nested():
+                        existentes = self._existentes([registro])
+                        if not self._sem_documentos_de_outros([registro], existentes, originais):
+                            continue
+                        i, a = self._gravar([registro], existentes)
+                    inseridos += i
+                    atualizados += a
+                except IntegrityError as e:
+                    self._rejeitar(registro.linha, f"conflito no banco: {e.orig}", originais[registro.linha])
+            self.db.commit()
+        finally:
+            self.db.expunge_all()
+
+        # Insert/update em massa não dispara os eventos do mapper
+        party_cache.invalidate(*validos)
+        self.report.inseridos += inseridos
+        self.report.atualizados += atualizados
+        self.report.lotes += 1
+
+    def _existentes(self, registros: List[Registro]) -> Dict[str, Tuple[int, Optional[int]]]:
+        """documento -> (id, usuario_id) das partes que já estão no banco"""
+        existentes = {}
+        cpfs = [r.documento for r in registros if r.tipo == "fisica"]
+        cnpjs = [r.documento for r in registros if r.tipo == "juridica"]
+        for pessoa, coluna, documentos in ((PessoaFisica, PessoaFisica.cpf, cpfs),
+                                           (PessoaJuridica, PessoaJuridica.cnpj, cnpjs)):
+            if documentos:
+                linhas = self.db.execute(
+                    select(coluna, Partes.id, Partes.usuario_id)
+                    .join(Partes, Partes.id == pessoa.id)
+                    .where(coluna.in_(documentos))
+                )
+                existentes.update((documento, (id_, dono)) for documento, id_, dono in linhas)
+        return existentes
+
+    def _sem_documentos_de_outros(self, registros: List[Registro], existentes: Dict[str, Tuple[int, Optional[int]]],
+                                  originais: Dict[int, dict]) -> List[Registro]:
+        """Rejeita os documentos já cadastrados por outro usuário: a importação não muda o dono da parte"""
+        if self.usuario_id is None:
+            return registros
+        proprios = []
+        for r in registros:
+            if r.documento in existentes and existentes[r.documento][1] != self.usuario_id:
+                self._rejeitar(r.linha, "documento cadastrado por outro usuário", originais[r.linha])
+            else:
+                proprios.append(r)
+        return proprios
+
+    def _inserir_partes(self, novos: List[Registro]) -> List[int]:
+        """
+        Insert em massa de Partes e os ids na ordem de `novos`. Sem RETURNING (MySQL) o
+        flush do ORM faria um INSERT por linha; aqui é um executemany do Core (todas as
+        linhas com as mesmas colunas) e uma consulta pelos ids, pela chave_importacao
+        """
+        lote = uuid.uuid4().hex
+        chaves = [f"{lote}:{r.documento}" for r in novos]
+        self.db.execute(insert(Partes.__table__), [
+            {"tipo": r.tipo, "usuario_id": self.usuario_id, "chave_importacao": chave, **r.parte}
+            for chave, r in zip(chaves, novos)
+        ])
+        ids = dict(self.db.execute(
+            select(Partes.chave_importacao, Partes.id).where(Partes.chave_importacao.in_(chaves))
+        ).all())
+        return [ids[chave] for chave in chaves]
+
+    def _gravar(self, registros: List[Registro], existentes: Dict[str, Tuple[int, Optional[int]]]) -> Tuple[int, int]:
+        novos = [r for r in registros if r.documento not in existentes]
+        antigos = [r for r in registros if r.documento in existentes]
+        gravados = [existentes[r.documento][0] for r in antigos]
+
+        if novos:
+            ids = self._inserir_partes(novos)
+            gravados.extend(ids)
+            pf = [{"id": id_, "cpf": r.documento, **r.pessoa} for id_, r in zip(ids, novos) if r.tipo == "fisica"]
+            pj = [{"id": id_, "cnpj": r.documento, **r.pessoa} for id_, r in zip(ids, novos) if r.tipo == "juridica"]
+            if pf:
+                self.db.execute(insert(PessoaFisica), _agrupados(pf))
+            if pj:
+                self.db.execute(insert(PessoaJuridica), _agrupados(pj))
+
+        if antigos:
+            # Campos vazios no arquivo não apagam o que já está no banco. A versão (ETag de
+            # /api/party) muda mesmo que só a pessoa tenha mudado: o update em massa não dispara eventos.
+            # O dono não muda: documentos de outro usuário já foram rejeitados
+            agora = datetime.now()
+            self.db.execute(update(Partes), _agrupados([
+                {"id": existentes[r.documento][0], **_preenchidos(r.parte), "updated_at": agora} for r in antigos
+            ]))
+            pf = [{"id": existentes[r.documento][0], **_preenchidos(r.pessoa)} for r in antigos if r.tipo == "fisica"]
+            pj = [{"id": existentes[r.documento][0], **_preenchidos(r.pessoa)} for r in antigos if r.tipo == "juridica"]
+            if pf:
+                self.db.execute(update(PessoaFisica), _agrupados(pf))
+            if pj:
+                self.db.execute(update(PessoaJuridica), _agrupados(pj))
+
+        # Insert/update em massa não dispara os eventos do mapper que mantêm o índice de busca
+        reindexar(self.db.connection(), gravados)
+        return len(novos), len(antigos)
+
+
+def importar_arquivo(db: Session, stream: IO[str], formato: str, **kwargs) -> ImportReport:
+    """Importa um stream de texto CSV ou JSONL"""
+    if formato not in LEITORES:
+        raise ValueError(f"Formato não suportado: {formato}")
+    report = PartyImporter(db, **kwargs).importar(LEITORES[formato](stream))
+    logger.info(
+        "Importação de partes concluída", formato=formato, lidos=report.lidos, inseridos=report.inseridos,
+        atualizados=report.atualizados, rejeitados=report.rejeitados,
+        linhas_por_segundo=round(report.linhas_por_segundo),
+    )
+    return report
@@ -0,0 +1,115 @@
+"""
+Texto livre -> dados de PartyData, para /api/parse-party-data e a versão em lote.
+
+O parser por regras resolve as qualificações no formato usual; abaixo de
+PARTY_PARSER_MIN_CONFIDENCE o texto vai para o modelo, passando pelo cache de respostas.
+"""
+import asyncio
+import json
+import time
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, NamedTuple, Optional, Sequence, Tuple
+from core.config import settings
+from services.cep_index import cep_index
+from services.llm_cache import cache_key, llm_cache
+from services.llm_client import llm_client
+from services.llm_parser import MODEL, SYSTEM_PROMPT
+from services.logger import logger
+from services.party_parser import ParseResult, from_xml, parse_party_text, to_xml
+
+
+class TextoParseado(NamedTuple):
+    xml: str  # sempre no formato de to_xml, pelas regras ou pelo modelo
+    path: str  # rules | llm
+    confidence: float
+    fields: Dict[str, str]
+    cache: Optional[str] = None  # origem da resposta do modelo (memory|disk|coalesced|upstream)
+
+
+def pelas_regras(text: str) -> ParseResult:
+    # O índice de CEP completa e confere o endereço sem sair da máquina
+    return parse_party_text(text, cep_index.buscar if cep_index.disponivel else None)
+
+
+async def pelo_modelo(text: str) -> Tuple[Dict[str, str], str]:
+    """
+    (campos, origem) do modelo para o texto, pelo cache. Só entra no cache a resposta que
+    from_xml aceita: uma resposta truncada ou fora do formato não volta até o TTL
+    """
+    chave = cache_key(text, MODEL, SYSTEM_PROMPT)
+
+    async def perguntar() -> str:
+        xml = await llm_client.solicitar_xml(text)
+        from_xml(xml)  # ValueError aqui e a resposta não é gravada
+        return xml
+
+    xml, origem = await llm_cache.get_or_compute(chave, perguntar)
+    try:
+        return from_xml(xml), origem
+    except ValueError:
+        # Gravada antes desta validação (ex.: no SQLite de outra versão): sai do cache
+        await llm_cache.descartar(chave)
+        raise
+
+
+async def parsear_texto(text: str, limite: Optional[asyncio.Semaphore] = None) -> TextoParseado:
+    """
+    Regras primeiro; se a confiança não basta, o modelo (dentro de `limite`, se houver).
+    A resposta do modelo é relida e remontada por to_xml, então os dois caminhos devolvem
+    o mesmo XML; ValueError se ela não tiver as tags de PartyData
+    """
+    result = pelas_regras(text)
+    if result.confidence >= settings.PARTY_PARSER_MIN_CONFIDENCE:
+        return TextoParseado(to_xml(result.fields), "rules", result.confidence, result.fields)
+    async with limite or nullcontext():
+        campos, origem = await pelo_modelo(text)
+    return TextoParseado(to_xml(campos), "llm", result.confidence, campos, origem)
+
+
+def _linha(dados: dict) -> bytes:
+    return (json.dumps(dados, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def parsear_em_lote(textos: Sequence[str], formato: str = "xml",
+                          concorrencia: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Gera uma linha NDJSON por texto, na ordem em que ficam prontos (com o `index` do
+    texto), e no fim uma linha `summary`. Os textos que vão para o modelo rodam em
+    paralelo, no máximo `concorrencia` por lote (o LLMClient ainda limita o processo
+    inteiro), então o lote leva perto do texto mais lento e não da soma. Erro num texto
+    vira `status: error` na linha dele; se o cliente desconectar, o que falta é cancelado.
+    """
+    limite = asyncio.Semaphore(concorrencia or settings.PARTY_PARSE_BATCH_CONCURRENCY)
+    inicio_lote = time.perf_counter()
+
+    async def processar(index: int, text: str) -> dict:
+        start = time.perf_counter()
+        item = {"index": index, "text": text}
+        try:
+            parsed = await parsear_texto(text, limite)
+            item.update(status="ok", path=parsed.path, confidence=round(parsed.confidence, 2), cache=parsed.cache)
+            if formato == "json":
+                item["fields"] = parsed.fields
+            else:
+                item["xml"] = parsed.xml
+        except Exception as exc:
+            logger.warning("Falha ao interpretar texto do lote", index=index, erro=repr(exc))
+            item.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        item["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return item
+
+    tarefas = [asyncio.ensure_future(processar(i, text)) for i, text in enumerate(textos)]
+    erros = 0
+    try:
+        for pronta in asyncio.as_completed(tarefas):
+            item = await pronta
+            erros += item["status"] == "error"
+            yield _linha(item)
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+    yield _linha({"summary": {
+        "items": len(tarefas), "ok": len(tarefas) - erros, "errors": erros,
+        "ms": round((time.perf_counter() - inicio_lote) * 1000, 1),
+    }})
@@ -0,0 +1,414 @@
+"""
+Extração por regras dos dados de qualificação de partes ("brasileiro, casado,
+advogado, RG nº ..., residente à Rua ..., CEP ...") nas mesmas tags XML que o
+modelo devolve em /api/parse-party-data.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+ADDRESS_TAGS = ("street", "number", "complement", "neighborhood", "city", "state", "cep")
+PARTY_TAGS = (
+    "name", "nationality", "maritalStatus", "profession",
+    "rg", "orgaoExpedidor", "dataExpedicao", "email", "phone",
+)
+
+UFS = {
+    "acre": "AC", "alagoas": "AL", "amapa": "AP", "amazonas": "AM", "bahia": "BA", "ceara": "CE",
+    "distrito federal": "DF", "espirito santo": "ES", "goias": "GO", "maranhao": "MA",
+    "mato grosso": "MT", "mato grosso do sul": "MS", "minas gerais": "MG", "para": "PA",
+    "paraiba": "PB", "parana": "PR", "pernambuco": "PE", "piaui": "PI", "rio de janeiro": "RJ",
+    "rio grande do norte": "RN", "rio grande do sul": "RS", "rondonia": "RO", "roraima": "RR",
+    "santa catarina": "SC", "sao paulo": "SP", "sergipe": "SE", "tocantins": "TO",
+}
+SIGLAS_UF = set(UFS.values())
+
+NACIONALIDADES = {
+    "brasileiro", "brasileira", "brasileiro nato", "brasileira nata", "brasileiro naturalizado",
+    "brasileira naturalizada", "portugues", "portuguesa", "argentino", "argentina", "uruguaio",
+    "uruguaia", "paraguaio", "paraguaia", "chileno", "chilena", "boliviano", "boliviana",
+    "peruano", "peruana", "colombiano", "colombiana", "venezuelano", "venezuelana",
+    "italiano", "italiana", "espanhol", "espanhola", "frances", "francesa", "alemao", "alema",
+    "japones", "japonesa", "chines", "chinesa", "norte-americano", "norte-americana",
+    "estadunidense", "angolano", "angolana", "haitiano", "haitiana", "estrangeiro", "estrangeira",
+}
+
+ESTADOS_CIVIS = {
+    "separado": "Separado(a) Judicialmente",
+    "solteiro": "Solteiro(a)",
+    "casado": "Casado(a)",
+    "divorciado": "Divorciado(a)",
+    "viuvo": "Viúvo(a)",
+}
+RE_ESTADO_CIVIL = re.compile(r"\b(separad[oa]\s+judicialmente|solteir[oa]|casad[oa]|divorciad[oa]|viuv[oa])\b")
+RE_UNIAO_ESTAVEL = re.compile(r"\b(?:uniao\s+estavel|convivente)\b")
+# Textos que as regras não montam direito e vão sempre ao modelo: união estável (fora das
+# opções de estado civil de PartyData), pessoa jurídica e parte representada ou assistida,
+# com os dados de outra pessoa no mesmo trecho
+RE_PARA_O_MODELO = re.compile(
+    r"\b(?:uniao\s+estavel|convivente|pessoa\s+juridica|cnpj|ltda|eireli|razao\s+social|"
+    r"representad[oa]|assistid[oa]|menor\s+(?:im)?pubere|neste\s+ato|"
+    r"por\s+seu\s+(?:pai|procurador)|por\s+sua\s+(?:mae|procuradora))\b"
+)
+
+PARTICULAS = {"de", "da", "do", "das", "dos", "e", "del", "di", "van", "von"}
+
+# Os padrões rodam sobre o texto sem acentos e em minúsculas (mesmo tamanho do original)
+RE_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+RE_CEP = re.compile(r"\b(\d{2})\.?(\d{3})-?(\d{3})\b")
+RE_TELEFONE = re.compile(r"(?:\+?55\s*)?\(?\b(\d{2})\)?\s*(9?\d{4})[\s.-]?(\d{4})\b")
+RE_DATA = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b")
+RE_RG = re.compile(
+    r"\b(?:rg|r\.g\.|identidade|cedula de identidade|carteira de identidade)\b"
+    r"(?:\s+(?:civil|n[ºo°.]*|numero|sob\s+o|de|do))*\s*[:.]?\s*([\dx][\dx.\-/ ]{3,}[\dx])"
+)
+RE_ORGAO = re.compile(
+    r"\b(ssp|sesp|sds|sspds|pc|pcivil|detran|ifp|iipr|iird|dgpc|sejusp|mre|dpf|mae|mex|mm|cnh|oab|crm|crea)"
+    r"(?:\s*[/-]\s*([a-z]{2}))?\b"
+)
+RE_EXPEDICAO = re.compile(r"\b(?:expedid[oa]|emitid[oa]|expedicao)\b[^0-9]{0,20}" + RE_DATA.pattern)
+RE_RESIDENCIA = re.compile(
+    r"\b(?:residente(?:\s+e\s+domiciliad[oa])?|domiciliad[oa](?:\s+e\s+residente)?|com\s+endereco|"
+    r"estabelecid[oa]|sediad[oa]|com\s+sede)\s*(?:na|no|a|à|em|sito\s+a|sito\s+na|situad[oa]\s+na)?\s+"
+)
+RE_NUMERO = re.compile(r"^(?:n[ºo°.]*\s*|numero\s+)?(\d+[a-z]?|s/n|s/nº|sem numero)$")
+RE_NUMERO_INLINE = re.compile(r"^(.*?)[\s,]+(?:n[ºo°.]+|numero)\s*(\d+[a-z]?|s/n)$")
+RE_COMPLEMENTO = re.compile(
+    r"^(?:apto|ap\.?|apartamento|casa|bloco|bl\.?|sala|sl\.?|conjunto|cj\.?|andar|lote|quadra|qd\.?|"
+    r"fundos|loja|torre|unidade|km)\b"
+)
+RE_CIDADE_UF = re.compile(r"^(?:(?:na\s+)?cidade\s+de\s+|municipio\s+de\s+|em\s+)?(.+?)\s*(?:/|-|–)\s*([a-z]{2})$")
+RE_CIDADE = re.compile(r"^(?:na\s+)?(?:cidade|municipio)\s+de\s+(.+)$")
+RE_ESTADO = re.compile(r"^(?:no\s+)?estado\s+d[eoa]\s+(.+)$")
+RE_PALAVRAS_CHAVE = re.compile(
+    r"\b(portador|portadora|inscrit[oa]|cpf|cnpj|rg|oab|residente|domiciliad[oa]|nascid[oa]|filh[oa]|"
+    r"sob\s+o|numero|telefone|celular|e-mail|email|cep)\b"
+)
+RE_CONSUMIVEIS = re.compile(
+    r"\b(cpf|cnpj|cpf/mf|inscrit[oa]|oab|nascid[oa]|filh[oa]|pis|nit|ctps|titulo de eleitor)\b"
+)
+# Separação de várias partes num mesmo texto: parágrafos, itens numerados e o nome em
+# maiúsculas seguido de vírgula que abre cada qualificação ("...; e MARIA DE SOUZA, brasileira")
+RE_PARAGRAFO = re.compile(r"\n\s*\n")
+RE_ITEM = re.compile(r"^[ \t]*(?:\d{1,2}|[a-z])[.)\-–][ \t]+|^[ \t]*[•*\-–][ \t]+", re.MULTILINE)
+RE_NOVA_PARTE = re.compile(
+    r"(?:[;.]\s*|\n\s*)(?:e\s+)?(?=[A-ZÀ-ÖØ-Þ][A-ZÀ-ÖØ-Þ'.-]+(?:\s+[A-ZÀ-ÖØ-Þ][A-ZÀ-ÖØ-Þ'.-]*)+\s*,)"
+)
+# Resposta do modelo: cercas de código, declaração XML e "&" sem escape ("Silva & Filhos")
+RE_CERCA_XML = re.compile(r"^\s*```(?:xml)?\s*|\s*```\s*$")
+RE_DECLARACAO_XML = re.compile(r"<\?xml[^>]*\?>")
+RE_AMPERSAND_SOLTO = re.compile(r"&(?!#?\w+;)")
+RE_SEPARADOR = re.compile(r"(?<!\d)[,;]|[,;](?!\d)|\s+-\s+(?=cep|tel|e-?mail)")
+
+
+@dataclass
+class ParseResult:
+    fields: Dict[str, str] = field(default_factory=dict)
+    confidence: float = 0.0
+    unmatched: List[str] = field(default_factory=list)
+    cep_confere: Optional[bool] = None  # None: sem consulta de CEP ou CEP fora do índice
+
+
+# Tabela Latin-1/Latin Extended -> letra base, um caractere por caractere
+_SEM_ACENTO = str.maketrans({
+    chr(c): unicodedata.normalize("NFKD", chr(c))[0]
+    for c in range(0x80, 0x250)
+    if unicodedata.normalize("NFKD", chr(c))[0] != chr(c)
+})
+
+
+def sem_acento(texto: str) -> str:
+    """Remove acentos preservando o tamanho do texto (ç -> c, ã -> a)"""
+    return texto.translate(_SEM_ACENTO)
+
+
+def _parece_nome(texto: str) -> bool:
+    palavras = texto.split()
+    if len(palavras) < 2 or re.search(r"\d", texto):
+        return False
+    if RE_PALAVRAS_CHAVE.search(sem_acento(texto).lower()):
+        return False
+    return texto.isupper() or all(p[0].isupper() or p.lower() in PARTICULAS for p in palavras)
+
+
+def _nome_proprio(texto: str) -> str:
+    palavras = texto.split()
+    if not texto.isupper():
+        return " ".join(palavras)
+    return " ".join(
+        p.lower() if i and p.lower() in PARTICULAS else p.capitalize()
+        for i, p in enumerate(palavras)
+    )
+
+
+def _capitalizar(texto: str) -> str:
+    return texto[:1].upper() + texto[1:]
+
+
+def _comparavel(texto: str) -> str:
+    return " ".join(sem_acento(texto).lower().split())
+
+
+def _uf(texto: str) -> Optional[str]:
+    chave = sem_acento(texto).lower().strip(" .")
+    if chave.upper() in SIGLAS_UF:
+        return chave.upper()
+    return UFS.get(chave)
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.original = re.sub(r"\s+", " ", text).strip()
+        self.norm = sem_acento(self.original).lower()
+        self.fields: Dict[str, str] = {}
+        self.unmatched: List[str] = []
+        self.cep_confere: Optional[bool] = None
+
+    def set(self, tag: str, value: Optional[str]) -> bool:
+        if value and tag not in self.fields:
+            self.fields[tag] = value.strip(" .;:-")
+            return True
+        return False
+
+    def segmentos(self):
+        inicio = 0
+        for m in RE_SEPARADOR.finditer(self.norm):
+            yield self.original[inicio:m.start()].strip(), self.norm[inicio:m.start()].strip()
+            inicio = m.end()
+        yield self.original[inicio:].strip(), self.norm[inicio:].strip()
+
+    def extrair_globais(self) -> None:
+        """Campos identificáveis em qualquer posição do texto"""
+        m = RE_EMAIL.search(self.original)
+        if m:
+            self.set("email", m.group(0))
+
+        m = RE_CEP.search(self.norm[self.norm.find("cep"):] if "cep" in self.norm else "")
+        if m:
+            self.set("cep", f"{m.group(1)}{m.group(2)}-{m.group(3)}")
+
+        for m in re.finditer(r"\b(?:telefone|tel\.?|celular|cel\.?|fone|whatsapp)\b[^\d(+]{0,15}", self.norm):
+            t = RE_TELEFONE.match(self.norm, m.end())
+            if t:
+                self.set("phone", f"({t.group(1)}) {t.group(2)}-{t.group(3)}")
+                break
+
+        m = RE_RG.search(self.norm)
+        if m:
+            self.set("rg", self.original[m.start(1):m.end(1)].strip())
+            resto = self.norm[m.end(1):m.end(1) + 60]
+            orgao = RE_ORGAO.search(resto)
+            if orgao and orgao.start() < 25:
+                sigla = orgao.group(1).upper()
+                self.set("orgaoExpedidor", f"{sigla}/{orgao.group(2).upper()}" if orgao.group(2) else sigla)
+            exp = RE_EXPEDICAO.search(self.norm, m.start())
+            if exp and exp.start() - m.end(1) < 80:
+                d, mth, y = exp.group(1), exp.group(2), exp.group(3)
+                self.set("dataExpedicao", f"{int(d):02d}/{int(mth):02d}/{y}")
+
+    def completar_pelo_cep(self, consultar_cep: Callable) -> None:
+        """
+        Confere cidade/UF do texto com o endereço do CEP e, se batem, preenche logradouro,
+        bairro, cidade e UF que faltaram. Campos extraídos do texto nunca são sobrescritos
+        """
+        endereco = consultar_cep(self.fields["cep"]) if "cep" in self.fields else None
+        if endereco is None:
+            return
+        self.cep_confere = all(
+            _comparavel(self.fields[tag]) == _comparavel(valor)
+            for tag, valor in (("city", endereco.cidade), ("state", endereco.uf))
+            if valor and tag in self.fields
+        )
+        if self.cep_confere:
+            self.set("street", endereco.logradouro)
+            self.set("neighborhood", endereco.bairro)
+            self.set("city", endereco.cidade)
+            self.set("state", endereco.uf)
+
+    def classificar(self, consultar_cep: Optional[Callable] = None) -> float:
+        segmentos = [(o, n) for o, n in self.segmentos() if o]
+        if not segmentos:
+            return 0.0
+
+        explicados = 0
+        em_endereco = False
+        for i, (original, norm) in enumerate(segmentos):
+            ok = self._classificar_segmento(i, original, norm, em_endereco)
+            if ok == "endereco":
+                em_endereco = True
+            if not ok:
+                self.unmatched.append(original)
+            elif ok != "posicao":
+                explicados += 1
+        if consultar_cep is not None:
+            self.completar_pelo_cep(consultar_cep)
+
+        # A profissão pela posição não conta como explicada, e cada trecho sem
+        # classificação desconta mais um: sobra de texto é sinal de extração errada
+        confianca = max(explicados - len(self.unmatched), 0) / len(segmentos)
+        if RE_PARA_O_MODELO.search(self.norm):
+            confianca = min(confianca, 0.3)
+        if "name" not in self.fields:
+            confianca = min(confianca, 0.3)
+        if em_endereco and not (self.fields.get("street") and self.fields.get("city")):
+            confianca = min(confianca, 0.5)
+        if self.cep_confere is False:
+            # Cidade/UF do texto não batem com o CEP: provável erro de segmentação
+            confianca = min(confianca, 0.5)
+        return round(confianca, 3)
+
+    def _classificar_segmento(self, i: int, original: str, norm: str, em_endereco: bool):
+        if i == 0:
+            nome = re.split(r"\s*[-–:]\s*|\s+\(", original)[0]
+            if _parece_nome(nome):
+                return self.set("name", _nome_proprio(nome)) or True
+
+        base = norm.rstrip(" .")
+        if base in NACIONALIDADES:
+            return self.set("nationality", _capitalizar(original.rstrip(" ."))) or True
+
+        if RE_UNIAO_ESTAVEL.search(base) and len(base) < 80:
+            return True
+        estado_civil = RE_ESTADO_CIVIL.search(base) if len(base) < 80 else None
+        if estado_civil and not RE_RESIDENCIA.search(base):
+            chave = estado_civil.group(1).split()[0][:-1] + "o"
+            return self.set("maritalStatus", ESTADOS_CIVIS[chave]) or True
+
+        residencia = RE_RESIDENCIA.search(norm)
+        if residencia:
+            resto = original[residencia.end():].strip()
+            self._endereco_logradouro(resto, norm[residencia.end():].strip())
+            return "endereco"
+
+        if RE_EMAIL.search(original) or (self.fields.get("phone") and RE_TELEFONE.search(norm) and not em_endereco):
+            return True
+        if base.startswith(("telefone", "tel", "celular", "fone", "e-mail", "email", "whatsapp")):
+            return True
+        if RE_RG.search(norm) or RE_EXPEDICAO.search(norm) or RE_ORGAO.fullmatch(base):
+            return True
+        if RE_CONSUMIVEIS.search(norm):
+            return True
+        if base.startswith("cep") or RE_CEP.fullmatch(base):
+            return True
+
+        if em_endereco:
+            return self._endereco_parte(original, norm)
+
+        # Profissão: primeiro trecho curto, sem dígitos, nas posições iniciais. É palpite
+        # pela posição, não evidência: "posicao" não entra na confiança
+        if i <= 5 and "name" in self.fields and "profession" not in self.fields and not re.search(r"\d", base) and 2 < len(base) < 60:
+            self.set("profession", original.rstrip(" ."))
+            return "posicao"
+        return False
+
+    def _endereco_logradouro(self, original: str, norm: str) -> None:
+        inline = RE_NUMERO_INLINE.match(norm)
+        if inline:
+            self.set("street", original[:len(inline.group(1))])
+            self.set("number", inline.group(2).upper() if "/" in inline.group(2) else inline.group(2))
+        else:
+            self.set("street", original)
+
+    def _endereco_parte(self, original: str, norm: str) -> bool:
+        base = norm.rstrip(" .")
+        texto = original.rstrip(" .")
+
+        m = RE_NUMERO.match(base)
+        if m and "number" not in self.fields:
+            return self.set("number", m.group(1).upper() if "/" in m.group(1) else m.group(1)) or True
+        if RE_COMPLEMENTO.match(base) and "complement" not in self.fields:
+            return self.set("complement", texto) or True
+        if base.startswith("bairro"):
+            return self.set("neighborhood", texto[len("bairro"):].strip(" :")) or True
+
+        m = RE_ESTADO.match(base)
+        if m and _uf(m.group(1)):
+            return self.set("state", _uf(m.group(1))) or True
+        m = RE_CIDADE.match(base)
+        if m:
+            return self.set("city", texto[m.start(1):]) or True
+        m = RE_CIDADE_UF.match(base)
+        if m and m.group(2).upper() in SIGLAS_UF:
+            self.set("city", texto[m.start(1):m.end(1)])
+            return self.set("state", m.group(2).upper()) or True
+        if _uf(base):
+            return self.set("state", _uf(base)) or True
+
+        if not re.search(r"\d", base):
+            if "neighborhood" not in self.fields and "city" not in self.fields:
+                return self.set("neighborhood", texto) or True
+            if "city" not in self.fields:
+                return self.set("city", texto) or True
+        return False
+
+
+def parse_party_text(text: str, consultar_cep: Optional[Callable] = None) -> ParseResult:
+    """
+    Extrai os campos do texto livre e estima a confiança da extração (0 a 1).
+    `consultar_cep` (ex.: cep_index.buscar) completa e confere o endereço pelo CEP, sem rede
+    """
+    parser = _Parser(text)
+    if not parser.original:
+        return ParseResult()
+    parser.extrair_globais()
+    confianca = parser.classificar(consultar_cep)
+    return ParseResult(fields=parser.fields, confidence=confianca, unmatched=parser.unmatched,
+                       cep_confere=parser.cep_confere)
+
+
+def segmentar_partes(text: str) -> List[str]:
+    """Separa um texto com a qualificação de várias partes em um trecho por parte, na ordem"""
+    trechos = []
+    for paragrafo in RE_PARAGRAFO.split(text):
+        for item in RE_ITEM.split(paragrafo):
+            for trecho in RE_NOVA_PARTE.split(item):
+                trecho = " ".join(trecho.split()).strip(" ;,")
+                if trecho.endswith(" e"):
+                    trecho = trecho[:-2].rstrip(" ;,")
+                if any(c.isalpha() for c in trecho):
+                    trechos.append(trecho)
+    return trechos
+
+
+def to_xml(fields: Dict[str, str]) -> str:
+    """Mesmo formato de XML pedido ao modelo"""
+    def tag(nome):
+        return f"<{nome}>{escape(fields.get(nome, ''))}</{nome}>"
+
+    partes = "".join(tag(nome) for nome in PARTY_TAGS)
+    endereco = "".join(tag(nome) for nome in ADDRESS_TAGS)
+    return f"<party>{partes}<address>{endereco}</address></party>"
+
+
+def from_xml(xml: str) -> Dict[str, str]:
+    """
+    Campos preenchidos do XML de PartyData. Aceita a resposta do modelo como ela vem: tags
+    soltas, sem raiz (é o que o SYSTEM_PROMPT pede), cercas ```xml, declaração e texto em
+    volta. Cada tag é procurada pelo nome em qualquer nível, como o PartyDetailsForm faz.
+    ValueError se não houver XML ou se nenhuma tag de PartyData vier presente
+    """
+    texto = RE_DECLARACAO_XML.sub("", RE_CERCA_XML.sub("", xml))
+    inicio, fim = texto.find("<"), texto.rfind(">")
+    if inicio < 0 or fim < inicio:
+        raise ValueError("resposta sem XML")
+    fragmento = RE_AMPERSAND_SOLTO.sub("&amp;", texto[inicio:fim + 1])
+    try:
+        raiz = ElementTree.fromstring(f"<resposta>{fragmento}</resposta>")
+    except ElementTree.ParseError as exc:
+        raise ValueError(f"XML inválido: {exc}") from None
+
+    campos, conhecidas = {}, 0
+    for tag in (*PARTY_TAGS, *ADDRESS_TAGS):
+        elemento = next(raiz.iter(tag), None)
+        if elemento is None:
+            continue
+        conhecidas += 1
+        valor = "".join(elemento.itertext()).strip()
+        if valor:
+            campos[tag] = valor
+    if not conhecidas:
+        raise ValueError("resposta sem as tags de PartyData")
+    return campos
@@ -0,0 +1,311 @@
+import base64
+import heapq
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, event, exists, func, insert, inspect, or_, select, true
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import PartySearch, PartySearchTermo, Partes, PessoaFisica, PessoaJuridica
+from services.party_parser import sem_acento
+from services.queries import ativo
+
+CHUNK_SIZE = 1000
+MIN_TERMO = 2
+MAX_TERMO = 60
+MAX_TERMOS_CONSULTA = 6
+# Acima disso um prefixo é "comum" e não vale a pena ordenar todos os candidatos
+SELETIVIDADE_MAX = 2000
+# Prefixo comum com até tantos termos distintos é paginado termo a termo (merge)
+MAX_VARIANTES = 16
+
+STOPWORDS = {"a", "o", "e", "d", "da", "de", "do", "das", "dos", "du", "di"}
+
+RE_NAO_ALFANUM = re.compile(r"[^a-z0-9]+")
+RE_DUPLICADAS = re.compile(r"([a-z])\1+")
+# Grafias equivalentes em nomes brasileiros: Thiago/Tiago, Luiz/Luis, Sousa/Souza, Phelipe/Felipe, Karla/Carla...
+_FONETICA = (("ph", "f"), ("th", "t"), ("y", "i"), ("w", "v"), ("z", "s"), ("k", "c"))
+
+
+def palavras(texto: Optional[str]) -> List[str]:
+    """Quebra o texto em palavras minúsculas, sem acento e sem pontuação"""
+    if not texto:
+        return []
+    return RE_NAO_ALFANUM.sub(" ", sem_acento(texto).lower()).split()
+
+
+def fonetizar(palavra: str) -> str:
+    """Normalização fonética leve; estável para prefixos (prefixo da palavra -> prefixo do termo)"""
+    for origem, destino in _FONETICA:
+        palavra = palavra.replace(origem, destino)
+    palavra = RE_DUPLICADAS.sub(r"\1", palavra)
+    if len(palavra) > 1 and palavra[0] == "h":
+        palavra = palavra[1:]
+    return palavra[:MAX_TERMO]
+
+
+def termos_indexados(*nomes: Optional[str]) -> set:
+    return {fonetizar(p) for nome in nomes for p in palavras(nome) if p not in STOPWORDS}
+
+
+def termos_consulta(q: str) -> List[str]:
+    """Prefixos a buscar, na ordem da consulta; cada um precisa casar com algum termo do nome"""
+    brutas = palavras(q)
+    uteis = [p for p in brutas if p not in STOPWORDS] or brutas
+    termos = dict.fromkeys(fonetizar(p) for p in uteis if len(p) >= MIN_TERMO)
+    return list(termos)[:MAX_TERMOS_CONSULTA]
+
+
+def _chunks(ids: Sequence[int]):
+    for i in range(0, len(ids), CHUNK_SIZE):
+        yield ids[i:i + CHUNK_SIZE]
+
+
+def reindexar(connection, parte_ids: Iterable[int]) -> int:
+    """
+    Regrava o índice das partes informadas a partir de PessoaFisica/PessoaJuridica,
+    na mesma transação da escrita. Retorna quantas partes ficaram indexadas.
+    """
+    ids = sorted(set(parte_ids))
+    indexadas = 0
+    for chunk in _chunks(ids):
+        connection.execute(delete(PartySearchTermo).where(PartySearchTermo.parte_id.in_(chunk)))
+        connection.execute(delete(PartySearch).where(PartySearch.parte_id.in_(chunk)))
+
+        linhas, termos = [], []
+        # Partes excluídas (soft delete) saem do índice
+        pf = connection.execute(
+            select(PessoaFisica.id, PessoaFisica.cpf, PessoaFisica.nome, PessoaFisica.nome_social)
+            .join(Partes, Partes.id == PessoaFisica.id)
+            .where(PessoaFisica.id.in_(chunk), ativo(Partes))
+        )
+        pj = connection.execute(
+            select(PessoaJuridica.id, PessoaJuridica.cnpj, PessoaJuridica.razao_social, PessoaJuridica.nome_fantasia)
+            .join(Partes, Partes.id == PessoaJuridica.id)
+            .where(PessoaJuridica.id.in_(chunk), ativo(Partes))
+        )
+        for tipo, rows in (("fisica", pf), ("juridica", pj)):
+            for parte_id, documento, nome, alternativo in rows:
+                nome_ordem = " ".join(palavras(nome))[:255]
+                linhas.append({
+                    "parte_id": parte_id,
+                    "tipo": tipo,
+                    "documento": documento,
+                    "nome": nome,
+                    "nome_ordem": nome_ordem,
+                })
+                termos.extend(
+                    {"termo": t, "parte_id": parte_id, "nome_ordem": nome_ordem}
+                    for t in termos_indexados(nome, alternativo)
+                )
+
+        if linhas:
+            connection.execute(insert(PartySearch), linhas)
+            indexadas += len(linhas)
+        if termos:
+            connection.execute(insert(PartySearchTermo), termos)
+    return indexadas
+
+
+def reconstruir_indice(connection, batch_size: int = CHUNK_SIZE) -> int:
+    """Reindexa todas as partes em lotes (carga inicial ou reparo)"""
+    total = 0
+    ultimo = 0
+    while True:
+        ids = connection.execute(
+            select(Partes.id).where(Partes.id > ultimo).order_by(Partes.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return total
+        total += reindexar(connection, ids)
+        ultimo = ids[-1]
+
+
+def _codificar_cursor(nome_ordem: str, parte_id: int) -> str:
+    raw = json.dumps([nome_ordem, parte_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        nome_ordem, parte_id = json.loads(raw)
+        return str(nome_ordem), int(parte_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _faixa_prefixo(prefixo: str, coluna=PartySearchTermo.termo):
+    # Intervalo [prefixo, prefixo com o último caractere + 1): usa o índice tanto no
+    # SQLite (onde LIKE é case-insensitive e ignora o índice) quanto no MySQL
+    fim = prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+    return and_(coluna >= prefixo, coluna < fim)
+
+
+def _contem_termo(prefixo: str, parte_id):
+    outro = aliased(PartySearchTermo)
+    return exists().where(outro.parte_id == parte_id, _faixa_prefixo(prefixo, outro.termo))
+
+
+def _depois_do_cursor(nome_ordem_col, parte_id_col, cursor: Optional[Tuple[str, int]]):
+    if cursor is None:
+        return true()
+    nome_ordem, parte_id = cursor
+    return or_(nome_ordem_col > nome_ordem, and_(nome_ordem_col == nome_ordem, parte_id_col > parte_id))
+
+
+async def _frequencias(db: AsyncSession, termos: List[str]) -> List[int]:
+    """Quantas entradas casam com cada prefixo, contando só até SELETIVIDADE_MAX"""
+    contagens = [
+        select(func.count()).select_from(
+            select(PartySearchTermo.parte_id).where(_faixa_prefixo(t)).limit(SELETIVIDADE_MAX).subquery()
+        ).scalar_subquery()
+        for t in termos
+    ]
+    return list((await db.execute(select(*contagens))).one())
+
+
+async def _variantes(db: AsyncSession, prefixo: str) -> Optional[List[str]]:
+    """Termos distintos que começam com o prefixo (saltando pelo índice); None se passar de MAX_VARIANTES"""
+    variantes: List[str] = []
+    fim = prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+    while len(variantes) <= MAX_VARIANTES:
+        # Um único limite inferior por consulta, senão o SQLite não salta pelo índice
+        inicio = PartySearchTermo.termo > variantes[-1] if variantes else PartySearchTermo.termo >= prefixo
+        stmt = (
+            select(PartySearchTermo.termo)
+            .where(inicio, PartySearchTermo.termo < fim)
+            .order_by(PartySearchTermo.termo)
+            .limit(1)
+        )
+        termo = (await db.execute(stmt)).scalar()
+        if termo is None:
+            return variantes
+        variantes.append(termo)
+    return None
+
+
+_COLUNAS = (PartySearch.parte_id, PartySearch.tipo, PartySearch.documento, PartySearch.nome, PartySearch.nome_ordem)
+
+
+async def _buscar_por_variantes(db, variantes, outros, cursor, limit):
+    """
+    Uma consulta por termo exato, já na ordem do índice (termo, nome_ordem, parte_id),
+    e merge das listas: custa O(limit) por termo mesmo para palavras muito comuns.
+    """
+    listas, limites = [], []
+    for variante in variantes:
+        stmt = (
+            select(*_COLUNAS)
+            .select_from(PartySearchTermo)
+            .join(PartySearch, PartySearch.parte_id == PartySearchTermo.parte_id)
+            .where(PartySearchTermo.termo == variante)
+            .where(*(_contem_termo(t, PartySearchTermo.parte_id) for t in outros))
+            .where(_depois_do_cursor(PartySearchTermo.nome_ordem, PartySearchTermo.parte_id, cursor))
+            .order_by(PartySearchTermo.nome_ordem, PartySearchTermo.parte_id)
+            .limit(limit + 1)
+        )
+        rows = (await db.execute(stmt)).all()
+        listas.append(rows)
+        if len(rows) > limit:
+            # Esta lista foi cortada: o merge só é completo até a última chave dela
+            limites.append((rows[-1].nome_ordem, rows[-1].parte_id))
+
+    teto = min(limites) if limites else None
+    vistos, merged = set(), []
+    for row in heapq.merge(*listas, key=lambda r: (r.nome_ordem, r.parte_id)):
+        chave = (row.nome_ordem, row.parte_id)
+        if teto is not None and chave > teto:
+            break
+        if row.parte_id not in vistos:
+            vistos.add(row.parte_id)
+            merged.append(row)
+    return merged, teto is not None
+
+
+async def buscar_partes(db: AsyncSession, q: str, limit: int = 20,
+                        cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Busca por prefixos de palavras do nome, em ordem alfabética, paginada por cursor"""
+    termos = termos_consulta(q)
+    if not termos:
+        raise HTTPException(status_code=400, detail=f"Informe ao menos {MIN_TERMO} letras para buscar")
+    posicao = _decodificar_cursor(cursor) if cursor else None
+
+    # Empate no teto (duas palavras comuns): fica a primeira da consulta, em geral o
+    # prenome; os nomes que casam com ele ficam espalhados pelo resto da ordem alfabética
+    frequencias = await _frequencias(db, termos)
+    raro, frequencia = min(zip(termos, frequencias), key=lambda par: par[1])
+    if frequencia == 0:
+        return [], None
+    outros = [t for t in termos if t != raro]
+
+    variantes = None
+    if frequencia >= SELETIVIDADE_MAX:
+        variantes = await _variantes(db, raro)
+
+    if frequencia < SELETIVIDADE_MAX:
+        # Prefixo seletivo: parte da lista invertida dele e ordena só os candidatos
+        stmt = (
+            select(*_COLUNAS)
+            .where(PartySearch.parte_id.in_(select(PartySearchTermo.parte_id).where(_faixa_prefixo(raro))))
+            .where(*(_contem_termo(t, PartySearch.parte_id) for t in outros))
+            .where(_depois_do_cursor(PartySearch.nome_ordem, PartySearch.parte_id, posicao))
+            .order_by(PartySearch.nome_ordem, PartySearch.parte_id)
+            .limit(limit + 1)
+        )
+        rows, mais = (await db.execute(stmt)).all(), None
+    elif variantes is not None:
+        # Palavra comum ("silva", "maria"): poucos termos exatos, cada um já ordenado no índice
+        rows, mais = await _buscar_por_variantes(db, variantes, outros, posicao, limit)
+    else:
+        # Prefixo curto que cobre muitos termos ("ma"): os nomes que casam estão espalhados
+        # pela ordem alfabética, então percorrer o índice de nome_ordem acha o limite rápido
+        stmt = (
+            select(*_COLUNAS)
+            .where(*(_contem_termo(t, PartySearch.parte_id) for t in termos))
+            .where(_depois_do_cursor(PartySearch.nome_ordem, PartySearch.parte_id, posicao))
+            .order_by(PartySearch.nome_ordem, PartySearch.parte_id)
+            .limit(limit + 1)
+        )
+        rows, mais = (await db.execute(stmt)).all(), None
+
+    pagina = rows[:limit]
+    if len(rows) > limit or (mais and pagina):
+        proximo = _codificar_cursor(pagina[-1].nome_ordem, pagina[-1].parte_id)
+    else:
+        proximo = None
+    return [{"id": r.parte_id, "tipo": r.tipo, "documento": r.documento, "nome": r.nome} for r in pagina], proximo
+
+
+# Atualização incremental: escritas via ORM em PessoaFisica/PessoaJuridica
+# reindexam a parte na mesma transação. Escritas em massa (importador) chamam
+# reindexar explicitamente.
+_CAMPOS_INDEXADOS = {
+    PessoaFisica: ("nome", "nome_social", "cpf"),
+    PessoaJuridica: ("razao_social", "nome_fantasia", "cnpj"),
+}
+
+
+def _reindexar_alvo(mapper, connection, target):
+    estado = inspect(target)
+    if not any(estado.attrs[campo].history.has_changes() for campo in _CAMPOS_INDEXADOS[mapper.class_]):
+        return
+    reindexar(connection, [target.id])
+
+
+def _remover_alvo(mapper, connection, target):
+    connection.execute(delete(PartySearchTermo).where(PartySearchTermo.parte_id == target.id))
+    connection.execute(delete(PartySearch).where(PartySearch.parte_id == target.id))
+
+
+for _modelo in _CAMPOS_INDEXADOS:
+    event.listen(_modelo, "after_insert", _reindexar_alvo)
+    event.listen(_modelo, "after_update", _reindexar_alvo)
+    event.listen(_modelo, "after_delete", _remover_alvo)
+
+
+@event.listens_for(Partes, "after_update")
+def _reindexar_soft_delete(mapper, connection, target):
+    if inspect(target).attrs.deleted_at.history.has_changes():
+        reindexar(connection, [target.id])
@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.cache import MISSING
+from services.party_cache import Parte, party_cache
+from services.queries import (
+    id_usuario_ativo_por_email, listagem_partes_do_usuario, nomes_ativos_por_cnpj, nomes_ativos_por_cpf
+)
+from utils.validators import normalizar_documento, validar_documentos
+
+# Limite de parâmetros por cláusula IN (...) para não estourar o pacote do MySQL
+IN_CHUNK_SIZE = 1000
+
+
+def _chunks(values: List[str], size: int = IN_CHUNK_SIZE) -> Iterable[List[str]]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+async def buscar_nomes_por_cpf(db: AsyncSession, cpfs: List[str]) -> Dict[str, Parte]:
+    """Resolve vários CPFs (já normalizados) de partes ativas em uma consulta IN por bloco"""
+    partes = {}
+    for bloco in _chunks(cpfs):
+        rows = await db.execute(nomes_ativos_por_cpf(bloco))
+        partes.update({cpf: Parte(nome, versao) for cpf, nome, versao in rows})
+    return partes
+
+
+async def buscar_nomes_por_cnpj(db: AsyncSession, cnpjs: List[str]) -> Dict[str, Parte]:
+    """Resolve vários CNPJs (já normalizados) de partes ativas em uma consulta IN por bloco"""
+    partes = {}
+    for bloco in _chunks(cnpjs):
+        rows = await db.execute(nomes_ativos_por_cnpj(bloco))
+        partes.update({cnpj: Parte(razao_social, versao) for cnpj, razao_social, versao in rows})
+    return partes
+
+
+async def buscar_parte(db: AsyncSession, normalized: str) -> Optional[Parte]:
+    """Nome e versão da parte para um CPF/CNPJ normalizado e já validado, passando pelo cache"""
+    parte = party_cache.get(normalized)
+    if parte is not MISSING:
+        return parte
+
+    if len(normalized) == 11:
+        parte = (await buscar_nomes_por_cpf(db, [normalized])).get(normalized)
+    else:
+        parte = (await buscar_nomes_por_cnpj(db, [normalized])).get(normalized)
+    party_cache.set(normalized, parte)
+    return parte
+
+
+async def resolver_documentos(db: AsyncSession, documents: List[str]) -> List[dict]:
+    """Resolve uma lista de CPF/CNPJ mantendo a ordem de entrada"""
+    normalizados = [normalizar_documento(doc) for doc in documents]
+    # Dígitos verificadores conferidos de uma vez: documento inválido não chega ao banco
+    valido = validar_documentos(normalizados)
+
+    # Remove duplicados preservando a ordem para não repetir parâmetros no IN
+    validos = list(dict.fromkeys(doc for doc, ok in zip(normalizados, valido) if ok))
+    partes = party_cache.get_many(validos)
+
+    cpfs = [doc for doc in validos if doc not in partes and len(doc) == 11]
+    cnpjs = [doc for doc in validos if doc not in partes and len(doc) == 14]
+    encontrados = {}
+    if cpfs:
+        encontrados.update(await buscar_nomes_por_cpf(db, cpfs))
+    if cnpjs:
+        encontrados.update(await buscar_nomes_por_cnpj(db, cnpjs))
+    for doc in (*cpfs, *cnpjs):
+        parte = encontrados.get(doc)
+        party_cache.set(doc, parte)
+        partes[doc] = parte
+
+    results = []
+    for original, doc, ok in zip(documents, normalizados, valido):
+        if not ok:
+            results.append({"document": original, "status": "invalid", "name": None})
+        elif partes.get(doc) is not None:
+            results.append({"document": original, "status": "found", "name": partes[doc].nome})
+        else:
+            results.append({"document": original, "status": "not_found", "name": None})
+    return results
+
+
+async def id_do_usuario(db: AsyncSession, email: str) -> int:
+    """Id do usuário ativo autenticado; 401 se ele não existe mais"""
+    usuario_id = (await db.execute(id_usuario_ativo_por_email(email))).scalar()
+    if usuario_id is None:
+        raise HTTPException(status_code=401, detail="Usuário não encontrado")
+    return usuario_id
+
+
+async def listar_partes_do_usuario(db: AsyncSession, email: str, after_id: Optional[int] = None,
+                                   limit: int = 50) -> Tuple[List[dict], Optional[int]]:
+    """Página de partes ativas do usuário por keyset em id; duas consultas, qualquer que seja o limit"""
+    usuario_id = await id_do_usuario(db, email)
+    rows = (await db.execute(listagem_partes_do_usuario(usuario_id, after_id, limit + 1))).mappings().all()
+    pagina = [dict(row) for row in rows[:limit]]
+    return pagina, pagina[-1]["id"] if len(rows) > limit else None
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+from fastapi import HTTPException
+from core.config import settings
+from core.lazy import LazyProxy
+from core.request_metrics import medir_dependencia
+from services.auth_utils import verify_password
+from utils.security import hash_senha
+
+
+class PasswordHasher:
+    """
+    Executa hash/verificação bcrypt num executor limitado, sem bloquear o event loop.
+
+    O bcrypt libera o GIL, então o pool de threads já paraleliza; o pool de
+    processos fica disponível para quem preferir isolar a CPU do worker.
+    """
+
+    def __init__(self, max_workers: int = 4, executor: str = "thread", rounds: int = 12, max_queue: int = 64):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Executor inválido: {executor}")
+        self.max_workers = max_workers
+        self.executor_kind = executor
+        self.rounds = rounds
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.executor_kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self.submitted - self.completed
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - self.max_workers)
+
+    async def _run(self, operacao: str, fn: Callable, *args):
+        with self._lock:
+            if self.pending - self.max_workers >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Servidor ocupado. Tente novamente em instantes.")
+            self.submitted += 1
+
+        start = time.perf_counter()
+        try:
+            with medir_dependencia("bcrypt", operacao):
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self.completed += 1
+                self.total_seconds += time.perf_counter() - start
+
+    async def hash(self, senha: str) -> str:
+        return await self._run("hash", hash_senha, senha, self.rounds)
+
+    async def verify(self, senha: str, hashed: str) -> bool:
+        return await self._run("verify", verify_password, senha, hashed)
+
+    def stats(self) -> dict:
+        pending = self.pending
+        return {
+            "executor": self.executor_kind,
+            "max_workers": self.max_workers,
+            "in_flight": min(pending, self.max_workers),
+            "queued": max(0, pending - self.max_workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": (self.total_seconds / self.completed * 1000) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def criar_password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        executor=settings.PASSWORD_HASH_EXECUTOR,
+        rounds=settings.BCRYPT_ROUNDS,
+        max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    )
+
+
+password_hasher = LazyProxy(criar_password_hasher)
@@ -0,0 +1,84 @@
+from typing import Iterable, Optional
+from sqlalchemy import Select, func, select, true
+from models.models import Partes, PessoaFisica, PessoaJuridica, Usuarios
+
+# Consultas quentes sobre dados com soft delete. Todas filtram pela coluna gerada
+# `active` (nunca por deleted_at IS NULL), que é o que os índices compostos cobrem;
+# benchmarks/check_query_plans.py confere com EXPLAIN que cada uma usa o seu índice.
+
+
+def ativo(model):
+    """Condição de registro ativo (não excluído) para Partes ou Usuarios"""
+    return model.active == true()
+
+
+def usuario_ativo_por_email(email: str) -> Select:
+    return select(Usuarios).where(Usuarios.email == email, ativo(Usuarios))
+
+
+def id_usuario_ativo_por_email(email: str) -> Select:
+    return select(Usuarios.id).where(Usuarios.email == email, ativo(Usuarios))
+
+
+def partes_ativas_do_usuario(usuario_id: int, after_id: Optional[int] = None, limit: Optional[int] = 50,
+                             colunas: Iterable = (Partes.id, Partes.tipo, Partes.email)) -> Select:
+    """Partes ativas do usuário em ordem de id, paginadas por keyset (ix_partes_usuario_active)"""
+    stmt = select(*colunas).where(Partes.usuario_id == usuario_id, ativo(Partes))
+    if after_id is not None:
+        stmt = stmt.where(Partes.id > after_id)
+    return stmt.order_by(Partes.id).limit(limit)
+
+
+def listagem_partes_do_usuario(usuario_id: int, after_id: Optional[int] = None, limit: int = 50) -> Select:
+    """
+    Página da listagem de partes do usuário numa única consulta: só as colunas da
+    listagem, com nome/documento vindos das tabelas filhas por outer join na PK
+    """
+    colunas = (
+        Partes.id, Partes.tipo, Partes.email, Partes.cidade, Partes.uf,
+        func.coalesce(PessoaFisica.cpf, PessoaJuridica.cnpj).label("documento"),
+        func.coalesce(PessoaFisica.nome, PessoaJuridica.razao_social).label("nome"),
+    )
+    return (
+        partes_ativas_do_usuario(usuario_id, after_id, limit, colunas)
+        .outerjoin_from(Partes, PessoaFisica, PessoaFisica.id == Partes.id)
+        .outerjoin(PessoaJuridica, PessoaJuridica.id == Partes.id)
+    )
+
+
+def exportacao_partes_do_usuario(usuario_id: int, campos: Iterable[str]) -> Select:
+    """
+    Todas as partes ativas do usuário em ordem de id, para a exportação em streaming.
+    `campos` são colunas de Partes, PessoaFisica ou PessoaJuridica (procuradas nessa
+    ordem) ou "documento" (cpf/cnpj); as tabelas filhas entram por outer join na PK
+    """
+    colunas = []
+    for campo in campos:
+        if campo == "documento":
+            colunas.append(func.coalesce(PessoaFisica.cpf, PessoaJuridica.cnpj).label("documento"))
+        else:
+            model = next(m for m in (Partes, PessoaFisica, PessoaJuridica) if hasattr(m, campo))
+            colunas.append(getattr(model, campo))
+    return (
+        partes_ativas_do_usuario(usuario_id, limit=None, colunas=colunas)
+        .outerjoin_from(Partes, PessoaFisica, PessoaFisica.id == Partes.id)
+        .outerjoin(PessoaJuridica, PessoaJuridica.id == Partes.id)
+    )
+
+
+def nomes_ativos_por_cpf(cpfs: Iterable[str]) -> Select:
+    """(cpf, nome, versão) das pessoas físicas ativas; busca pelo índice único de cpf e junta pela PK"""
+    return (
+        select(PessoaFisica.cpf, PessoaFisica.nome, Partes.updated_at)
+        .join(Partes, Partes.id == PessoaFisica.id)
+        .where(PessoaFisica.cpf.in_(list(cpfs)), ativo(Partes))
+    )
+
+
+def nomes_ativos_por_cnpj(cnpjs: Iterable[str]) -> Select:
+    """(cnpj, razao_social, versão) das pessoas jurídicas ativas"""
+    return (
+        select(PessoaJuridica.cnpj, PessoaJuridica.razao_social, Partes.updated_at)
+        .join(Partes, Partes.id == PessoaJuridica.id)
+        .where(PessoaJuridica.cnpj.in_(list(cnpjs)), ativo(Partes))
+    )
@@ -0,0 +1,86 @@
+import functools
+import time
+from typing import TYPE_CHECKING
+from fastapi import HTTPException
+from core.config import settings
+from core.lazy import LazyProxy
+from services.logger import logger
+
+if TYPE_CHECKING:
+    from slowapi import Limiter
+
+MENSAGEM_429 = "Muitas tentativas. Aguarde um momento antes de tentar novamente."
+
+
+def criar_limiter(storage_uri: str = None, enabled: bool = None) -> "Limiter":
+    """
+    Limiter do slowapi com o storage configurado (memory://, redis://, redis+cluster://...).
+    Se o storage compartilhado cair, cada processo passa a aplicar RATE_LIMIT_FALLBACK
+    por IP em memória até ele voltar, em vez de liberar ou bloquear tudo.
+    """
+    from slowapi import Limiter
+    from slowapi.util import get_remote_address
+
+    return Limiter(
+        key_func=get_remote_address,
+        storage_uri=storage_uri or settings.RATE_LIMIT_STORAGE_URI,
+        strategy=settings.RATE_LIMIT_STRATEGY,
+        enabled=settings.RATE_LIMIT_ENABLED if enabled is None else enabled,
+        key_prefix="lexsum",
+        in_memory_fallback_enabled=True,
+        in_memory_fallback=[settings.RATE_LIMIT_FALLBACK],
+    )
+
+
+limiter = LazyProxy(criar_limiter)
+
+
+def limitar_ip(nome_limite: str):
+    """
+    Limite por IP do slowapi (limiter.limit) com o valor de settings.<nome_limite>.
+    O decorator do slowapi só é aplicado na primeira chamada da rota, então importar
+    a app não cria o limiter (storage, slowapi/limits) nem lê o Settings.
+    """
+    def decorator(func):
+        limitada = None
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            nonlocal limitada
+            if limitada is None:
+                limitada = limiter.limit(getattr(settings, nome_limite))(func)
+            return await limitada(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def limitar_conta(escopo: str, conta: str, limite: str) -> None:
+    """
+    Conta uma tentativa de `escopo` (ex.: "login") para a conta (email) no mesmo storage
+    do limiter e levanta 429 ao passar de `limite`. Complementa os limites por IP dos
+    decorators, que não enxergam o corpo da requisição: um ataque distribuído em muitos
+    IPs contra o mesmo email também é barrado.
+    """
+    if not limiter.enabled:
+        return
+    from limits import parse
+
+    item = parse(limite)
+    conta = conta.strip().lower()
+    try:
+        permitido = limiter.limiter.hit(item, "conta", escopo, conta)
+        if not permitido:
+            reset = limiter.limiter.get_window_stats(item, "conta", escopo, conta).reset_time
+    except Exception as e:
+        # Storage fora do ar: os limites por IP seguem valendo pelo fallback em memória
+        logger.warning("Rate limit por conta indisponível", escopo=escopo, erro=str(e))
+        return
+    if not permitido:
+        logger.warning("Rate limit por conta excedido", escopo=escopo, email=conta)
+        raise HTTPException(
+            status_code=429,
+            detail=MENSAGEM_429,
+            headers={"Retry-After": str(max(1, int(reset - time.time())))},
+        )
@@ -0,0 +1,94 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from core.config import settings
+from core.lazy import LazyProxy
+from services.cache import MISSING, CacheBackend, InMemoryLRUCache
+
+
+def token_key(token: str) -> str:
+    """Chave do token no cache/denylist (nunca guardamos o JWT em si)"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenDenylistStore(ABC):
+    """Tokens revogados até o seu exp (logout, credenciais comprometidas)"""
+
+    @abstractmethod
+    def add(self, key: str, expires_at: float) -> None:
+        ...
+
+    @abstractmethod
+    def contains(self, key: str) -> bool:
+        ...
+
+    def __len__(self) -> int:
+        return 0
+
+
+class InMemoryDenylistStore(TokenDenylistStore):
+    def __init__(self):
+        self._data: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, expires_at: float) -> None:
+        with self._lock:
+            self._prune()
+            self._data[key] = expires_at
+
+    def contains(self, key: str) -> bool:
+        expires_at = self._data.get(key)
+        return expires_at is not None and expires_at > time.time()
+
+    def _prune(self) -> None:
+        now = time.time()
+        for key in [k for k, exp in self._data.items() if exp <= now]:
+            del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class VerifiedTokenCache:
+    """Claims de tokens já verificados, válidos no máximo até o exp do token"""
+
+    def __init__(self, backend: CacheBackend, denylist: TokenDenylistStore, max_ttl: float):
+        self.backend = backend
+        self.denylist = denylist
+        self.max_ttl = max_ttl
+
+    def get(self, key: str):
+        """Retorna as claims cacheadas ou MISSING"""
+        return self.backend.get(key)
+
+    def set(self, key: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        ttl = self.max_ttl if exp is None else min(self.max_ttl, exp - time.time())
+        if ttl > 0:
+            self.backend.set(key, claims, ttl)
+
+    def is_revoked(self, key: str) -> bool:
+        return self.denylist.contains(key)
+
+    def revoke(self, key: str, expires_at: Optional[float]) -> None:
+        # Sem exp o token não expira sozinho: mantém na denylist pelo tempo máximo de um token
+        if expires_at is None:
+            expires_at = time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        self.denylist.add(key, expires_at)
+        self.backend.delete(key)
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "revoked": len(self.denylist)}
+
+
+def criar_verified_tokens() -> VerifiedTokenCache:
+    return VerifiedTokenCache(
+        InMemoryLRUCache(maxsize=settings.JWT_CACHE_MAXSIZE),
+        InMemoryDenylistStore(),
+        max_ttl=settings.JWT_CACHE_MAX_TTL,
+    )
+
+
+verified_tokens = LazyProxy(criar_verified_tokens)
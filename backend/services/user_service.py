@@ -1,35 +1,69 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.models import Usuarios
 # from utils.security import hash_senha
 # from utils.validators import validar_email
 from fastapi import HTTPException
-from core.db import SessionLocal
+from services.email_queue import OutgoingEmail, email_dispatcher
+from services.logger import logger
+from services.queries import usuario_ativo_por_email
 
-def usuario_existe(email: str) -> bool:
-    db = SessionLocal()
-    """Verifica se email já está cadastrado"""
-    return db.query(Usuarios).filter(Usuarios.email == email).first() is not None
 
+async def buscar_usuario_por_email(db: AsyncSession, email: str) -> Optional[Usuarios]:
+    result = await db.execute(usuario_ativo_por_email(email))
+    return result.scalar_one_or_none()
 
-def criar_usuario(db: Session, user_data: dict) -> Usuarios:
+
+# Constraints unique de usuarios -> mensagem do 409
+CAMPOS_UNICOS = {
+    "email": "Email já cadastrado",
+    "celular": "Celular já cadastrado",
+}
+
+
+def _campo_duplicado(erro: IntegrityError) -> Optional[str]:
+    """Coluna unique violada, pela mensagem do banco (MySQL 1062 ou SQLite)"""
+    mensagem = str(erro.orig).lower()
+    # MySQL: "Duplicate entry '<valor>' for key 'usuarios.email'"; o valor pode conter qualquer texto
+    if "duplicate entry" in mensagem:
+        mensagem = mensagem.rsplit(" for key ", 1)[-1]
+    elif "unique constraint failed" not in mensagem:
+        return None
+    for campo in CAMPOS_UNICOS:
+        if campo in mensagem:
+            return campo
+    return None
+
+
+async def cadastrar_usuario(db: AsyncSession, user_data: dict) -> int:
+    """
+    Cadastra o usuário com um único INSERT e retorna o id (lastrowid, sem SELECT de volta).
+    Email ou celular já usados violam as constraints unique e viram 409: sem consulta
+    prévia, que custa um round trip e ainda deixa a corrida entre dois cadastros iguais.
+    """
     try:
-        print("Salvando no banco:", user_data)
-
-        """Cria e salva um novo usuário no banco de dados"""
-        novo_usuario = Usuarios(**user_data)
-        db.add(novo_usuario)
-        db.commit()
-        db.refresh(novo_usuario)  # importante: preenche o .id e outros campos automáticos
-        print("✅ Usuário criado com ID:", novo_usuario.id)
-
-        return novo_usuario
-    except Exception as e:
-        print("\n=== Erro ===")
-        print("Tipo:", type(e).__name__)
-        print("Mensagem:", str(e))    
-
-def enviar_email_verificacao(user_data: dict):
-    if not user_data.get('email', None):
+        result = await db.execute(insert(Usuarios).values(**user_data))
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        campo = _campo_duplicado(e)
+        if campo is None:
+            raise
+        logger.info("Cadastro recusado: valor já cadastrado", campo=campo)
+        raise HTTPException(409, detail=CAMPOS_UNICOS[campo])
+    usuario_id = result.inserted_primary_key[0]
+    logger.debug("Usuário criado", usuario_id=usuario_id)
+    return usuario_id
+
+def enviar_email_verificacao(email: str, codigo: str) -> bool:
+    """Enfileira o email com o código de verificação; o envio acontece em background"""
+    if not email:
         raise HTTPException(status_code=400, detail="Email não disponível para envio de verificação.")
-    
-    pass
\ No newline at end of file
+
+    return email_dispatcher.enqueue(OutgoingEmail(
+        to=email,
+        subject="Seu código de verificação",
+        body=f"Seu código de verificação é {codigo}. Ele expira em 24 horas.",
+    ))
@@ -1,15 +1,16 @@
 from datetime import datetime, timedelta
-from jose import jwt
 from core.config import settings
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from services.cache import MISSING
+from services.token_cache import token_key, verified_tokens
 import secrets
-import bcrypt
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
+    from jose import jwt  # import pesado (cryptography): só no primeiro uso, não no boot
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -19,12 +20,24 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def decode_token(token: str) -> dict:
+    """Claims do token (sub, exp), verificando assinatura e validade só na primeira vez"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    key = token_key(token)
+    if verified_tokens.is_revoked(key):
+        raise credentials_exception
+
+    if settings.JWT_CACHE_ENABLED:
+        claims = verified_tokens.get(key)
+        if claims is not MISSING:
+            return claims
+
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
@@ -32,18 +45,35 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    return {"email": email}
+
+    claims = {"sub": email, "exp": payload.get("exp")}
+    if settings.JWT_CACHE_ENABLED:
+        verified_tokens.set(key, claims)
+    return claims
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    return {"email": decode_token(token)["sub"]}
+
+def revogar_token(token: str = Depends(oauth2_scheme)):
+    """Invalida o token até o seu exp (logout)"""
+    claims = decode_token(token)
+    verified_tokens.revoke(token_key(token), claims["exp"])
 
 def gerar_codigo_verificacao(length: int = 6) -> str:
     """Gera código alfanumérico para verificação"""
     return ''.join(secrets.choice('0123456789') for _ in range(length))
 
-def hash_senha(senha: str) -> str:
+def hash_senha(senha: str, rounds: int | None = None) -> str:
     """Gera um hash seguro para a senha utilizando bcrypt"""
-    salt = bcrypt.gensalt()
+    import bcrypt  # como o jose: só no primeiro hash, não no boot
+
+    salt = bcrypt.gensalt(rounds or settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(senha.encode('utf-8'), salt)
     return hashed.decode('utf-8')  # Armazene como string
 
 def verificar_senha(senha: str, hash_salvo: str) -> bool:
     """Compara senha com hash armazenado"""
-    return hash_senha(senha) == hash_salvo
\ No newline at end of file
+    import bcrypt
+
+    # O salt está no próprio hash: gerar um hash novo e comparar nunca bateria
+    return bcrypt.checkpw(senha.encode('utf-8'), hash_salvo.encode('utf-8'))
\ No newline at end of file
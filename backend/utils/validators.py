@@ -1,4 +1,6 @@
 import re
+from operator import mul
+from typing import List, Sequence
 from fastapi import HTTPException
 
 def validar_email(email: str) -> bool:
@@ -17,12 +19,105 @@ def validar_telefone(telefone: str) -> str:
     return digits
 
 def clean_document(document: str) -> str:
+    """Só os dígitos (telefone, CEP, CPF); para CPF/CNPJ use normalizar_documento"""
     return re.sub(r'\D', '', document)
 
+
+_NAO_ALFANUMERICO = re.compile(r'[^0-9A-Z]')
+_CNPJ = re.compile(r'[0-9A-Z]{12}[0-9]{2}')
+
+# Pesos do módulo 11; o primeiro dígito verificador usa os pesos a partir do segundo
+PESOS_CPF = (11, 10, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_CNPJ = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# A partir deste tamanho validar_documentos usa a versão vetorizada (numpy)
+LOTE_VETORIZADO = 256
+
+
+def normalizar_documento(document: str) -> str:
+    """CPF/CNPJ sem máscara, em maiúsculas: o CNPJ alfanumérico tem letras nas 12 primeiras posições"""
+    return _NAO_ALFANUMERICO.sub('', document.upper())
+
+
+def _digitos_verificadores(base: str, pesos: tuple) -> str:
+    # Valor de cada caractere é o código ASCII - 48: dígitos valem 0-9 e letras A-Z valem 17-42.
+    # Soma sobre os bytes e desconta 48 * soma dos pesos no fim
+    codigos = base.encode("ascii")
+    resto = (sum(map(mul, codigos, pesos[1:])) - 48 * sum(pesos[1:])) % 11
+    d1 = 0 if resto < 2 else 11 - resto
+    resto = (sum(map(mul, codigos, pesos)) - 48 * sum(pesos[:-1]) + d1 * pesos[-1]) % 11
+    d2 = 0 if resto < 2 else 11 - resto
+    return f"{d1}{d2}"
+
+
+def dv_cpf(base: str) -> str:
+    """Dígitos verificadores dos 9 primeiros dígitos do CPF"""
+    return _digitos_verificadores(base, PESOS_CPF)
+
+
+def dv_cnpj(base: str) -> str:
+    """Dígitos verificadores das 12 primeiras posições do CNPJ (numérico ou alfanumérico)"""
+    return _digitos_verificadores(base, PESOS_CNPJ)
+
+
 def is_cpf(document: str) -> bool:
-    digits = clean_document(document)
-    return len(digits) == 11
+    """CPF válido; recebe o documento já normalizado"""
+    return (
+        len(document) == 11 and document.isascii() and document.isdigit()
+        and document != document[0] * 11
+        and document[9:] == dv_cpf(document[:9])
+    )
+
 
 def is_cnpj(document: str) -> bool:
-    digits = clean_document(document)
-    return len(digits) == 14
+    """CNPJ válido, numérico ou alfanumérico; recebe o documento já normalizado"""
+    return (
+        len(document) == 14 and _CNPJ.fullmatch(document) is not None
+        and document != document[0] * 14
+        and document[12:] == dv_cnpj(document[:12])
+    )
+
+
+def validar_documentos(documentos: Sequence[str]) -> List[bool]:
+    """Valida CPF/CNPJ já normalizados; listas grandes vão para a versão vetorizada"""
+    if len(documentos) < LOTE_VETORIZADO:
+        return [is_cpf(doc) or is_cnpj(doc) for doc in documentos]
+    return documentos_validos(documentos).tolist()
+
+
+def _confere_dv(np, matriz, pesos: tuple):
+    pesos = np.array(pesos, dtype=np.int32)
+    k = len(pesos) - 1
+    resto = (matriz[:, :k] @ pesos[1:]) % 11
+    d1 = np.where(resto < 2, 0, 11 - resto)
+    resto = (matriz[:, :k] @ pesos[:-1] + d1 * pesos[-1]) % 11
+    d2 = np.where(resto < 2, 0, 11 - resto)
+    return (matriz[:, k] == d1) & (matriz[:, k + 1] == d2)
+
+
+def documentos_validos(documentos: Sequence[str]):
+    """
+    Máscara numpy de CPF/CNPJ válidos (já normalizados), mesmo critério de is_cpf/is_cnpj.
+    Os documentos viram uma matriz n x 14 de valores dos caracteres e os dígitos
+    verificadores de todos saem de dois produtos matriciais por tipo.
+    """
+    import numpy as np
+
+    n = len(documentos)
+    tamanhos = np.fromiter(map(len, documentos), dtype=np.int64, count=n)
+    # U14 trunca o que passar de 14 caracteres; o tamanho já reprova esses
+    matriz = np.array(documentos, dtype="U14").view(np.uint32).reshape(n, 14).astype(np.int32) - 48
+    digito = (matriz >= 0) & (matriz <= 9)
+    letra = (matriz >= 17) & (matriz <= 42)
+
+    cpf = (
+        (tamanhos == 11) & digito[:, :11].all(axis=1)
+        & ~(matriz[:, :11] == matriz[:, :1]).all(axis=1)
+        & _confere_dv(np, matriz, PESOS_CPF)
+    )
+    cnpj = (
+        (tamanhos == 14) & (digito | letra)[:, :12].all(axis=1) & digito[:, 12:].all(axis=1)
+        & ~(matriz == matriz[:, :1]).all(axis=1)
+        & _confere_dv(np, matriz, PESOS_CNPJ)
+    )
+    return cpf | cnpj